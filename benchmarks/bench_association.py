@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for associate_detections_to_trackers at crowd-scale sizes.
+Compares the mask-based bookkeeping against the previous list-scan version,
+and the dense solver against spatially gated association.
+
+Usage (from the repository root):
+    python benchmarks/bench_association.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from engine.tracking import (
+    associate_detections_to_trackers, associate_detections_to_trackers_gated,
+    iou_batch, linear_assignment
+)
+
+
+def legacy_associate(detections: np.ndarray, trackers: np.ndarray, iou_threshold: float = 0.3):
+    """Previous implementation: `in` scans per detection and a Python loop over matches."""
+    if len(trackers) == 0:
+        return np.empty((0, 2), dtype=int), np.arange(len(detections)), np.empty((0, 5), dtype=int)
+
+    iou_matrix = iou_batch(detections, trackers)
+
+    if min(iou_matrix.shape) > 0:
+        a = (iou_matrix > iou_threshold).astype(np.int32)
+        if a.sum(1).max() == 1 and a.sum(0).max() == 1:
+            matched_indices = np.stack(np.where(a), axis=1)
+        else:
+            matched_indices = linear_assignment(-iou_matrix)
+    else:
+        matched_indices = np.empty(shape=(0, 2))
+
+    unmatched_detections = []
+    for d, det in enumerate(detections):
+        if d not in matched_indices[:, 0]:
+            unmatched_detections.append(d)
+    unmatched_trackers = []
+    for t, trk in enumerate(trackers):
+        if t not in matched_indices[:, 1]:
+            unmatched_trackers.append(t)
+
+    matches = []
+    for m in matched_indices:
+        if iou_matrix[m[0], m[1]] < iou_threshold:
+            unmatched_detections.append(m[0])
+            unmatched_trackers.append(m[1])
+        else:
+            matches.append(m.reshape(1, 2))
+    if len(matches) == 0:
+        matches = np.empty((0, 2), dtype=int)
+    else:
+        matches = np.concatenate(matches, axis=0)
+
+    return matches, np.array(unmatched_detections), np.array(unmatched_trackers)
+
+
+def crowd_frame(num_people: int, rng: np.random.Generator):
+    """Predicted track boxes and jittered detections for a dense crowd, with 10% churn."""
+    centers = rng.uniform(0, [1920, 1080], size=(num_people, 2))
+    sizes = rng.uniform(20, 50, size=(num_people, 2))
+    trackers = np.hstack([centers - sizes / 2, centers + sizes / 2])
+
+    jitter = rng.normal(0, 3, size=(num_people, 2))
+    detections = np.hstack([centers + jitter - sizes / 2, centers + jitter + sizes / 2,
+                            np.full((num_people, 1), 0.9)])
+    keep = rng.random(num_people) > 0.1
+    return detections[keep], trackers
+
+
+def time_call(func, detections, trackers, repeats: int) -> float:
+    """Median wall time of func in milliseconds."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(detections, trackers)
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return float(np.median(timings))
+
+
+def main():
+    rng = np.random.default_rng(42)
+    print(f"{'detections':>10}{'legacy ms':>12}{'dense ms':>12}{'gated ms':>12}{'dense x':>10}{'gated x':>10}")
+    print("-" * 66)
+    for num_people in (50, 200, 500, 1000):
+        detections, trackers = crowd_frame(num_people, rng)
+
+        # All versions must agree on the matching
+        new = associate_detections_to_trackers(detections, trackers)
+        old = legacy_associate(detections, trackers)
+        gated = associate_detections_to_trackers_gated(detections, trackers)
+        assert sorted(map(tuple, new[0])) == sorted(map(tuple, old[0])) == sorted(map(tuple, gated[0]))
+        assert sorted(new[1]) == sorted(old[1]) and sorted(new[2]) == sorted(old[2])
+
+        repeats = 50 if num_people < 500 else 10
+        legacy_ms = time_call(legacy_associate, detections, trackers, repeats)
+        dense_ms = time_call(associate_detections_to_trackers, detections, trackers, repeats)
+        gated_ms = time_call(associate_detections_to_trackers_gated, detections, trackers, repeats)
+        print(f"{len(detections):>10}{legacy_ms:>12.3f}{dense_ms:>12.3f}{gated_ms:>12.3f}"
+              f"{legacy_ms / dense_ms:>9.1f}x{legacy_ms / gated_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
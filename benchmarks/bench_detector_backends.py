@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark detector backends (PyTorch vs ONNX Runtime vs OpenVINO, FP32/INT8).
+Reports per-frame latency and person recall measured against the PyTorch
+detections on the same clips.
+
+Usage (from the repository root):
+    python benchmarks/bench_detector_backends.py --clips footage/gate3.mp4 footage/stills/
+    python benchmarks/bench_detector_backends.py --backends onnx openvino --int8 --calibration footage/stills/
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.append(SRC_DIR)
+INVOCATION_DIR = os.getcwd()
+os.chdir(SRC_DIR)  # model paths in config.py are relative to src/
+
+from engine.detection import PersonDetector
+from engine.export import load_calibration_frames, exported_model_path, export_detector
+from engine.tracking import iou_batch, linear_assignment
+from demo_scenarios import DemoScenarioGenerator
+from config import VIDEO_RESOLUTION, YOLO_MODEL_PATH
+
+
+def synthetic_clip(num_frames: int):
+    """Frames from the demo scenarios, used when no footage is given."""
+    generator = DemoScenarioGenerator(VIDEO_RESOLUTION)
+    scenarios = [generator.create_normal_crowd_scenario, generator.create_warning_crowd_scenario,
+                 generator.create_critical_crowd_scenario, generator.create_stampede_scenario]
+    frames = []
+    for i in range(num_frames):
+        generator.frame_count = i
+        frames.append(scenarios[i % len(scenarios)]())
+    return frames
+
+
+def matched_count(reference: np.ndarray, candidate: np.ndarray, iou_threshold: float = 0.5) -> int:
+    """Number of reference boxes matched by a candidate box with IoU >= iou_threshold."""
+    if len(reference) == 0 or len(candidate) == 0:
+        return 0
+    iou = iou_batch(reference[:, :4], candidate[:, :4])
+    pairs = linear_assignment(-iou)
+    return int(sum(iou[r, c] >= iou_threshold for r, c in pairs))
+
+
+def run_backend(detector: PersonDetector, frames, warmup: int = 3):
+    """Run a detector over all frames, returning detections and per-frame latencies in ms."""
+    for frame in frames[:warmup]:
+        detector.detect_persons_array(frame)
+
+    detections, latencies = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        detections.append(detector.detect_persons_array(frame))
+        latencies.append((time.perf_counter() - start) * 1000.0)
+    return detections, np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Argus detector backends")
+    parser.add_argument("--clips", nargs="*", default=[], help="Video files or image directories")
+    parser.add_argument("--frames", type=int, default=100, help="Frames per clip")
+    parser.add_argument("--backends", nargs="+", default=["onnx", "openvino"],
+                        choices=["onnx", "openvino"])
+    parser.add_argument("--int8", action="store_true", help="Also benchmark INT8 variants")
+    parser.add_argument("--calibration", help="Video file or image directory for INT8 calibration")
+    args = parser.parse_args()
+    args.clips = [os.path.join(INVOCATION_DIR, clip) for clip in args.clips]
+    if args.calibration:
+        args.calibration = os.path.join(INVOCATION_DIR, args.calibration)
+
+    frames = []
+    for clip in args.clips:
+        frames.extend(load_calibration_frames(clip, args.frames))
+    if not frames:
+        print("No clips given - using synthetic demo scenario frames")
+        frames = synthetic_clip(args.frames)
+    print(f"Benchmarking on {len(frames)} frames")
+
+    variants = [("pytorch", False)]
+    for backend in args.backends:
+        variants.append((backend, False))
+        if args.int8:
+            variants.append((backend, True))
+
+    reference = None
+    rows = []
+    for backend, int8 in variants:
+        if int8 and not os.path.exists(exported_model_path(YOLO_MODEL_PATH, backend, int8)):
+            calibration = args.calibration or (args.clips[0] if args.clips else None)
+            if calibration is None:
+                print(f"Skipping {backend} INT8: pass --calibration or --clips for calibration")
+                continue
+            export_detector(YOLO_MODEL_PATH, backend, True, calibration)
+
+        detector = PersonDetector(backend=backend, int8=int8)
+        if detector.backend != backend:
+            print(f"Skipping {backend}: backend unavailable")
+            continue
+
+        detections, latencies = run_backend(detector, frames)
+        if reference is None:
+            reference = detections
+
+        total_ref = sum(len(d) for d in reference)
+        matched = sum(matched_count(r, d) for r, d in zip(reference, detections))
+        recall = matched / total_ref if total_ref else float('nan')
+        rows.append((f"{backend}{'-int8' if int8 else ''}", latencies.mean(),
+                     np.percentile(latencies, 95), recall, sum(len(d) for d in detections)))
+
+    print("")
+    print(f"{'backend':<16}{'mean ms':>10}{'p95 ms':>10}{'recall':>10}{'persons':>10}")
+    print("-" * 56)
+    for name, mean_ms, p95_ms, recall, persons in rows:
+        print(f"{name:<16}{mean_ms:>10.1f}{p95_ms:>10.1f}{recall:>10.3f}{persons:>10}")
+    print("\nRecall is measured against the PyTorch detections (IoU >= 0.5).")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,20 +3,119 @@ Configuration constants for The Argus Protocol.
 All constants and thresholds are defined here to avoid hardcoding values elsewhere.
 """
 
+import os
+
 # --- Model & Video Config ---
 YOLO_MODEL_PATH = "data/models/yolov8n.pt"
 VIDEO_RESOLUTION = (640, 480)  # W, H
 PROCESSING_FPS = 15
 
+# Video source: webcam index, video file, RTSP/HTTP URL or directory of images
+VIDEO_SOURCE = os.getenv('ARGUS_VIDEO_SOURCE', '0')
+SOURCE_RECONNECT_INITIAL_S = 0.5  # first reconnect delay, doubled after every failure
+SOURCE_RECONNECT_MAX_S = 30.0
+SOURCE_LOOP_FILES = True  # replay files and image directories like a live camera
+# Cameras registered at startup, e.g. "gate1=rtsp://10.0.0.5/stream,lobby=1"
+CAMERAS = os.getenv('ARGUS_CAMERAS', '')
+
+# Detector backend: "pytorch", "onnx" (ONNX Runtime) or "openvino".
+# Non-PyTorch backends are exported once from YOLO_MODEL_PATH on first use.
+DETECTOR_BACKEND = os.getenv('ARGUS_DETECTOR_BACKEND', 'pytorch')
+DETECTOR_INT8 = os.getenv('ARGUS_DETECTOR_INT8', '0') == '1'
+# Video file or image directory from our own footage, used to calibrate INT8 export
+DETECTOR_CALIBRATION_SOURCE = os.getenv('ARGUS_DETECTOR_CALIBRATION', '')
+DETECTOR_IMAGE_SIZE = 640  # square input size of exported models
+
+# Sliced (tiled) inference on native-resolution frames for dense, distant crowds
+TILED_INFERENCE = os.getenv('ARGUS_TILED_INFERENCE', '0') == '1'
+TILE_SIZE = 640  # px, square tiles cut from the native frame
+TILE_OVERLAP = 0.2  # fraction of a tile shared with its neighbour
+TILE_NMS_IOU_THRESHOLD = 0.5  # cross-tile duplicate suppression (intersection over smaller box)
+TILE_MOTION_THRESHOLD = 2.0  # mean abs gray difference (0-255) for a tile to count as moving
+TILE_REFRESH_INTERVAL = 15  # frames a static tile may reuse its detections
+TILE_INCLUDE_FULL_FRAME = True  # also run a downscaled full-frame view for close, large people
+
+# Adaptive detection: run YOLO every N frames (or on sudden motion) and let SORT
+# predict in between. N shrinks from MAX to MIN as crowd kinetic energy rises.
+ADAPTIVE_DETECTION = os.getenv('ARGUS_ADAPTIVE_DETECTION', '0') == '1'
+DETECTION_MIN_INTERVAL = 1  # frames, used for fast-moving crowds
+DETECTION_MAX_INTERVAL = 5  # frames, used for static scenes
+DETECTION_MOTION_THRESHOLD = 6.0  # mean abs gray difference (0-255) that forces detection
+DETECTION_KE_REFERENCE = 1.0  # kinetic energy at which the interval is halved
+
+# Micro-batching: frames from several streams are grouped into one forward pass
+DETECTION_MAX_BATCH_SIZE = 8  # frames per batch
+DETECTION_BATCH_DEADLINE_MS = 20  # max wait for a batch to fill
+# Detector instances shared by all registered cameras (engine/cameras.py)
+DETECTOR_POOL_SIZE = int(os.getenv('ARGUS_DETECTOR_POOL_SIZE', '1'))
+# Camera worker mode: "thread" runs every registered camera's pipeline in the server
+# process; "process" gives each camera its own worker process (engine/workers.py),
+# fed through shared-memory ring buffers, so cameras scale across cores
+CAMERA_WORKER_MODE = os.getenv('ARGUS_WORKER_MODE', 'thread')
+WORKER_RING_SLOTS = 4  # frames buffered in each shared-memory ring
+
+# Stage-parallel pipeline (engine/pipelined.py): one worker thread per stage,
+# connected by bounded queues. Policy when a queue is full:
+# "drop_oldest" (keep latency low), "drop_newest" or "block" (keep every frame)
+PIPELINE_QUEUE_SIZE = 2  # frames buffered between two stages
+PIPELINE_QUEUE_POLICY = os.getenv('ARGUS_PIPELINE_QUEUE_POLICY', 'drop_oldest')
+# Run each capture hub's frames through the stage-parallel executor instead of
+# process_frame, so detection of frame N+1 overlaps tracking/drawing of frame N
+PIPELINED_EXECUTION = os.getenv('ARGUS_PIPELINED', '0') == '1'
+
+# Optical-flow motion field (engine/motion_field.py): measures coherence and kinetic
+# energy from pixels when too few people are tracked (e.g. detector saturated)
+MOTION_FIELD = os.getenv('ARGUS_MOTION_FIELD', '0') == '1'
+MOTION_FIELD_METHOD = os.getenv('ARGUS_MOTION_FIELD_METHOD', 'dis')  # "dis" or "farneback"
+MOTION_FIELD_BUDGET_MS = 4.0  # target flow time per frame; working width adapts to it
+MOTION_FIELD_MIN_WIDTH = 80  # px
+MOTION_FIELD_MAX_WIDTH = 320  # px
+MOTION_FIELD_DIRECTION_BINS = 8  # direction histogram bins per grid cell
+MOTION_FIELD_MIN_SPEED = 0.5  # px/frame at processing resolution for a pixel to count as moving
+MOTION_FIELD_MIN_TRACKS = 3  # below this many moving tracks, flow replaces track velocities
+MOTION_FIELD_RELEASE_TRACKS = 5  # once on flow, switch back only when this many tracks move
+
+# --- Tracking Config ---
+# "vectorized" keeps all Kalman filters in stacked NumPy arrays (engine/vectorized_tracking.py);
+# "sort" uses one cv2.KalmanFilter per track (engine/tracking.py)
+TRACKER_IMPLEMENTATION = os.getenv('ARGUS_TRACKER', 'vectorized')
+
+# Association: "dense" (full IoU matrix + Hungarian), "gated" (spatial grid, IoU only for
+# nearby pairs, assignment per connected component) or "auto" (gated for large problems)
+TRACKER_ASSOCIATION = os.getenv('ARGUS_TRACKER_ASSOCIATION', 'auto')
+TRACKER_GATING_MIN_PAIRS = 10000  # detections x tracks at which "auto" switches to gated
+
+# ByteTrack-style two-stage association: detections scoring between LOW and HIGH are
+# matched only against tracks left over after the first pass and never start new tracks
+TRACKER_HIGH_SCORE_THRESHOLD = 0.5
+TRACKER_LOW_SCORE_THRESHOLD = 0.1
+TRACKER_SECOND_IOU_THRESHOLD = 0.5
+
 # --- Analytics Config ---
 # For Density Calculation
-# Assuming a fixed camera angle where 1 grid cell ~ 1 sq. meter
+# Uncalibrated cameras assume a fixed camera angle where 1 grid cell ~ 1 sq. meter
+# (see CALIBRATION_FILE below for metric density)
 DENSITY_GRID_SIZE = (10, 10)  # 10x10 grid over the frame
+# Extra grids computed in the same pass (engine/density.py), e.g. ARGUS_DENSITY_PYRAMID="5x5,20x20"
+DENSITY_PYRAMID_LEVELS = [tuple(int(n) for n in size.lower().split('x'))
+                          for size in os.getenv('ARGUS_DENSITY_PYRAMID', '').split(',') if size.strip()]
+# Gaussian smoothing of the finest density grid, sigma in cells (0 disables)
+DENSITY_SMOOTHING_SIGMA = float(os.getenv('ARGUS_DENSITY_SMOOTHING', '0'))
+# Ground-plane calibration (engine/calibration.py): a JSON file with an image->ground
+# homography, or >= 4 image/ground point pairs in metres. When set, density is also
+# measured in persons/m² on a metric grid and the GROUND_* thresholds drive the status
+CALIBRATION_FILE = os.getenv('ARGUS_CALIBRATION', '')
+GROUND_CELL_SIZE_M = 1.0  # side of a metric density cell
+GROUND_MAX_RANGE_M = 30.0  # ignore ground farther than this from the bottom of the image
+GROUND_MIN_VISIBLE_FRACTION = 0.25  # density denominator floor for barely visible cells
 
 # --- Prediction Thresholds ---
 # Density (persons/grid_cell)
 DENSITY_THRESHOLD_WARNING = 4.0
 DENSITY_THRESHOLD_CRITICAL = 6.0
+# Ground-plane density (persons/m²), the same for every calibrated camera
+GROUND_DENSITY_THRESHOLD_WARNING = 4.0
+GROUND_DENSITY_THRESHOLD_CRITICAL = 6.0
 
 # Motion Coherence (Standard deviation of angles in degrees)
 # Higher value means more chaotic movement
@@ -27,13 +126,41 @@ COHERENCE_THRESHOLD_CRITICAL = 65.0
 # This requires a baseline; we check for spikes
 KE_SPIKE_FACTOR = 2.0  # A 2x spike over moving average is a warning
 KE_MOVING_AVG_WINDOW = 45  # frames (3 seconds @ 15fps)
+# Incremental KE baselines (engine/running_stats.py), updated in O(1) per frame:
+# window name -> length in seconds, plus an exponentially weighted average
+KE_BASELINE_WINDOWS = {'1s': 1.0, '3s': 3.0, '30s': 30.0, '5min': 300.0}
+KE_EWMA_HALF_LIFE_S = 10.0
+# Also flag a spike when KE is this many standard deviations above the
+# KE_SPIKE_BASELINE window (std floored at KE_ZSCORE_MIN_STD for still scenes)
+KE_SPIKE_ZSCORE = 3.0
+KE_SPIKE_BASELINE = '30s'
+KE_ZSCORE_MIN_STD = 0.05
+
+# Per-cell coherence and KE maps: a cell needs this many moving tracks (or this
+# fraction of moving flow pixels) before its local values can raise the status
+LOCAL_MIN_TRACKS = 3
+LOCAL_MIN_ACTIVE_FRACTION = 0.1
+
+# Short-horizon forecasting (engine/forecasting.py): Holt linear-trend models on the
+# density, coherence and KE series plus track extrapolation for per-cell density,
+# reported as predicted time-to-threshold in the analytics payload
+FORECASTING = os.getenv('ARGUS_FORECASTING', '1') == '1'
+FORECAST_HORIZONS_S = (5.0, 15.0, 30.0)  # the largest also bounds reported times-to-threshold
+FORECAST_LEVEL_ALPHA = 0.2
+FORECAST_TREND_BETA = 0.05
+FORECAST_MIN_SAMPLES = 30  # frames before series forecasts are reported (2 seconds @ 15fps)
 
 # --- Server Config ---
-import os
 BACKEND_HOST = os.getenv('ARGUS_HOST', '127.0.0.1')
 BACKEND_PORT = int(os.getenv('ARGUS_PORT', '8000'))
 WEBSOCKET_ENDPOINT = "/ws"
 VIDEO_STREAM_ENDPOINT = "/video_stream"
+JPEG_QUALITY = 80
+# Capture hub: each source is captured and processed once and fanned out to all
+# clients; a slow client's queue drops its oldest frames beyond this depth
+HUB_SUBSCRIBER_QUEUE_SIZE = 2
+# Analytics-only node: never draw annotated frames or encode JPEGs
+HEADLESS = os.getenv('ARGUS_HEADLESS', '0') == '1'
 
 # --- Status Levels ---
 STATUS_NORMAL = "NORMAL"
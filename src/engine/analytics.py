@@ -7,212 +7,485 @@ Analytics module for calculating the three core metrics:
 
 import numpy as np
 import math
-from typing import List, Dict, Tuple, Optional
-from collections import deque
+from typing import List, Dict, Tuple, Optional, Union
 import sys
 import os
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from engine.density import DensityMapper, bbox_centers
+from engine.tracking import TrackSnapshot
+from engine.running_stats import RollingStats, EWMAStats, MultiWindowBaseline
+from engine.calibration import GroundPlaneCalibration
+from engine.forecasting import CrowdForecaster
 from config import (
-    DENSITY_GRID_SIZE, VIDEO_RESOLUTION,
     DENSITY_THRESHOLD_WARNING, DENSITY_THRESHOLD_CRITICAL,
+    GROUND_DENSITY_THRESHOLD_WARNING, GROUND_DENSITY_THRESHOLD_CRITICAL,
     COHERENCE_THRESHOLD_WARNING, COHERENCE_THRESHOLD_CRITICAL,
-    KE_SPIKE_FACTOR, KE_MOVING_AVG_WINDOW,
+    KE_SPIKE_FACTOR, KE_MOVING_AVG_WINDOW, KE_SPIKE_ZSCORE, KE_SPIKE_BASELINE, PROCESSING_FPS,
+    MOTION_FIELD_MIN_TRACKS, MOTION_FIELD_RELEASE_TRACKS, KE_EWMA_HALF_LIFE_S, KE_ZSCORE_MIN_STD,
+    LOCAL_MIN_TRACKS, LOCAL_MIN_ACTIVE_FRACTION, VIDEO_RESOLUTION, DENSITY_GRID_SIZE, FORECASTING,
     STATUS_NORMAL, STATUS_WARNING, STATUS_CRITICAL
 )
 
+# Where coherence and kinetic energy come from. Track KE averages over every
+# tracked person, flow KE over moving pixels only, so each source keeps its own
+# KE statistics and samples of one are never compared against the other
+MOTION_SOURCES = ("tracks", "flow")
+
+
+def circular_std_degrees(mean_x: float, mean_y: float) -> float:
+    """
+    Circular standard deviation of directions from their mean unit vector
+    
+    Args:
+        mean_x, mean_y: Mean of the unit direction vectors
+        
+    Returns:
+        Approximate angular standard deviation in degrees
+    """
+    R = math.sqrt(mean_x*mean_x + mean_y*mean_y)
+    circular_variance = 1 - R
+    if circular_variance <= 0:
+        return 0.0
+    return float(math.degrees(math.sqrt(2 * circular_variance)))
+
+
+def circular_std_grid(mean_x: np.ndarray, mean_y: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """
+    circular_std_degrees for many groups at once
+    
+    Args:
+        mean_x, mean_y: Per-group means of unit direction vectors
+        valid: Per-group flag; invalid groups (e.g. fewer than two vectors) get 0
+        
+    Returns:
+        Per-group angular standard deviation in degrees
+    """
+    std = np.degrees(np.sqrt(2 * np.clip(1 - np.hypot(mean_x, mean_y), 0.0, None)))
+    return np.where(valid, std, 0.0)
+
 
 class CrowdAnalytics:
     """
     Main analytics class for calculating crowd safety metrics
     """
     
-    def __init__(self):
-        """Initialize the analytics engine"""
-        self.kinetic_energy_history = deque(maxlen=KE_MOVING_AVG_WINDOW)
-        self.frame_count = 0
+    def __init__(self, density_mapper: Optional[DensityMapper] = None,
+                 calibration: Optional[GroundPlaneCalibration] = None, forecasting: bool = FORECASTING):
+        """
+        Initialize the analytics engine
         
-    def calculate_crowd_density(self, tracker_info: List[Dict]) -> Tuple[float, np.ndarray]:
+        Args:
+            density_mapper: Density grid configuration; defaults to DENSITY_GRID_SIZE
+                plus the configured pyramid levels and smoothing
+            calibration: Optional ground-plane calibration of this camera; when set,
+                density is also measured in persons/m² and drives the status
+            forecasting: Forecast the metrics and report predicted time-to-threshold
         """
-        Calculate crowd density as number of persons per grid cell
+        self.motion_source = "tracks"
+        self.ke_histories = {source: RollingStats(KE_MOVING_AVG_WINDOW) for source in MOTION_SOURCES}
+        self.ke_baselines = {source: MultiWindowBaseline() for source in MOTION_SOURCES}
+        self.cell_ke_baselines = {source: EWMAStats.from_half_life(KE_EWMA_HALF_LIFE_S * PROCESSING_FPS)
+                                  for source in MOTION_SOURCES}
+        self.ke_zscore = 0.0
+        self.frame_count = 0
+        self.density_mapper = density_mapper or DensityMapper()
+        self.calibration = calibration
+        self.forecaster = CrowdForecaster() if forecasting else None
+    
+    @property
+    def kinetic_energy_history(self) -> RollingStats:
+        """KE moving-average window of the current motion source"""
+        return self.ke_histories[self.motion_source]
+    
+    @property
+    def ke_baseline(self) -> MultiWindowBaseline:
+        """KE baselines of the current motion source"""
+        return self.ke_baselines[self.motion_source]
+    
+    @property
+    def cell_ke_baseline(self) -> EWMAStats:
+        """Per-cell KE baseline of the current motion source"""
+        return self.cell_ke_baselines[self.motion_source]
+    
+    def select_motion_source(self, moving_tracks: int, motion: Optional[Dict]) -> str:
+        """
+        Choose between track velocities and the optical-flow motion field
+        
+        Flow takes over below MOTION_FIELD_MIN_TRACKS moving tracks and hands
+        back only at MOTION_FIELD_RELEASE_TRACKS, so a count hovering around the
+        limit does not flip the source every few frames. A switch restarts the
+        kinetic energy forecast, whose scale depends on the source.
         
         Args:
-            tracker_info: List of tracker dictionaries with bbox information
+            moving_tracks: Number of tracks moving this frame
+            motion: MotionField.compute result, or None without a motion field
             
         Returns:
-            Tuple of (max_density, density_grid)
+            "tracks" or "flow"
         """
-        # Create density grid
-        grid_height, grid_width = DENSITY_GRID_SIZE
-        density_grid = np.zeros((grid_height, grid_width))
-        
-        # Calculate grid cell dimensions
-        cell_width = VIDEO_RESOLUTION[0] / grid_width
-        cell_height = VIDEO_RESOLUTION[1] / grid_height
+        if motion is None:
+            source = "tracks"
+        elif self.motion_source == "flow":
+            source = "tracks" if moving_tracks >= MOTION_FIELD_RELEASE_TRACKS else "flow"
+        else:
+            source = "flow" if moving_tracks < MOTION_FIELD_MIN_TRACKS else "tracks"
+        if source != self.motion_source and self.forecaster is not None:
+            self.forecaster.reset_series('kinetic_energy')
+        self.motion_source = source
+        return source
+    
+    @staticmethod
+    def as_snapshot(tracks: Union[TrackSnapshot, List[Dict]]) -> TrackSnapshot:
+        """
+        Accept either a columnar TrackSnapshot or a list of tracker dictionaries
         
-        # Count persons in each grid cell
-        for tracker in tracker_info:
-            bbox = tracker['bbox']
-            # Use center of bounding box
-            center_x = (bbox[0] + bbox[2]) / 2
-            center_y = (bbox[1] + bbox[3]) / 2
+        Args:
+            tracks: Tracker.get_snapshot() result or get_trackers()-style dictionaries
             
-            # Convert to grid coordinates
-            grid_x = int(center_x / cell_width)
-            grid_y = int(center_y / cell_height)
+        Returns:
+            TrackSnapshot
+        """
+        if isinstance(tracks, TrackSnapshot):
+            return tracks
+        return TrackSnapshot.from_dicts(tracks)
+    
+    def compute_density_maps(self, tracks: Union[TrackSnapshot, List[Dict]],
+                             frame_size: Optional[Tuple[int, int]] = None) -> Dict:
+        """
+        Compute every configured density grid in one pass
+        
+        Args:
+            tracks: Active tracks (TrackSnapshot or tracker dictionaries)
+            frame_size: (W, H) of the analysed frame; defaults to VIDEO_RESOLUTION
             
-            # Ensure within bounds
-            grid_x = max(0, min(grid_width - 1, grid_x))
-            grid_y = max(0, min(grid_height - 1, grid_y))
+        Returns:
+            DensityMapper.compute result ('grid', 'levels', 'smoothed')
+        """
+        return self.density_mapper.compute(self.as_snapshot(tracks).bboxes, frame_size)
+        
+    def calculate_crowd_density(self, tracks: Union[TrackSnapshot, List[Dict]],
+                                frame_size: Optional[Tuple[int, int]] = None) -> Tuple[float, np.ndarray]:
+        """
+        Calculate crowd density as number of persons per grid cell
+        
+        Args:
+            tracks: Active tracks (TrackSnapshot or tracker dictionaries)
+            frame_size: (W, H) of the analysed frame; defaults to VIDEO_RESOLUTION
             
-            density_grid[grid_y, grid_x] += 1
+        Returns:
+            Tuple of (max_density, density_grid)
+        """
+        density_grid = self.compute_density_maps(tracks, frame_size)['grid']
+        return float(np.max(density_grid)), density_grid
+    
+    def calculate_ground_density(self, tracks: Union[TrackSnapshot, List[Dict]],
+                                 frame_size: Optional[Tuple[int, int]] = None) -> Optional[Dict]:
+        """
+        Calculate crowd density in persons/m² on the calibrated metric grid
         
-        # Return maximum density and the grid
-        max_density = np.max(density_grid)
-        return float(max_density), density_grid
+        Args:
+            tracks: Active tracks (TrackSnapshot or tracker dictionaries)
+            frame_size: (W, H) of the analysed frame; defaults to the calibration size
+            
+        Returns:
+            GroundPlaneCalibration.density result, or None without a calibration
+        """
+        if self.calibration is None:
+            return None
+        return self.calibration.density(self.as_snapshot(tracks).bboxes, frame_size)
     
-    def calculate_motion_coherence(self, tracker_info: List[Dict]) -> float:
+    def calculate_motion_coherence(self, tracks: Union[TrackSnapshot, List[Dict]]) -> float:
         """
         Calculate motion coherence as standard deviation of motion vector angles
         
         Args:
-            tracker_info: List of tracker dictionaries with velocity information
+            tracks: Active tracks (TrackSnapshot or tracker dictionaries)
             
         Returns:
             Standard deviation of motion angles in degrees
         """
-        if len(tracker_info) < 2:
-            return 0.0
+        velocities = self.as_snapshot(tracks).velocities
         
-        angles = []
-        for tracker in tracker_info:
-            velocity = tracker['velocity']
-            vx, vy = velocity[0], velocity[1]
-            
-            # Calculate angle only if there's significant movement
-            speed = math.sqrt(vx*vx + vy*vy)
-            if speed > 0.1:  # Minimum speed threshold
-                angle = math.atan2(vy, vx)
-                angles.append(angle)
-        
-        if len(angles) < 2:
+        # Only tracks with significant movement have a meaningful direction
+        speeds = np.hypot(velocities[:, 0], velocities[:, 1])
+        moving = speeds > 0.1  # Minimum speed threshold
+        if np.count_nonzero(moving) < 2:
             return 0.0
         
-        # Convert to degrees and calculate standard deviation
-        angles_deg = [math.degrees(angle) for angle in angles]
-        
-        # Handle angle wraparound (circular statistics)
-        # Convert to unit vectors and calculate circular standard deviation
-        x_components = [math.cos(angle) for angle in angles]
-        y_components = [math.sin(angle) for angle in angles]
-        
-        mean_x = np.mean(x_components)
-        mean_y = np.mean(y_components)
-        
-        # Calculate circular variance
-        R = math.sqrt(mean_x*mean_x + mean_y*mean_y)
-        circular_variance = 1 - R
+        # Handle angle wraparound (circular statistics): mean resultant length
+        # of the unit direction vectors
+        mean_x, mean_y = (velocities[moving] / speeds[moving, None]).mean(axis=0)
+        return circular_std_degrees(mean_x, mean_y)
+    
+    @staticmethod
+    def calculate_flow_coherence(motion: Dict) -> float:
+        """
+        Motion coherence from an optical-flow motion field
         
-        # Convert to standard deviation in degrees
-        if circular_variance <= 0:
+        Args:
+            motion: MotionField.compute result
+            
+        Returns:
+            Standard deviation of flow directions of moving pixels, in degrees
+        """
+        if motion['moving_pixels'] < 2:
             return 0.0
-        
-        # Approximate conversion to degrees
-        coherence_std = math.degrees(math.sqrt(2 * circular_variance))
-        
-        return float(coherence_std)
+        return circular_std_degrees(*motion['resultant'])
     
-    def calculate_kinetic_energy(self, tracker_info: List[Dict]) -> Tuple[float, float, bool]:
+    def calculate_kinetic_energy(self, tracks: Union[TrackSnapshot, List[Dict]]) -> Tuple[float, float, bool]:
         """
         Calculate kinetic energy as average magnitude of motion vectors
         
+        A spike is either a KE_SPIKE_FACTOR jump over the moving average, or a
+        z-score of at least KE_SPIKE_ZSCORE against the KE_SPIKE_BASELINE window
+        (scored before the current value joins the baseline). All baselines are
+        updated incrementally in constant time per frame.
+        
         Args:
-            tracker_info: List of tracker dictionaries with velocity information
+            tracks: Active tracks (TrackSnapshot or tracker dictionaries)
             
         Returns:
             Tuple of (current_ke, moving_average_ke, is_spike)
         """
-        if len(tracker_info) == 0:
+        velocities = self.as_snapshot(tracks).velocities
+        if len(velocities) == 0:
             current_ke = 0.0
         else:
-            # Calculate average kinetic energy (proportional to velocity squared)
-            total_ke = 0.0
-            for tracker in tracker_info:
-                velocity = tracker['velocity']
-                vx, vy = velocity[0], velocity[1]
-                ke = (vx*vx + vy*vy) / 2.0  # Simplified kinetic energy
-                total_ke += ke
-            
-            current_ke = total_ke / len(tracker_info)
+            # Average kinetic energy (proportional to velocity squared)
+            current_ke = float(np.einsum('ij,ij->', velocities, velocities)) / (2.0 * len(velocities))
+        return self.update_kinetic_energy(current_ke)
+    
+    def update_kinetic_energy(self, current_ke: float) -> Tuple[float, float, bool]:
+        """
+        Add a kinetic energy sample to the baselines and check it for a spike
         
-        # Add to history
-        self.kinetic_energy_history.append(current_ke)
+        The sample joins the statistics of the current motion source only.
         
-        # Calculate moving average
-        if len(self.kinetic_energy_history) > 0:
-            moving_avg = np.mean(self.kinetic_energy_history)
-        else:
-            moving_avg = current_ke
+        Args:
+            current_ke: Kinetic energy of this frame (from tracks or optical flow)
+            
+        Returns:
+            Tuple of (current_ke, moving_average_ke, is_spike)
+        """
+        # Score against the long baselines before updating them
+        baseline_samples = self.ke_baseline.windows[KE_SPIKE_BASELINE].count
+        self.ke_zscore = self.ke_baseline.zscore(current_ke, KE_SPIKE_BASELINE)
+        self.ke_baseline.add(current_ke)
+        
+        # Add to history and update the moving average
+        self.kinetic_energy_history.add(current_ke)
+        moving_avg = float(self.kinetic_energy_history.mean)
         
         # Check for spike
         is_spike = False
         if moving_avg > 0 and len(self.kinetic_energy_history) >= 10:
             spike_threshold = moving_avg * KE_SPIKE_FACTOR
-            is_spike = current_ke > spike_threshold
+            is_spike = bool(current_ke > spike_threshold)
+        if baseline_samples >= PROCESSING_FPS and self.ke_zscore >= KE_SPIKE_ZSCORE:
+            is_spike = True
+        
+        return float(current_ke), moving_avg, is_spike
+    
+    def calculate_cell_motion(self, snapshot: TrackSnapshot, frame_size: Optional[Tuple[int, int]] = None,
+                              motion: Optional[Dict] = None) -> Dict:
+        """
+        Per-cell motion coherence and kinetic energy on the primary density grid
+        
+        Tracks are grouped by the cell of their box center and each statistic is
+        one np.bincount over the cell indices. With a motion field of the same
+        grid size, the flow's per-cell values are used instead.
         
-        return float(current_ke), float(moving_avg), is_spike
+        Args:
+            snapshot: Active tracks
+            frame_size: (W, H) of the analysed frame; defaults to VIDEO_RESOLUTION
+            motion: Optional MotionField.compute result to take the maps from
+            
+        Returns:
+            Dictionary with 'coherence' and 'kinetic_energy' grids and 'eligible',
+            a boolean grid of cells with enough motion to be trusted
+        """
+        grid_size = self.density_mapper.grid_size
+        if motion is not None and tuple(motion['grid_size']) == grid_size:
+            resultant = motion['resultant_grid']
+            moving = motion['active_fraction'] > 0
+            coherence = circular_std_grid(resultant[..., 0], resultant[..., 1], moving)
+            return {'coherence': coherence, 'kinetic_energy': motion['kinetic_energy_grid'],
+                    'eligible': motion['active_fraction'] >= LOCAL_MIN_ACTIVE_FRACTION}
+        
+        rows, cols = grid_size
+        num_cells = rows * cols
+        cells = self.density_mapper.cell_index(bbox_centers(snapshot.bboxes), grid_size,
+                                               tuple(frame_size or VIDEO_RESOLUTION))
+        velocities = snapshot.velocities
+        speeds = np.hypot(velocities[:, 0], velocities[:, 1])
+        moving = speeds > 0.1
+        moving_cells = cells[moving]
+        units = velocities[moving] / speeds[moving, None]
+        
+        tracks_per_cell = np.bincount(cells, minlength=num_cells)
+        moving_per_cell = np.bincount(moving_cells, minlength=num_cells)
+        energy = np.bincount(cells, weights=speeds ** 2 / 2.0, minlength=num_cells)
+        kinetic_energy = np.divide(energy, tracks_per_cell, out=np.zeros(num_cells), where=tracks_per_cell > 0)
+        divisor = np.maximum(moving_per_cell, 1)
+        coherence = circular_std_grid(np.bincount(moving_cells, weights=units[:, 0], minlength=num_cells) / divisor,
+                                      np.bincount(moving_cells, weights=units[:, 1], minlength=num_cells) / divisor,
+                                      moving_per_cell >= 2)
+        return {'coherence': coherence.reshape(rows, cols), 'kinetic_energy': kinetic_energy.reshape(rows, cols),
+                'eligible': (moving_per_cell >= LOCAL_MIN_TRACKS).reshape(rows, cols)}
+    
+    def detect_local_ke_spikes(self, cell_motion: Dict, moving_avg: float) -> np.ndarray:
+        """
+        Find cells whose kinetic energy jumps above their own history
+        
+        A cell spikes when it is eligible, its KE z-score against its own EWMA
+        baseline reaches KE_SPIKE_ZSCORE, and its KE exceeds KE_SPIKE_FACTOR times
+        the frame-wide moving average (so people simply walking into an empty
+        cell do not count). The per-cell baselines are updated afterwards.
+        
+        Args:
+            cell_motion: calculate_cell_motion result
+            moving_avg: Frame-wide KE moving average
+            
+        Returns:
+            Boolean grid of spiking cells
+        """
+        kinetic_energy = cell_motion['kinetic_energy']
+        baseline = self.cell_ke_baseline
+        spikes = np.zeros(kinetic_energy.shape, dtype=bool)
+        if baseline.count >= PROCESSING_FPS and np.shape(baseline.mean) == kinetic_energy.shape:
+            zscores = (kinetic_energy - baseline.mean) / np.maximum(baseline.std, KE_ZSCORE_MIN_STD)
+            spikes = (cell_motion['eligible'] & (zscores >= KE_SPIKE_ZSCORE) &
+                      (kinetic_energy > KE_SPIKE_FACTOR * max(moving_avg, KE_ZSCORE_MIN_STD)))
+        baseline.add(kinetic_energy)
+        return spikes
     
-    def determine_status(self, density: float, coherence: float, ke_spike: bool) -> str:
+    def determine_status(self, density: float, coherence: float, ke_spike: bool,
+                         local_coherence: float = 0.0, local_ke_spike: bool = False,
+                         ground_density: Optional[float] = None) -> str:
         """
         Determine overall system status based on the three metrics
         
         Args:
-            density: Maximum crowd density
+            density: Maximum crowd density (persons per grid cell)
             coherence: Motion coherence standard deviation
             ke_spike: Whether there's a kinetic energy spike
+            local_coherence: Worst (highest) coherence of any eligible grid cell
+            local_ke_spike: Whether any grid cell has a local kinetic energy spike
+            ground_density: Maximum calibrated density in persons/m²; when given it
+                replaces the per-cell density and the GROUND_* thresholds apply
             
         Returns:
             Status string: NORMAL, WARNING, or CRITICAL
         """
+        # The worst local region counts, not just the frame average
+        coherence = max(coherence, local_coherence)
+        ke_spike = ke_spike or local_ke_spike
+        if ground_density is not None:
+            density = ground_density
+            density_warning, density_critical = GROUND_DENSITY_THRESHOLD_WARNING, GROUND_DENSITY_THRESHOLD_CRITICAL
+        else:
+            density_warning, density_critical = DENSITY_THRESHOLD_WARNING, DENSITY_THRESHOLD_CRITICAL
+        
         # Check for critical conditions
-        if (density >= DENSITY_THRESHOLD_CRITICAL or 
+        if (density >= density_critical or 
             coherence >= COHERENCE_THRESHOLD_CRITICAL or
             ke_spike):
             return STATUS_CRITICAL
         
         # Check for warning conditions
-        if (density >= DENSITY_THRESHOLD_WARNING or 
+        if (density >= density_warning or 
             coherence >= COHERENCE_THRESHOLD_WARNING):
             return STATUS_WARNING
         
         return STATUS_NORMAL
     
-    def analyze_frame(self, tracker_info: List[Dict]) -> Dict:
+    def forecast_crowd_state(self, snapshot: TrackSnapshot, frame_size: Optional[Tuple[int, int]],
+                             density: float, coherence: float, ke_current: float, ke_avg: float,
+                             calibrated: bool) -> Dict:
+        """
+        Update the forecasting models and predict time-to-threshold
+        
+        Args:
+            snapshot: Active tracks, extrapolated for the per-cell density forecast
+            frame_size: (W, H) of the analysed frame
+            density: Status-driving density (persons/m² when calibrated, else per cell)
+            coherence: Frame-wide motion coherence
+            ke_current: Current kinetic energy
+            ke_avg: KE moving average; a spike threshold of KE_SPIKE_FACTOR times it
+                counts as critical, like a detected spike
+            calibrated: Whether density is the calibrated ground density
+            
+        Returns:
+            CrowdForecaster.predict result
+        """
+        self.forecaster.update(density, coherence, ke_current)
+        if calibrated:
+            density_thresholds = {'warning': GROUND_DENSITY_THRESHOLD_WARNING,
+                                  'critical': GROUND_DENSITY_THRESHOLD_CRITICAL}
+            cell_density = lambda bboxes: self.calibration.density(bboxes, frame_size)['grid']
+        else:
+            density_thresholds = {'warning': DENSITY_THRESHOLD_WARNING, 'critical': DENSITY_THRESHOLD_CRITICAL}
+            cell_density = lambda bboxes: self.density_mapper.compute(bboxes, frame_size)['grid']
+        thresholds = {
+            'density': density_thresholds,
+            'coherence': {'warning': COHERENCE_THRESHOLD_WARNING, 'critical': COHERENCE_THRESHOLD_CRITICAL}
+        }
+        if ke_avg > 0:
+            thresholds['kinetic_energy'] = {'critical': ke_avg * KE_SPIKE_FACTOR}
+        return self.forecaster.predict(snapshot, thresholds, cell_density, frame_size)
+    
+    def analyze_frame(self, tracks: Union[TrackSnapshot, List[Dict]],
+                      frame_size: Optional[Tuple[int, int]] = None, motion: Optional[Dict] = None) -> Dict:
         """
         Perform complete analysis of a frame
         
+        Coherence and kinetic energy come from track velocities, or from the
+        optical-flow motion field when fewer than MOTION_FIELD_MIN_TRACKS tracks
+        are moving (e.g. the detector loses people in a packed crowd); see
+        select_motion_source.
+        
         Args:
-            tracker_info: List of tracker dictionaries
+            tracks: Active tracks; a columnar TrackSnapshot (preferred) or tracker dictionaries
+            frame_size: (W, H) of the analysed frame; defaults to VIDEO_RESOLUTION
+            motion: Optional MotionField.compute result for this frame
             
         Returns:
             Dictionary containing all analytics results
         """
         self.frame_count += 1
+        snapshot = self.as_snapshot(tracks)
         
         # Calculate all metrics
-        density, density_grid = self.calculate_crowd_density(tracker_info)
-        coherence = self.calculate_motion_coherence(tracker_info)
-        ke_current, ke_avg, ke_spike = self.calculate_kinetic_energy(tracker_info)
+        density_maps = self.compute_density_maps(snapshot, frame_size)
+        density_grid = density_maps['grid']
+        density = float(np.max(density_grid))
+        ground = self.calculate_ground_density(snapshot, frame_size)
+        moving_tracks = int(np.count_nonzero(np.hypot(snapshot.velocities[:, 0], snapshot.velocities[:, 1]) > 0.1))
+        motion_source = self.select_motion_source(moving_tracks, motion)
+        if motion_source == "flow":
+            coherence = self.calculate_flow_coherence(motion)
+            ke_current, ke_avg, ke_spike = self.update_kinetic_energy(motion['kinetic_energy'])
+        else:
+            coherence = self.calculate_motion_coherence(snapshot)
+            ke_current, ke_avg, ke_spike = self.calculate_kinetic_energy(snapshot)
+        
+        # Per-cell maps, so a local crush is not diluted by calm areas
+        cell_motion = self.calculate_cell_motion(snapshot, frame_size, motion if motion_source == "flow" else None)
+        eligible = cell_motion['eligible']
+        worst_coherence = float(cell_motion['coherence'][eligible].max()) if eligible.any() else 0.0
+        local_spikes = self.detect_local_ke_spikes(cell_motion, ke_avg)
         
         # Determine status
-        status = self.determine_status(density, coherence, ke_spike)
+        status = self.determine_status(density, coherence, ke_spike, worst_coherence, bool(local_spikes.any()),
+                                       ground['max_density'] if ground is not None else None)
         
         # Prepare results
         results = {
             'frame_count': self.frame_count,
             'timestamp': self.frame_count / 15.0,  # Assuming 15 FPS
-            'person_count': len(tracker_info),
+            'person_count': len(snapshot),
             'density': {
                 'max_density': density,
                 'grid': density_grid.tolist(),
@@ -221,6 +494,8 @@ class CrowdAnalytics:
             },
             'motion_coherence': {
                 'std_deviation': coherence,
+                'grid': cell_motion['coherence'].tolist(),
+                'worst_cell': worst_coherence,
                 'threshold_warning': COHERENCE_THRESHOLD_WARNING,
                 'threshold_critical': COHERENCE_THRESHOLD_CRITICAL
             },
@@ -228,14 +503,71 @@ class CrowdAnalytics:
                 'current': ke_current,
                 'moving_average': ke_avg,
                 'spike_detected': ke_spike,
-                'spike_factor': KE_SPIKE_FACTOR
+                'spike_factor': KE_SPIKE_FACTOR,
+                'zscore': float(self.ke_zscore),
+                'zscore_threshold': KE_SPIKE_ZSCORE,
+                'baselines': self.ke_baseline.get_stats(),
+                'grid': cell_motion['kinetic_energy'].tolist(),
+                'local_spike': bool(local_spikes.any()),
+                'local_spike_cells': np.argwhere(local_spikes).tolist()
             },
+            'motion_source': motion_source,
             'status': status,
-            'trackers': tracker_info
+            'trackers': snapshot.to_dicts()  # JSON boundary: dictionaries built once, here
         }
         
+        # Optional extra resolutions, keyed "ROWSxCOLS"
+        if len(density_maps['levels']) > 1:
+            results['density']['pyramid'] = {f"{rows}x{cols}": grid.tolist()
+                                             for (rows, cols), grid in density_maps['levels'].items()
+                                             if (rows, cols) != self.density_mapper.grid_size}
+        if density_maps['smoothed'] is not None:
+            results['density']['smoothed_grid'] = density_maps['smoothed'].tolist()
+        if ground is not None:
+            results['density']['ground'] = {
+                'max_density': ground['max_density'],
+                'grid': ground['grid'].tolist(),
+                'counted': ground['counted'],
+                'cell_size_m': ground['cell_size_m'],
+                'origin_m': ground['origin_m'],
+                'unit': 'persons/m²',
+                'threshold_warning': GROUND_DENSITY_THRESHOLD_WARNING,
+                'threshold_critical': GROUND_DENSITY_THRESHOLD_CRITICAL
+            }
+        if motion is not None:
+            results['motion_field'] = self.summarize_motion_field(motion)
+        if self.forecaster is not None:
+            results['forecast'] = self.forecast_crowd_state(
+                snapshot, frame_size, ground['max_density'] if ground is not None else density,
+                coherence, ke_current, ke_avg, ground is not None)
+        
         return results
     
+    @staticmethod
+    def summarize_motion_field(motion: Dict) -> Dict:
+        """
+        JSON-friendly summary of a motion field
+        
+        Args:
+            motion: MotionField.compute result
+            
+        Returns:
+            Per-cell magnitude, active fraction and dominant direction (degrees,
+            -1 for cells without motion) grids plus frame-level values
+        """
+        histograms = motion['direction_histograms']
+        bins = histograms.shape[-1]
+        dominant = (histograms.argmax(axis=-1) + 0.5) * (360.0 / bins)
+        dominant[histograms.sum(axis=-1) <= 0] = -1.0
+        return {
+            'magnitude_grid': motion['magnitude'].tolist(),
+            'active_fraction_grid': motion['active_fraction'].tolist(),
+            'dominant_direction_grid': dominant.tolist(),
+            'kinetic_energy': motion['kinetic_energy'],
+            'coherence': CrowdAnalytics.calculate_flow_coherence(motion),
+            'width': motion['width']
+        }
+    
     def get_summary_stats(self) -> Dict:
         """
         Get summary statistics for the analytics session
@@ -246,7 +578,9 @@ class CrowdAnalytics:
         return {
             'total_frames': self.frame_count,
             'ke_history_length': len(self.kinetic_energy_history),
-            'ke_history': list(self.kinetic_energy_history) if self.kinetic_energy_history else []
+            'ke_history': self.kinetic_energy_history.values().tolist(),
+            'ke_baselines': self.ke_baseline.get_stats(),
+            'motion_source': self.motion_source
         }
 
 
@@ -282,6 +616,126 @@ def test_analytics():
     # Test analytics
     results = analytics.analyze_frame(test_trackers)
     
+    # The columnar snapshot gives the same results as tracker dictionaries
+    columnar = CrowdAnalytics().analyze_frame(TrackSnapshot.from_dicts(test_trackers))
+    assert columnar['motion_coherence'] == results['motion_coherence']
+    assert columnar['kinetic_energy'] == results['kinetic_energy']
+    assert [t['id'] for t in columnar['trackers']] == [1, 2, 3]
+    assert abs(results['motion_coherence']['std_deviation'] - 52.678) < 1e-3
+    assert abs(results['kinetic_energy']['current'] - 2.08333) < 1e-5
+    
+    # Z-score spike against the incremental baseline
+    spike_analytics = CrowdAnalytics()
+    rng = np.random.default_rng(0)
+    for _ in range(60):
+        calm = TrackSnapshot(np.arange(20), np.tile([100, 100, 150, 200], (20, 1)),
+                             rng.normal(0.5, 0.05, (20, 2)), np.ones(20), np.ones(20))
+        assert not spike_analytics.calculate_kinetic_energy(calm)[2]
+    rushing = TrackSnapshot(np.arange(20), np.tile([100, 100, 150, 200], (20, 1)),
+                            np.full((20, 2), 0.8), np.ones(20), np.ones(20))
+    assert spike_analytics.calculate_kinetic_energy(rushing)[2] and spike_analytics.ke_zscore >= 3.0
+    
+    # The payload stays JSON-serializable once the moving-average window is full
+    import json
+    json_analytics = CrowdAnalytics()
+    for _ in range(KE_MOVING_AVG_WINDOW + 5):
+        payload = json_analytics.analyze_frame(test_trackers)
+    assert isinstance(payload['kinetic_energy']['spike_detected'], bool)
+    json.dumps(payload)
+    
+    # With too few tracks, coherence and kinetic energy come from the motion field
+    import cv2
+    from engine.motion_field import MotionField
+    rng_frame = np.random.default_rng(1)
+    texture = cv2.cvtColor(cv2.GaussianBlur(rng_frame.integers(0, 255, (480, 640), dtype=np.uint8), (0, 0), 2),
+                           cv2.COLOR_GRAY2BGR)
+    field = MotionField()
+    field.compute(texture)
+    motion = field.compute(np.roll(texture, 3, axis=1))
+    flow_results = CrowdAnalytics().analyze_frame([], motion=motion)
+    assert flow_results['motion_source'] == "flow" and flow_results['kinetic_energy']['current'] > 2.0
+    assert flow_results['motion_coherence']['std_deviation'] < 20.0
+    assert results['motion_source'] == "tracks"
+    
+    # Switching between track and flow KE (different populations) is no spike:
+    # 30 mostly standing people, a few walkers at 1 px/frame starting and stopping
+    standing = np.array([[40 + 100 * (i % 6), 40 + 80 * (i // 6), 60 + 100 * (i % 6), 80 + 80 * (i // 6)]
+                         for i in range(30)], dtype=float)
+    switching = CrowdAnalytics()
+    sources = []
+    for frame_index in range(300):
+        walkers = 2 if frame_index % 30 == 29 else 3  # Hovers around MOTION_FIELD_MIN_TRACKS
+        if frame_index >= 150:
+            walkers = 0 if (frame_index // 30) % 2 else 6  # Forces the source back and forth
+        velocities = np.zeros((30, 2))
+        velocities[:walkers, 0] = 1.0
+        frame_results = switching.analyze_frame(
+            TrackSnapshot(np.arange(30), standing, velocities, np.ones(30), np.ones(30)), motion=motion)
+        sources.append(frame_results['motion_source'])
+        assert not frame_results['kinetic_energy']['spike_detected'], frame_index
+        assert not frame_results['kinetic_energy']['local_spike'], frame_index
+    flips = sum(a != b for a, b in zip(sources, sources[1:]))
+    assert sum(a != b for a, b in zip(sources[:150], sources[1:150])) == 1 and flips >= 4
+    
+    # A chaotic corner raises the status even when the frame-wide average is calm
+    ids = np.arange(24)
+    boxes = np.vstack([np.tile([10, 10, 40, 40], (4, 1)), np.tile([400, 300, 430, 330], (20, 1))])
+    angles = np.concatenate([[0, np.pi / 2, np.pi, -np.pi / 2], np.zeros(20)])
+    velocities = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+    corner = TrackSnapshot(ids, boxes, velocities, np.ones(24), np.ones(24))
+    corner_analytics = CrowdAnalytics()
+    cell_motion = corner_analytics.calculate_cell_motion(corner)
+    assert cell_motion['eligible'][0, 0] and cell_motion['coherence'][0, 0] > COHERENCE_THRESHOLD_CRITICAL
+    assert corner_analytics.calculate_motion_coherence(corner) < COHERENCE_THRESHOLD_WARNING
+    corner_results = corner_analytics.analyze_frame(corner)
+    assert corner_results['status'] == STATUS_CRITICAL
+    assert corner_results['motion_coherence']['worst_cell'] > COHERENCE_THRESHOLD_CRITICAL
+    flow_cells = CrowdAnalytics().calculate_cell_motion(TrackSnapshot.empty(), motion=motion)
+    assert flow_cells['coherence'].shape == DENSITY_GRID_SIZE and flow_cells['eligible'].any()
+    assert flow_cells['coherence'][flow_cells['eligible']].max() < COHERENCE_THRESHOLD_WARNING
+    
+    # Calibrated cameras judge density in persons/m²: 6 people spread over 3 m²
+    # far from an angled camera share one image cell (CRITICAL per cell) but are
+    # not crowded; 6 people in one square metre near the camera are
+    calibration = GroundPlaneCalibration.from_points([[100, 100], [540, 100], [640, 480], [0, 480]],
+                                                     [[0, 40], [10, 40], [10, 0], [0, 0]], max_range_m=60.0)
+    to_image = np.linalg.inv(calibration.homography)
+    
+    def people_at(feet):
+        pixels = cv2.perspectiveTransform(np.array(feet, dtype=float).reshape(-1, 1, 2), to_image).reshape(-1, 2)
+        n = len(pixels)
+        return TrackSnapshot(np.arange(n), np.hstack([pixels - [3, 15], pixels + [3, 0]]),
+                             np.zeros((n, 2)), np.ones(n), np.ones(n))
+    
+    spread = people_at([[x, y] for x in (5.3, 5.8) for y in (29.5, 30.5, 31.5)])
+    packed = people_at([[x, y] for x in (5.2, 5.5, 5.8) for y in (2.3, 2.7)])
+    assert CrowdAnalytics().analyze_frame(spread)['status'] == STATUS_CRITICAL
+    spread_results = CrowdAnalytics(calibration=calibration).analyze_frame(spread)
+    packed_results = CrowdAnalytics(calibration=calibration).analyze_frame(packed)
+    assert spread_results['status'] == STATUS_NORMAL
+    assert spread_results['density']['ground']['max_density'] < GROUND_DENSITY_THRESHOLD_WARNING
+    assert packed_results['density']['ground']['max_density'] >= GROUND_DENSITY_THRESHOLD_CRITICAL
+    assert packed_results['status'] == STATUS_CRITICAL and 'ground' not in results['density']
+    
+    # A steadily growing crowd is forecast to reach the warning density
+    # before it does; the 5 s per-cell forecast already sees the critical cell
+    growing_analytics = CrowdAnalytics()
+    for frame in range(45):
+        count = 1 + frame // 15
+        boxes = np.tile([10, 10, 40, 40], (count, 1))
+        growing = TrackSnapshot(np.arange(count), boxes, np.zeros((count, 2)), np.ones(count), np.ones(count))
+        growing_results = growing_analytics.analyze_frame(growing)
+    forecast = growing_results['forecast']
+    assert growing_results['status'] == STATUS_NORMAL
+    assert forecast['series']['density']['time_to_warning_s'] is not None
+    assert 0 < forecast['time_to_warning_s'] <= forecast['horizons_s'][-1]
+    converging = TrackSnapshot(np.arange(6), np.array([[32 + 64 * i, 200, 32 + 64 * i + 20, 240] for i in range(6)]),
+                               np.array([[-64 * i / 75.0, 0.0] for i in range(6)]), np.ones(6), np.ones(6))
+    converging_results = CrowdAnalytics().analyze_frame(converging)
+    assert converging_results['status'] == STATUS_NORMAL
+    assert converging_results['forecast']['cells']['time_to_critical_s'] == 5.0
+    assert 'forecast' not in CrowdAnalytics(forecasting=False).analyze_frame(converging)
+    
     print("Analytics Test Results:")
     print(f"Person Count: {results['person_count']}")
     print(f"Max Density: {results['density']['max_density']}")
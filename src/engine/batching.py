@@ -0,0 +1,296 @@
+"""
+Micro-batching collector for person detection.
+Gathers frames submitted by several camera streams and runs them through the
+detector in one forward pass, so a single model instance can serve many cameras.
+"""
+
+import numpy as np
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Tuple, Dict, Optional
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import DETECTION_MAX_BATCH_SIZE, DETECTION_BATCH_DEADLINE_MS, DETECTOR_POOL_SIZE
+
+
+class MicroBatchCollector:
+    """
+    Collects frames from multiple streams and dispatches them to
+    PersonDetector.detect_persons_batch in batches.
+
+    A batch is flushed as soon as it holds max_batch_size frames or when
+    max_delay_ms has elapsed since its first frame arrived, whichever comes first.
+    """
+
+    def __init__(self, detector, max_batch_size: int = DETECTION_MAX_BATCH_SIZE,
+                 max_delay_ms: float = DETECTION_BATCH_DEADLINE_MS):
+        """
+        Initialize the collector.
+
+        Args:
+            detector: PersonDetector (or any object exposing detect_persons_batch)
+            max_batch_size: Maximum number of frames per forward pass
+            max_delay_ms: Maximum time to wait for a batch to fill, in milliseconds
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.detector = detector
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000.0
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._running = False
+        self._state_lock = threading.Lock()
+
+        # Statistics
+        self.batches_run = 0
+        self.frames_processed = 0
+        self.total_inference_time = 0.0
+
+    def start(self) -> None:
+        """Start the background batching thread."""
+        with self._state_lock:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="argus-micro-batcher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the batching thread. Pending frames are still processed."""
+        # Held while joining so a concurrent start() cannot run a second worker
+        # on the same queue before this one has drained it
+        with self._state_lock:
+            if not self._running:
+                return
+            self._running = False
+            self._queue.put(None)  # Wake up the worker
+            if self._thread is not None:
+                self._thread.join()
+                self._thread = None
+
+    def submit(self, frame: np.ndarray, stream_id: Optional[str] = None, as_array: bool = False,
+               min_confidence: Optional[float] = None) -> Future:
+        """
+        Queue a frame for detection.
+
+        Args:
+            frame: Input frame as numpy array
+            stream_id: Optional identifier of the submitting stream
+            as_array: Resolve to an (N, 5) float32 array instead of a list of tuples
+            min_confidence: Override the detector's confidence threshold for this frame
+
+        Returns:
+            Future resolving to a list of (x1, y1, x2, y2, confidence) tuples
+            (or an array if as_array is set)
+        """
+        if not self._running:
+            self.start()
+        future = Future()
+        self._queue.put((frame, stream_id, future, as_array, min_confidence))
+        return future
+
+    def detect_persons(self, frame: np.ndarray, timeout: Optional[float] = None) -> List[Tuple[int, int, int, int, float]]:
+        """
+        Blocking drop-in replacement for PersonDetector.detect_persons.
+
+        Args:
+            frame: Input frame as numpy array
+            timeout: Maximum time to wait for the result, in seconds
+
+        Returns:
+            List of detections as (x1, y1, x2, y2, confidence) tuples
+        """
+        return self.submit(frame).result(timeout=timeout)
+
+    def detect_persons_array(self, frame: np.ndarray, min_confidence: Optional[float] = None,
+                             timeout: Optional[float] = None) -> np.ndarray:
+        """
+        Blocking drop-in replacement for PersonDetector.detect_persons_array.
+
+        Args:
+            frame: Input frame as numpy array
+            min_confidence: Override the detector's confidence threshold
+            timeout: Maximum time to wait for the result, in seconds
+
+        Returns:
+            (N, 5) float32 array of [x1, y1, x2, y2, confidence]
+        """
+        return self.submit(frame, as_array=True, min_confidence=min_confidence).result(timeout=timeout)
+
+    def _collect_batch(self) -> List[Tuple]:
+        """Block for the first frame, then gather more until the batch is full or the deadline passes."""
+        first = self._queue.get()
+        if first is None:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Stop requested - flush what we have
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self) -> None:
+        """Worker loop: collect batches and run them through the detector."""
+        while self._running or not self._queue.empty():
+            # Claim each future; frames whose caller already cancelled are skipped
+            batch = [item for item in self._collect_batch() if item[2].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            frames = [item[0] for item in batch]
+            # One pass at the lowest requested threshold; each frame is filtered to its own below
+            default = getattr(self.detector, 'confidence_threshold', 0.0)
+            thresholds = [default if item[4] is None else item[4] for item in batch]
+            start = time.perf_counter()
+            try:
+                results = self.detector.detect_persons_batch(frames, as_array=True, min_confidence=min(thresholds))
+            except Exception as e:
+                for item in batch:
+                    item[2].set_exception(e)
+                continue
+            self.total_inference_time += time.perf_counter() - start
+
+            self.batches_run += 1
+            self.frames_processed += len(batch)
+            for (_, _, future, as_array, _), threshold, detections in zip(batch, thresholds, results):
+                detections = detections[detections[:, 4] >= threshold]
+                future.set_result(detections if as_array else self._to_tuples(detections))
+
+    @staticmethod
+    def _to_tuples(detections: np.ndarray) -> List[Tuple[int, int, int, int, float]]:
+        """Convert an (N, 5) array to (x1, y1, x2, y2, confidence) tuples, as PersonDetector does."""
+        return [(int(x1), int(y1), int(x2), int(y2), float(conf)) for x1, y1, x2, y2, conf in detections.tolist()]
+
+    def get_stats(self) -> Dict:
+        """
+        Get batching statistics
+
+        Returns:
+            Dictionary with batching statistics
+        """
+        avg_batch = self.frames_processed / self.batches_run if self.batches_run else 0.0
+        avg_latency = self.total_inference_time / self.batches_run if self.batches_run else 0.0
+        return {
+            'batches_run': self.batches_run,
+            'frames_processed': self.frames_processed,
+            'avg_batch_size': avg_batch,
+            'avg_batch_inference_ms': avg_latency * 1000.0,
+            'pending_frames': self._queue.qsize()
+        }
+
+
+class DetectorPool:
+    """
+    Detector instances shared by many camera pipelines. Each instance sits
+    behind its own MicroBatchCollector, and every frame goes to the instance
+    with the fewest pending frames, so concurrent cameras are batched together
+    and spread over the pool.
+    """
+
+    def __init__(self, size: int = DETECTOR_POOL_SIZE, detector_factory=None,
+                 max_batch_size: int = DETECTION_MAX_BATCH_SIZE,
+                 max_delay_ms: float = DETECTION_BATCH_DEADLINE_MS):
+        """
+        Initialize the pool.
+
+        Args:
+            size: Number of detector instances (models loaded)
+            detector_factory: Callable creating a detector; defaults to PersonDetector
+            max_batch_size: Maximum number of frames per forward pass
+            max_delay_ms: Maximum time to wait for a batch to fill, in milliseconds
+        """
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        if detector_factory is None:
+            from engine.detection import PersonDetector
+            detector_factory = PersonDetector
+
+        self.collectors = [MicroBatchCollector(detector_factory(), max_batch_size, max_delay_ms)
+                           for _ in range(size)]
+        for collector in self.collectors:
+            collector.start()
+
+    def _pick(self) -> MicroBatchCollector:
+        return min(self.collectors, key=lambda collector: collector._queue.qsize())
+
+    def submit(self, frame: np.ndarray, stream_id: Optional[str] = None, as_array: bool = False,
+               min_confidence: Optional[float] = None) -> Future:
+        """Queue a frame on the least busy detector (see MicroBatchCollector.submit)."""
+        return self._pick().submit(frame, stream_id, as_array, min_confidence)
+
+    def detect_persons(self, frame: np.ndarray, timeout: Optional[float] = None) -> List[Tuple[int, int, int, int, float]]:
+        """Blocking drop-in replacement for PersonDetector.detect_persons."""
+        return self.submit(frame).result(timeout=timeout)
+
+    def detect_persons_array(self, frame: np.ndarray, min_confidence: Optional[float] = None,
+                             timeout: Optional[float] = None) -> np.ndarray:
+        """Blocking drop-in replacement for PersonDetector.detect_persons_array."""
+        return self.submit(frame, as_array=True, min_confidence=min_confidence).result(timeout=timeout)
+
+    def stop(self) -> None:
+        """Stop all collectors."""
+        for collector in self.collectors:
+            collector.stop()
+
+    def get_stats(self) -> Dict:
+        """
+        Get pool statistics
+
+        Returns:
+            Dictionary with per-detector batching statistics
+        """
+        return {
+            'size': len(self.collectors),
+            'detectors': [collector.get_stats() for collector in self.collectors]
+        }
+
+
+def test_micro_batching():
+    """Test function for the micro-batching collector."""
+    from engine.detection import PersonDetector
+
+    detector = PersonDetector()
+    collector = MicroBatchCollector(detector, max_batch_size=4, max_delay_ms=50)
+    collector.start()
+
+    # Simulate four camera streams submitting at the same time
+    test_frames = [np.zeros((480, 640, 3), dtype=np.uint8) for _ in range(4)]
+    futures = [collector.submit(frame, stream_id=f"cam{i}") for i, frame in enumerate(test_frames)]
+    results = [future.result(timeout=30) for future in futures]
+
+    # Per-frame thresholds and array results from the same batch
+    low = collector.submit(test_frames[0], as_array=True, min_confidence=0.1)
+    high = collector.submit(test_frames[1], as_array=True, min_confidence=0.6)
+    assert low.result(timeout=30).shape[1] == 5 and (high.result(timeout=30)[:, 4] >= 0.6).all()
+
+    # A cancelled request is skipped without killing the worker
+    cancelled = collector.submit(test_frames[2])
+    cancelled.cancel()
+    assert collector.submit(test_frames[3]).result(timeout=30) is not None
+
+    collector.stop()
+    print(f"Processed {len(results)} frames: {collector.get_stats()}")
+    print("Micro-batching test completed successfully")
+
+
+if __name__ == "__main__":
+    test_micro_batching()
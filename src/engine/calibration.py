@@ -0,0 +1,262 @@
+"""
+Ground-plane calibration for The Argus Protocol.
+Maps image pixels to metres on the ground with a per-camera homography, so
+crowd density can be measured in persons per square metre on a metric grid
+instead of persons per image cell. Everything that depends only on the camera
+(ground position, metric cell and ground area of every pixel) is precomputed
+into lookup tables; per frame, density is one table gather and one bincount.
+"""
+
+import json
+import cv2
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import VIDEO_RESOLUTION, GROUND_CELL_SIZE_M, GROUND_MAX_RANGE_M, GROUND_MIN_VISIBLE_FRACTION
+
+
+class GroundPlaneCalibration:
+    """
+    Image-to-ground homography with precomputed lookup tables.
+
+    The ground frame is in metres. Pixels that do not see the ground (above
+    the horizon) or see it farther than `max_range_m` from the bottom centre
+    of the image are marked invalid and never counted.
+    """
+
+    def __init__(self, homography: np.ndarray, frame_size: Tuple[int, int] = VIDEO_RESOLUTION,
+                 cell_size_m: float = GROUND_CELL_SIZE_M, max_range_m: float = GROUND_MAX_RANGE_M,
+                 min_visible_fraction: float = GROUND_MIN_VISIBLE_FRACTION):
+        """
+        Build the calibration and its lookup tables.
+
+        Args:
+            homography: 3x3 matrix mapping image pixels (x, y, 1) to ground metres
+            frame_size: (W, H) of the image the homography was estimated on
+            cell_size_m: Side of a metric density cell, in metres
+            max_range_m: Ignore ground farther than this from the bottom centre of the image
+            min_visible_fraction: Smallest visible share of a cell's area used as the
+                density denominator, so barely visible cells do not explode
+
+        Raises:
+            ValueError: If the bottom of the image does not map onto the ground
+        """
+        self.homography = np.asarray(homography, dtype=np.float64).reshape(3, 3)
+        self.frame_size = (int(frame_size[0]), int(frame_size[1]))
+        self.cell_size_m = float(cell_size_m)
+        self.max_range_m = float(max_range_m)
+        self.min_visible_fraction = min_visible_fraction
+        self._build_tables()
+
+    @classmethod
+    def from_points(cls, image_points: Sequence[Sequence[float]], ground_points: Sequence[Sequence[float]],
+                    **kwargs) -> 'GroundPlaneCalibration':
+        """
+        Estimate the homography from point correspondences.
+
+        Args:
+            image_points: At least 4 (x, y) pixel positions of marks on the ground
+            ground_points: The same marks in ground metres (X, Y)
+            **kwargs: Passed to the constructor
+
+        Raises:
+            ValueError: With fewer than 4 pairs or a degenerate configuration
+        """
+        image_points = np.asarray(image_points, dtype=np.float64).reshape(-1, 2)
+        ground_points = np.asarray(ground_points, dtype=np.float64).reshape(-1, 2)
+        if len(image_points) < 4 or len(image_points) != len(ground_points):
+            raise ValueError("Calibration needs at least 4 matching image/ground point pairs")
+        homography, _ = cv2.findHomography(image_points, ground_points, 0)
+        if homography is None:
+            raise ValueError("Calibration points are degenerate (e.g. collinear)")
+        return cls(homography, **kwargs)
+
+    @classmethod
+    def load(cls, path: str) -> 'GroundPlaneCalibration':
+        """
+        Load a calibration file.
+
+        The JSON file holds either "homography" (3x3) or "image_points" and
+        "ground_points", plus optional "frame_size" [W, H] and "cell_size_m".
+
+        Args:
+            path: Calibration JSON file
+
+        Returns:
+            GroundPlaneCalibration
+        """
+        with open(path) as f:
+            data = json.load(f)
+        kwargs = {'frame_size': tuple(data.get('frame_size', VIDEO_RESOLUTION)),
+                  'cell_size_m': data.get('cell_size_m', GROUND_CELL_SIZE_M),
+                  'max_range_m': data.get('max_range_m', GROUND_MAX_RANGE_M)}
+        if 'homography' in data:
+            return cls(data['homography'], **kwargs)
+        return cls.from_points(data['image_points'], data['ground_points'], **kwargs)
+
+    def _build_tables(self) -> None:
+        """Precompute per-pixel ground position, metric cell and ground area."""
+        width, height = self.frame_size
+        xs, ys = np.meshgrid(np.arange(width) + 0.5, np.arange(height) + 0.5)
+        pixels = np.stack([xs, ys, np.ones_like(xs)], axis=-1)
+
+        # Orient the homography so the ground in front of the camera has w > 0
+        bottom = self.homography @ np.array([width / 2.0, height - 0.5, 1.0])
+        if abs(bottom[2]) < 1e-12:
+            raise ValueError("Homography does not map the bottom of the image onto the ground")
+        if bottom[2] < 0:
+            self.homography = -self.homography
+        anchor = bottom[:2] / bottom[2]
+
+        projected = pixels @ self.homography.T
+        w = projected[..., 2]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ground = projected[..., :2] / w[..., None]
+        valid = (w > 1e-12) & (np.hypot(ground[..., 0] - anchor[0], ground[..., 1] - anchor[1]) <= self.max_range_m)
+        if not valid.any():
+            raise ValueError("No part of the image maps onto the ground within range")
+        ground[~valid] = 0.0
+        self.ground_lut = ground.astype(np.float32)   # (H, W, 2) metres
+        self.valid_mask = valid
+
+        # Ground area covered by each pixel: |det J| of the image-to-ground mapping
+        dx = np.gradient(ground, axis=1)
+        dy = np.gradient(ground, axis=0)
+        pixel_area = np.abs(dx[..., 0] * dy[..., 1] - dx[..., 1] * dy[..., 0])
+        pixel_area[~valid] = 0.0
+
+        # Metric grid over the visible ground
+        cell = self.cell_size_m
+        visible = ground[valid]
+        self.origin_m = np.floor(visible.min(axis=0) / cell) * cell
+        extent = visible.max(axis=0) - self.origin_m
+        self.grid_shape = (int(np.floor(extent[1] / cell)) + 1, int(np.floor(extent[0] / cell)) + 1)  # rows, cols
+
+        cells = np.full((height, width), -1, dtype=np.int32)
+        col = np.floor((ground[..., 0] - self.origin_m[0]) / cell).astype(np.int64)
+        row = np.floor((ground[..., 1] - self.origin_m[1]) / cell).astype(np.int64)
+        cells[valid] = (row * self.grid_shape[1] + col)[valid]
+        self.cell_lut = cells
+
+        num_cells = self.grid_shape[0] * self.grid_shape[1]
+        self.visible_area = np.bincount(cells[valid], weights=pixel_area[valid], minlength=num_cells)
+        self._denominator = np.maximum(self.visible_area, self.min_visible_fraction * cell * cell)
+
+    @staticmethod
+    def foot_points(bboxes: np.ndarray) -> np.ndarray:
+        """
+        Bottom-centre of each box, where a standing person touches the ground.
+
+        Args:
+            bboxes: (N, 4) array of [x1, y1, x2, y2]
+
+        Returns:
+            (N, 2) array of [x, y] pixels
+        """
+        bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        return np.stack([(bboxes[:, 0] + bboxes[:, 2]) * 0.5, bboxes[:, 3]], axis=1)
+
+    def _pixel_index(self, points: np.ndarray, frame_size: Optional[Tuple[int, int]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Lookup-table row and column of image points, rescaled from the analysed frame size."""
+        width, height = self.frame_size
+        scale_x, scale_y = 1.0, 1.0
+        if frame_size is not None and tuple(frame_size) != self.frame_size:
+            scale_x, scale_y = width / frame_size[0], height / frame_size[1]
+        col = np.clip((points[:, 0] * scale_x).astype(np.intp), 0, width - 1)
+        row = np.clip((points[:, 1] * scale_y).astype(np.intp), 0, height - 1)
+        return row, col
+
+    def project(self, points: np.ndarray, frame_size: Optional[Tuple[int, int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Ground position of image points (table lookup, nearest pixel).
+
+        Args:
+            points: (N, 2) array of [x, y] pixels
+            frame_size: (W, H) the points refer to; defaults to the calibration size
+
+        Returns:
+            Tuple of ((N, 2) ground metres, (N,) validity mask)
+        """
+        row, col = self._pixel_index(np.asarray(points, dtype=np.float64).reshape(-1, 2), frame_size)
+        return self.ground_lut[row, col], self.valid_mask[row, col]
+
+    def density(self, bboxes: np.ndarray, frame_size: Optional[Tuple[int, int]] = None) -> Dict:
+        """
+        Persons per square metre on the metric grid.
+
+        Args:
+            bboxes: (N, 4) array of [x1, y1, x2, y2]
+            frame_size: (W, H) the boxes refer to; defaults to the calibration size
+
+        Returns:
+            Dictionary with 'grid' (persons/m², rows x cols), 'max_density',
+            'counted' (persons standing on visible ground), 'cell_size_m' and 'origin_m'
+        """
+        row, col = self._pixel_index(self.foot_points(bboxes), frame_size)
+        cells = self.cell_lut[row, col]
+        cells = cells[cells >= 0]
+        counts = np.bincount(cells, minlength=len(self.visible_area))
+        grid = (counts / self._denominator).reshape(self.grid_shape)
+        return {
+            'grid': grid,
+            'max_density': float(grid.max()) if grid.size else 0.0,
+            'counted': int(len(cells)),
+            'cell_size_m': self.cell_size_m,
+            'origin_m': self.origin_m.tolist()
+        }
+
+
+def test_calibration():
+    """Test function for ground-plane calibration with a synthetic angled camera."""
+    import tempfile
+
+    # Camera looking down a 10 m wide, 40 m deep area: far ground is squeezed into few pixels
+    image_points = [[100, 100], [540, 100], [640, 480], [0, 480]]
+    ground_points = [[0, 40], [10, 40], [10, 0], [0, 0]]
+    calibration = GroundPlaneCalibration.from_points(image_points, ground_points, max_range_m=60.0)
+
+    ground, valid = calibration.project(np.array([[320, 479], [320, 100], [0, 0]]))
+    assert np.allclose(ground[0], [5, 0], atol=0.1) and np.allclose(ground[1], [5, 40], atol=0.3)
+    assert valid[0] and valid[1]
+
+    # Visible area of the calibrated trapezoid is about 10 x 40 = 400 m²
+    trapezoid = np.zeros((480, 640), dtype=np.uint8)
+    cv2.fillPoly(trapezoid, [np.array(image_points, dtype=np.int32)], 1)
+    area = (calibration.cell_lut >= 0) & (trapezoid > 0)
+    pixel_share = np.bincount(calibration.cell_lut[area], minlength=calibration.visible_area.size)
+    assert abs(calibration.visible_area[pixel_share > 0].sum() - 400) < 60
+
+    # 4 people in one square metre read as ~4 persons/m² near and far, even
+    # though the far group covers a few pixels and the near one a large area
+    to_image = np.linalg.inv(calibration.homography)
+
+    def group_at(x, y):
+        feet = np.array([[x + 0.2, y + 0.2], [x + 0.8, y + 0.2], [x + 0.2, y + 0.8], [x + 0.8, y + 0.8]])
+        pixels = cv2.perspectiveTransform(feet.reshape(-1, 1, 2), to_image).reshape(-1, 2)
+        return np.hstack([pixels - [5, 30], pixels + [5, 0]])
+
+    near = calibration.density(group_at(5, 2))
+    far = calibration.density(group_at(5, 30))
+    assert near['counted'] == far['counted'] == 4
+    assert abs(near['max_density'] - 4) < 0.5 and abs(far['max_density'] - 4) < 0.5
+
+    # Frames at another resolution are rescaled onto the tables
+    assert calibration.density(group_at(5, 2) / 2, frame_size=(320, 240))['counted'] == 4
+
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        json.dump({'image_points': image_points, 'ground_points': ground_points, 'cell_size_m': 2.0}, f)
+    loaded = GroundPlaneCalibration.load(f.name)
+    os.unlink(f.name)
+    assert loaded.cell_size_m == 2.0
+
+    print(f"Metric grid {calibration.grid_shape} from {calibration.origin_m.tolist()} m; "
+          f"near {near['max_density']:.2f}, far {far['max_density']:.2f} persons/m²")
+    print("Calibration test completed successfully")
+
+
+if __name__ == "__main__":
+    test_calibration()
@@ -0,0 +1,298 @@
+"""
+Camera registry for The Argus Protocol.
+Runs many cameras in one server: each camera has its own pipeline (tracker and
+analytics state) and capture hub, while person detection is shared through a
+DetectorPool. In "process" worker mode each camera's pipeline runs in its own
+worker process instead (engine/workers.py).
+"""
+
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Union
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from engine.core_pipeline import ArgusCorePipeline
+from engine.calibration import GroundPlaneCalibration
+from engine.hub import CaptureHub
+from engine.video_source import VideoSource
+from config import PROCESSING_FPS, CAMERA_WORKER_MODE
+
+CAMERA_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+WORKER_MODES = ("thread", "process")
+
+
+class DuplicateCameraError(ValueError):
+    """A camera with the requested id is already registered."""
+
+
+class Camera:
+    """
+    One registered camera: its source URI, pipeline and capture hub.
+    In process worker mode the pipeline lives in the worker and `pipeline` is None.
+    """
+
+    def __init__(self, camera_id: str, uri: Union[int, str], name: str, pipeline, hub):
+        self.id = camera_id
+        self.uri = uri
+        self.name = name
+        self.pipeline = pipeline
+        self.hub = hub
+        self.created_at = time.time()
+
+    def get_info(self) -> Dict:
+        """
+        Get camera description and status
+
+        Returns:
+            Dictionary with camera information
+        """
+        hub_stats = self.hub.get_stats()
+        return {
+            'id': self.id,
+            'name': self.name,
+            'source': str(self.uri),
+            'created_at': self.created_at,
+            'running': hub_stats['running'],
+            'frames_processed': hub_stats['frames_processed'],
+            'delivered_fps': hub_stats['delivered_fps'],
+            'subscribers': hub_stats['broker']['subscribers']
+        }
+
+
+class CameraRegistry:
+    """
+    Thread-safe registry of cameras sharing one detector pool.
+    """
+
+    def __init__(self, detector_pool=None, source_factory: Optional[Callable] = None,
+                 fps: float = PROCESSING_FPS, annotate: Optional[Callable] = None,
+                 worker_mode: str = CAMERA_WORKER_MODE):
+        """
+        Initialize the registry.
+
+        Args:
+            detector_pool: Shared detector (DetectorPool); created with the first
+                camera when omitted
+            source_factory: Callable (uri, name) returning a hub source; defaults to VideoSource
+            fps: Target processing rate per camera
+            annotate: Optional overlay callable passed to every camera hub (thread
+                mode; worker processes draw their own source label)
+            worker_mode: "thread" (pipelines in this process, shared detector pool) or
+                "process" (one worker process with its own detector per camera)
+        """
+        if worker_mode not in WORKER_MODES:
+            raise ValueError(f"Unknown worker mode '{worker_mode}', expected one of {WORKER_MODES}")
+        self.detector_pool = detector_pool
+        self.source_factory = source_factory or (lambda uri, name: VideoSource(uri, name=name))
+        self.fps = fps
+        self.annotate = annotate
+        self.worker_mode = worker_mode
+        self._cameras: Dict[str, Camera] = {}
+        self._lock = threading.Lock()
+        self._next_id = 1
+
+    def _get_pool(self):
+        if self.detector_pool is None:
+            from engine.batching import DetectorPool
+            self.detector_pool = DetectorPool()
+        return self.detector_pool
+
+    def add(self, uri: Union[int, str], camera_id: Optional[str] = None, name: Optional[str] = None,
+            tiled_inference: bool = False, calibration: Optional[str] = None) -> Camera:
+        """
+        Register a camera. Capture starts when the first client subscribes.
+
+        Args:
+            uri: Video source (webcam index, file, RTSP/HTTP URL or image directory)
+            camera_id: Unique id; generated as "cam-N" when omitted
+            name: Display name; defaults to the id
+            tiled_inference: Use tiled inference with a dedicated detector for this camera
+                (thread mode only)
+            calibration: Path of this camera's ground-plane calibration file; without
+                one, density is measured per image grid cell
+
+        Returns:
+            The new Camera
+
+        Raises:
+            DuplicateCameraError: If the id is already registered
+            ValueError: If the id is invalid, tiled inference is requested in
+                process mode, or the calibration file is invalid
+        """
+        ground_calibration = None
+        if calibration:
+            try:
+                ground_calibration = GroundPlaneCalibration.load(calibration)
+            except (OSError, KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"Invalid calibration file '{calibration}': {e}")
+
+        with self._lock:
+            if camera_id is None:
+                while f"cam-{self._next_id}" in self._cameras:
+                    self._next_id += 1
+                camera_id = f"cam-{self._next_id}"
+                self._next_id += 1
+            if not CAMERA_ID_PATTERN.match(camera_id):
+                raise ValueError(f"Invalid camera id '{camera_id}'")
+            if camera_id in self._cameras:
+                raise DuplicateCameraError(f"Camera '{camera_id}' already exists")
+
+            name = name or camera_id
+            if self.worker_mode == "process":
+                if tiled_inference:
+                    raise ValueError("Tiled inference needs native frames and is not available in process mode")
+                from engine.workers import ProcessCaptureHub
+                pipeline = None
+                hub = ProcessCaptureHub(lambda: self.source_factory(uri, name), fps=self.fps, label=name,
+                                        calibration=calibration or '')
+            else:
+                detector = None if tiled_inference else self._get_pool()
+                pipeline = ArgusCorePipeline(tiled_inference=tiled_inference, detector=detector,
+                                             calibration=ground_calibration)
+                hub = CaptureHub(pipeline, lambda: self.source_factory(uri, name), fps=self.fps,
+                                 annotate=self.annotate)
+            camera = Camera(camera_id, uri, name, pipeline, hub)
+            self._cameras[camera_id] = camera
+
+        print(f"📷 Camera '{camera_id}' registered ({uri})")
+        return camera
+
+    def remove(self, camera_id: str) -> None:
+        """
+        Unregister a camera and stop its capture.
+
+        Raises:
+            KeyError: If the camera does not exist
+        """
+        with self._lock:
+            camera = self._cameras.pop(camera_id)
+
+        # Close client subscriptions so their streams end, then stop capture
+        camera.hub.broker.close_all()
+        camera.hub.close()
+        print(f"📷 Camera '{camera_id}' removed")
+
+    def get(self, camera_id: str) -> Camera:
+        """
+        Look up a camera.
+
+        Raises:
+            KeyError: If the camera does not exist
+        """
+        with self._lock:
+            return self._cameras[camera_id]
+
+    def list(self) -> List[Dict]:
+        """
+        Describe all cameras
+
+        Returns:
+            List of camera information dictionaries
+        """
+        with self._lock:
+            cameras = list(self._cameras.values())
+        return [camera.get_info() for camera in cameras]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._cameras)
+
+    def shutdown(self) -> None:
+        """Remove all cameras and stop the detector pool."""
+        with self._lock:
+            camera_ids = list(self._cameras)
+        for camera_id in camera_ids:
+            self.remove(camera_id)
+        if self.detector_pool is not None and hasattr(self.detector_pool, 'stop'):
+            self.detector_pool.stop()
+
+
+def parse_camera_list(spec: str) -> List[Dict]:
+    """
+    Parse a camera list such as "gate1=rtsp://10.0.0.5/stream,lobby=0".
+
+    Args:
+        spec: Comma-separated "id=uri" entries (a bare uri gets a generated id)
+
+    Returns:
+        List of {'camera_id', 'uri'} dictionaries
+    """
+    cameras = []
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        camera_id, sep, uri = entry.partition("=")
+        if sep and CAMERA_ID_PATTERN.match(camera_id):
+            cameras.append({'camera_id': camera_id, 'uri': uri})
+        else:
+            cameras.append({'camera_id': None, 'uri': entry})
+    return cameras
+
+
+def test_cameras():
+    """Test function for the camera registry."""
+    import numpy as np
+
+    class StaticSource:
+        def __init__(self, uri, name):
+            self.frame = np.zeros((480, 640, 3), dtype=np.uint8)
+            self.name = name
+
+        def read(self):
+            time.sleep(0.01)
+            return self.frame.copy(), None, self.name
+
+        def release(self):
+            pass
+
+    assert parse_camera_list("gate1=rtsp://10.0.0.5/s, 0") == [
+        {'camera_id': 'gate1', 'uri': 'rtsp://10.0.0.5/s'}, {'camera_id': None, 'uri': '0'}]
+
+    registry = CameraRegistry(source_factory=StaticSource, fps=30)
+    registry.add("a.mp4", camera_id="gate1")
+    registry.add("b.mp4")
+    try:
+        registry.add("c.mp4", camera_id="gate1")
+        raise AssertionError("duplicate id accepted")
+    except DuplicateCameraError:
+        pass
+    for bad in ({'camera_id': "gate 1!"}, {'calibration': "missing-calibration.json"}):
+        try:
+            registry.add("c.mp4", **bad)
+            raise AssertionError(f"invalid camera accepted: {bad}")
+        except DuplicateCameraError:
+            raise AssertionError(f"invalid camera reported as a duplicate: {bad}")
+        except ValueError:
+            pass
+
+    # Each camera has its own tracker and analytics, but they share one detector pool
+    gate1, cam1 = registry.get("gate1"), registry.get("cam-1")
+    assert gate1.pipeline.tracker is not cam1.pipeline.tracker
+    assert gate1.pipeline.analytics is not cam1.pipeline.analytics
+    assert gate1.pipeline.detector is cam1.pipeline.detector is registry.detector_pool
+
+    subscriptions = [camera.hub.subscribe("analytics") for camera in (gate1, cam1)]
+    for subscription in subscriptions:
+        assert subscription.get(timeout=30) is not None
+    print(f"Cameras: {[(info['id'], info['frames_processed']) for info in registry.list()]}")
+
+    registry.remove("gate1")
+    assert len(registry) == 1 and subscriptions[0].closed
+    registry.shutdown()
+    print(f"Detector pool: {registry.detector_pool.get_stats()}")
+
+    # Process mode: the pipeline runs in a worker process fed through shared memory
+    registry = CameraRegistry(source_factory=StaticSource, fps=30, worker_mode="process")
+    camera = registry.add("a.mp4", camera_id="gate1")
+    assert camera.pipeline is None
+    with camera.hub.subscribe("analytics") as subscription:
+        assert subscription.get(timeout=120) is not None
+    print(f"Process camera: {registry.list()}")
+    registry.shutdown()
+    print("Camera registry test completed successfully")
+
+
+if __name__ == "__main__":
+    test_cameras()
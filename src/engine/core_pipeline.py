@@ -5,7 +5,8 @@ Integrates detection, tracking, and analytics into a unified processing flow.
 
 import cv2
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+import threading
+from typing import Callable, Dict, List, Tuple, Optional, Union
 import sys
 import os
 
@@ -14,8 +15,72 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from engine.detection import PersonDetector
 from engine.tracking import Sort
+from engine.vectorized_tracking import VectorizedSort
 from engine.analytics import CrowdAnalytics
-from config import VIDEO_RESOLUTION
+from engine.scheduling import DetectionScheduler
+from engine.rendering import DensityOverlayRenderer
+from engine.motion_field import MotionField
+from engine.calibration import GroundPlaneCalibration
+from config import (
+    VIDEO_RESOLUTION, TILED_INFERENCE, ADAPTIVE_DETECTION, TRACKER_IMPLEMENTATION,
+    TRACKER_LOW_SCORE_THRESHOLD, HEADLESS, MOTION_FIELD, CALIBRATION_FILE
+)
+
+
+class FrameResult:
+    """
+    Lightweight result of ArgusCorePipeline.process_frame.
+
+    Analytics are computed eagerly; the annotated frame is only drawn the first
+    time `processed_frame` is accessed, so analytics-only consumers never pay
+    for drawing. Unpacks like the old (processed_frame, analytics_data) tuple.
+    """
+
+    def __init__(self, frame_number: int, frame: np.ndarray, tracks: np.ndarray, analytics_data: Dict,
+                 render: Optional[Callable[['FrameResult'], np.ndarray]] = None):
+        """
+        Args:
+            frame_number: Pipeline frame number
+            frame: Input frame (not modified)
+            tracks: Tracking results from SORT
+            analytics_data: Analytics results
+            render: Callable drawing the annotated frame; None (headless) makes
+                `processed_frame` return the input frame unannotated
+        """
+        self.frame_number = frame_number
+        self.frame = frame
+        self.tracks = tracks
+        self.analytics_data = analytics_data
+        self._render = render
+        self._processed_frame = None
+        self._render_lock = threading.Lock()  # Results may be shared between consumer threads
+
+    @property
+    def is_rendered(self) -> bool:
+        """True once the annotated frame has been drawn."""
+        return self._processed_frame is not None
+
+    @property
+    def processed_frame(self) -> np.ndarray:
+        """Annotated frame, drawn on first access."""
+        if self._processed_frame is None:
+            with self._render_lock:
+                if self._processed_frame is None:
+                    self._processed_frame = self.frame if self._render is None else self._render(self)
+        return self._processed_frame
+
+    def __iter__(self):
+        # Backwards compatible `processed_frame, analytics_data = pipeline.process_frame(frame)`
+        yield self.processed_frame
+        yield self.analytics_data
+
+    def __len__(self) -> int:
+        return 2
+
+    def __getitem__(self, index: int):
+        if index in (1, -1):
+            return self.analytics_data  # Does not trigger rendering
+        return (self.processed_frame, self.analytics_data)[index]
 
 
 class ArgusCorePipeline:
@@ -23,32 +88,131 @@ class ArgusCorePipeline:
     Main processing pipeline that orchestrates detection, tracking, and analytics
     """
     
-    def __init__(self):
-        """Initialize the core pipeline components"""
+    def __init__(self, tiled_inference: bool = TILED_INFERENCE, adaptive_detection: bool = ADAPTIVE_DETECTION,
+                 headless: bool = HEADLESS, detector=None, motion_field: bool = MOTION_FIELD,
+                 calibration: Union[GroundPlaneCalibration, str, None] = CALIBRATION_FILE):
+        """
+        Initialize the core pipeline components
+        
+        Args:
+            tiled_inference: Detect on overlapping tiles of the native-resolution frame
+            adaptive_detection: Skip the detector on calm frames and advance tracks
+                with Kalman prediction only
+            headless: Never draw visualizations (analytics-only node)
+            detector: Shared detector (e.g. a DetectorPool) exposing detect_persons_array;
+                a dedicated PersonDetector is created when omitted. Tiled inference
+                keeps per-camera state and needs a dedicated PersonDetector.
+            motion_field: Compute an optical-flow motion field as a detection-independent
+                source of coherence and kinetic energy
+            calibration: Ground-plane calibration of this camera, or the path of its
+                calibration file; density is then measured in persons/m²
+        """
         print("Initializing Argus Core Pipeline...")
         
+        if tiled_inference and detector is not None and not hasattr(detector, 'detect_persons_tiled'):
+            raise ValueError("Tiled inference requires a dedicated PersonDetector")
+        
         # Initialize components
-        self.detector = PersonDetector()
-        self.tracker = Sort(max_age=30, min_hits=3, iou_threshold=0.3)
-        self.analytics = CrowdAnalytics()
+        self.detector = detector if detector is not None else PersonDetector()
+        tracker_class = VectorizedSort if TRACKER_IMPLEMENTATION == "vectorized" else Sort
+        self.tracker = tracker_class(max_age=30, min_hits=3, iou_threshold=0.3)
+        if isinstance(calibration, str):
+            calibration = GroundPlaneCalibration.load(calibration) if calibration else None
+        self.calibration = calibration
+        self.analytics = CrowdAnalytics(calibration=calibration)
+        if calibration is not None:
+            rows, cols = calibration.grid_shape
+            print(f"📐 Ground-plane calibration: {rows}x{cols} grid of {calibration.cell_size_m:g} m cells")
+        self.scheduler = DetectionScheduler() if adaptive_detection else None
+        self.motion_field = MotionField() if motion_field else None
+        self.density_renderer = DensityOverlayRenderer()
         
         # Pipeline state
+        self.tiled_inference = tiled_inference
+        self.headless = headless
         self.frame_count = 0
+        self.video_subscribers = 0
+        self._subscriber_lock = threading.Lock()
         self.is_initialized = True
         
         print("✅ Argus Core Pipeline initialized successfully")
     
-    def process_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, Dict]:
+    def process_frame(self, frame: np.ndarray, native_frame: Optional[np.ndarray] = None) -> FrameResult:
         """
         Process a single frame through the complete pipeline
         
         Args:
             frame: Input frame as numpy array
+            native_frame: Optional full-resolution camera frame that `frame` was resized
+                from. Used for tiled inference; boxes are mapped back to `frame` coordinates
             
         Returns:
-            Tuple of (processed_frame, analytics_data)
+            FrameResult handle; `processed_frame` is drawn on first access and the
+            handle unpacks as (processed_frame, analytics_data)
+        """
+        self.validate_frame(frame)
+        self.frame_count += 1
+        
+        # Step 1: Person Detection (None when the scheduler skips this frame)
+        det_array = self.detect(frame, native_frame)
+        
+        motion = self.compute_motion(frame)
+        
+        # Steps 2-4: Tracking + Analytics
+        tracks, analytics_data = self.track_and_analyze(det_array, frame_size=(frame.shape[1], frame.shape[0]),
+                                                        motion=motion)
+        
+        # Step 5: Visualize results, deferred until someone asks for the frame
+        return FrameResult(self.frame_count, frame, tracks, analytics_data,
+                           render=None if self.headless else self._render_result)
+    
+    def _render_result(self, result: FrameResult) -> np.ndarray:
+        """Draw a FrameResult (used as its lazy render callback)."""
+        return self.visualize_results(result.frame, result.tracks, result.analytics_data,
+                                      frame_number=result.frame_number)
+    
+    def add_video_subscriber(self) -> int:
+        """
+        Register a consumer of annotated frames (e.g. an MJPEG client)
+        
+        Returns:
+            Number of video subscribers
+        """
+        with self._subscriber_lock:
+            self.video_subscribers += 1
+            return self.video_subscribers
+    
+    def remove_video_subscriber(self) -> int:
+        """
+        Unregister a consumer of annotated frames
+        
+        Returns:
+            Number of video subscribers
+        """
+        with self._subscriber_lock:
+            self.video_subscribers = max(0, self.video_subscribers - 1)
+            return self.video_subscribers
+    
+    def wants_video(self) -> bool:
+        """
+        Whether annotated frames should be produced ahead of time
+        
+        Returns:
+            False in headless mode or when no video subscriber is attached
+        """
+        return not self.headless and self.video_subscribers > 0
+    
+    @staticmethod
+    def validate_frame(frame: np.ndarray) -> None:
+        """
+        Validate an input frame
+        
+        Args:
+            frame: Input frame as numpy array
+            
+        Raises:
+            ValueError: If the frame is not a non-empty 3-channel uint8 image
         """
-        # Input validation
         if frame is None:
             raise ValueError("Frame cannot be None")
         if frame.size == 0:
@@ -57,34 +221,72 @@ class ArgusCorePipeline:
             raise ValueError("Frame must be a 3-channel color image")
         if frame.dtype != np.uint8:
             raise ValueError("Frame must be uint8 type")
-            
-        self.frame_count += 1
+    
+    def detect(self, frame: np.ndarray, native_frame: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """
+        Run person detection for a frame, honouring the detection scheduler
         
-        # Step 1: Person Detection
-        detections = self.detector.detect_persons(frame)
+        Args:
+            frame: Input frame as numpy array
+            native_frame: Optional full-resolution frame for tiled inference
+            
+        Returns:
+            (N, 5) [x1, y1, x2, y2, confidence] array that SORT consumes directly,
+            or None if the scheduler decided this is a tracker-only frame
+        """
+        if self.scheduler is not None and not self.scheduler.should_detect(frame):
+            return None
         
-        # Step 2: Convert detections to SORT format
-        if len(detections) > 0:
-            # Convert from (x1, y1, x2, y2, confidence) to numpy array
-            det_array = np.array([[det[0], det[1], det[2], det[3], det[4]] for det in detections])
-        else:
-            det_array = np.empty((0, 5))
+        # Low-confidence boxes are kept for the tracker's second association pass
+        if self.tiled_inference:
+            source = frame if native_frame is None else native_frame
+            return self.detector.detect_persons_tiled(source, output_size=(frame.shape[1], frame.shape[0]),
+                                                      min_confidence=TRACKER_LOW_SCORE_THRESHOLD)
+        return self.detector.detect_persons_array(frame, min_confidence=TRACKER_LOW_SCORE_THRESHOLD)
+    
+    def compute_motion(self, frame: np.ndarray) -> Optional[Dict]:
+        """
+        Optical-flow motion field of a frame (frames must arrive in order)
         
-        # Step 3: Update tracker
-        tracks = self.tracker.update(det_array)
+        Returns:
+            MotionField.compute result, or None if disabled or on the first frame
+        """
+        if self.motion_field is None:
+            return None
+        return self.motion_field.compute(frame)
+    
+    def track_and_analyze(self, det_array: Optional[np.ndarray],
+                          frame_size: Optional[Tuple[int, int]] = None,
+                          motion: Optional[Dict] = None) -> Tuple[np.ndarray, Dict]:
+        """
+        Update the tracker and compute analytics for one frame
         
-        # Step 4: Get tracker information for analytics
-        tracker_info = self.tracker.get_trackers()
+        Args:
+            det_array: Detections from detect(), or None to advance tracks with
+                Kalman prediction only
+            frame_size: (W, H) of the frame, so density grids cover the actual frame
+            motion: Optional motion field from compute_motion()
+            
+        Returns:
+            Tuple of (tracks, analytics_data)
+        """
+        if det_array is None:
+            tracks = self.tracker.predict_only()
+        else:
+            tracks = self.tracker.update(det_array)
         
-        # Step 5: Perform analytics
-        analytics_data = self.analytics.analyze_frame(tracker_info)
+        # Columnar track state for analytics (no per-track dictionaries)
+        snapshot = self.tracker.get_snapshot()
         
-        # Step 6: Visualize results
-        processed_frame = self.visualize_results(frame, tracks, analytics_data)
+        # Perform analytics
+        analytics_data = self.analytics.analyze_frame(snapshot, frame_size, motion)
+        if self.scheduler is not None:
+            self.scheduler.update_interval(analytics_data['kinetic_energy']['current'])
         
-        return processed_frame, analytics_data
+        return tracks, analytics_data
     
-    def visualize_results(self, frame: np.ndarray, tracks: np.ndarray, analytics_data: Dict) -> np.ndarray:
+    def visualize_results(self, frame: np.ndarray, tracks: np.ndarray, analytics_data: Dict,
+                          frame_number: Optional[int] = None) -> np.ndarray:
         """
         Draw visualizations on the frame
         
@@ -92,6 +294,7 @@ class ArgusCorePipeline:
             frame: Input frame
             tracks: Tracking results from SORT
             analytics_data: Analytics results
+            frame_number: Frame number to display; defaults to the pipeline's frame count
             
         Returns:
             Frame with visualizations
@@ -120,7 +323,7 @@ class ArgusCorePipeline:
         self.draw_density_grid(vis_frame, analytics_data['density']['grid'])
         
         # Draw status and metrics overlay
-        self.draw_metrics_overlay(vis_frame, analytics_data)
+        self.draw_metrics_overlay(vis_frame, analytics_data, frame_number)
         
         return vis_frame
     
@@ -132,57 +335,16 @@ class ArgusCorePipeline:
             frame: Frame to draw on
             density_grid: 2D density grid
         """
-        grid_height, grid_width = len(density_grid), len(density_grid[0])
-        cell_width = VIDEO_RESOLUTION[0] / grid_width
-        cell_height = VIDEO_RESOLUTION[1] / grid_height
-        
-        # Draw grid lines
-        for i in range(grid_width + 1):
-            x = int(i * cell_width)
-            cv2.line(frame, (x, 0), (x, VIDEO_RESOLUTION[1]), (100, 100, 100), 1)
-        
-        for i in range(grid_height + 1):
-            y = int(i * cell_height)
-            cv2.line(frame, (0, y), (VIDEO_RESOLUTION[0], y), (100, 100, 100), 1)
-        
-        # Color cells based on density
-        for i in range(grid_height):
-            for j in range(grid_width):
-                density = density_grid[i][j]
-                if density > 0:
-                    x1 = int(j * cell_width)
-                    y1 = int(i * cell_height)
-                    x2 = int((j + 1) * cell_width)
-                    y2 = int((i + 1) * cell_height)
-                    
-                    # Color based on density level
-                    if density >= 6.0:  # Critical
-                        color = (0, 0, 255, 100)  # Red
-                    elif density >= 4.0:  # Warning
-                        color = (0, 165, 255, 100)  # Orange
-                    else:  # Normal
-                        color = (0, 255, 255, 100)  # Yellow
-                    
-                    # Draw semi-transparent overlay
-                    overlay = frame.copy()
-                    cv2.rectangle(overlay, (x1, y1), (x2, y2), color[:3], -1)
-                    cv2.addWeighted(frame, 0.8, overlay, 0.2, 0, frame)
-                    
-                    # Draw density value
-                    text = f"{density:.0f}"
-                    text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)[0]
-                    text_x = x1 + (x2 - x1 - text_size[0]) // 2
-                    text_y = y1 + (y2 - y1 + text_size[1]) // 2
-                    cv2.putText(frame, text, (text_x, text_y), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        self.density_renderer.draw(frame, density_grid)
     
-    def draw_metrics_overlay(self, frame: np.ndarray, analytics_data: Dict):
+    def draw_metrics_overlay(self, frame: np.ndarray, analytics_data: Dict, frame_number: Optional[int] = None):
         """
         Draw metrics and status overlay
         
         Args:
             frame: Frame to draw on
             analytics_data: Analytics results
+            frame_number: Frame number to display; defaults to the pipeline's frame count
         """
         # Status color
         status = analytics_data['status']
@@ -216,7 +378,9 @@ class ArgusCorePipeline:
             y_offset += 20
         
         # Frame info
-        cv2.putText(frame, f"Frame: {self.frame_count}", (20, y_offset + 10), 
+        if frame_number is None:
+            frame_number = self.frame_count
+        cv2.putText(frame, f"Frame: {frame_number}", (20, y_offset + 10), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 200), 1)
     
     def get_pipeline_stats(self) -> Dict:
@@ -226,11 +390,18 @@ class ArgusCorePipeline:
         Returns:
             Dictionary with pipeline statistics
         """
-        return {
+        stats = {
             'frame_count': self.frame_count,
             'is_initialized': self.is_initialized,
+            'headless': self.headless,
+            'video_subscribers': self.video_subscribers,
             'analytics_stats': self.analytics.get_summary_stats()
         }
+        if self.scheduler is not None:
+            stats['scheduler_stats'] = self.scheduler.get_stats()
+        if self.motion_field is not None:
+            stats['motion_field_stats'] = self.motion_field.get_stats()
+        return stats
 
 
 def test_core_pipeline():
@@ -251,8 +422,11 @@ def test_core_pipeline():
     cv2.rectangle(test_frame, (100, 100), (150, 200), (255, 255, 255), -1)
     cv2.rectangle(test_frame, (300, 150), (350, 250), (255, 255, 255), -1)
     
-    # Process frame
-    processed_frame, analytics_data = pipeline.process_frame(test_frame)
+    # Process frame; the annotated frame is only drawn when requested
+    result = pipeline.process_frame(test_frame)
+    assert not result.is_rendered
+    processed_frame, analytics_data = result
+    assert result.is_rendered and processed_frame is not test_frame
     
     print("Pipeline Test Results:")
     print(f"✅ Frame processed successfully")
@@ -6,13 +6,18 @@ Handles loading the model and performing inference on video frames.
 import cv2
 import numpy as np
 from ultralytics import YOLO
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Dict, Optional
 import os
 import sys
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import YOLO_MODEL_PATH
+from config import (
+    YOLO_MODEL_PATH, DETECTOR_BACKEND, DETECTOR_INT8, DETECTOR_CALIBRATION_SOURCE,
+    TILE_SIZE, TILE_OVERLAP, TILE_NMS_IOU_THRESHOLD, TILE_MOTION_THRESHOLD,
+    TILE_REFRESH_INTERVAL, TILE_INCLUDE_FULL_FRAME
+)
+from engine.export import exported_model_path, export_detector
 
 
 class PersonDetector:
@@ -20,21 +25,49 @@ class PersonDetector:
     YOLOv8-based person detector for crowd analytics.
     """
     
-    def __init__(self, model_path: str = YOLO_MODEL_PATH, confidence_threshold: float = 0.5):
+    def __init__(self, model_path: str = YOLO_MODEL_PATH, confidence_threshold: float = 0.5,
+                 backend: str = DETECTOR_BACKEND, int8: bool = DETECTOR_INT8):
         """
         Initialize the person detector.
         
         Args:
             model_path: Path to the YOLOv8 model file
             confidence_threshold: Minimum confidence for detections
+            backend: Inference backend - "pytorch", "onnx" or "openvino"
+            int8: Use the INT8-quantized export (ignored for the pytorch backend)
         """
         self.model_path = model_path
         self.confidence_threshold = confidence_threshold
+        self.backend = backend
+        self.int8 = int8 and backend != "pytorch"
         self.model = None
+        
+        # Tiled inference state (see detect_persons_tiled)
+        self.tile_size = TILE_SIZE
+        self.tile_overlap = TILE_OVERLAP
+        self.roi_mask = None
+        self._prev_motion_gray = None
+        self._tile_cache: Dict[Tuple[int, int], np.ndarray] = {}
+        self._tile_age: Dict[Tuple[int, int], int] = {}
+        self._full_frame_cache: Optional[np.ndarray] = None  # Downscaled full-frame view, like a tile
+        self._full_frame_age = 0
+        self._tile_frame_size = None
+        self.last_tile_stats = {'tiles_total': 0, 'tiles_run': 0, 'full_frame_run': False}
+        
         self._load_model()
     
     def _load_model(self) -> None:
-        """Load the YOLOv8 model."""
+        """Load the YOLOv8 model for the configured backend."""
+        if self.backend != "pytorch":
+            try:
+                self._load_exported_model()
+                return
+            except Exception as e:
+                print(f"Error loading {self.backend} detector backend: {e}")
+                print("Falling back to the PyTorch backend")
+                self.backend = "pytorch"
+                self.int8 = False
+        
         try:
             self.model = YOLO(self.model_path)
             print(f"YOLOv8 model loaded successfully from {self.model_path}")
@@ -49,6 +82,14 @@ class PersonDetector:
                 self.model.save(self.model_path)
                 print(f"Model saved to {self.model_path}")
     
+    def _load_exported_model(self) -> None:
+        """Load an ONNX Runtime / OpenVINO export, exporting it once if missing."""
+        exported_path = exported_model_path(self.model_path, self.backend, self.int8)
+        if not os.path.exists(exported_path):
+            export_detector(self.model_path, self.backend, self.int8, DETECTOR_CALIBRATION_SOURCE)
+        self.model = YOLO(exported_path, task="detect")
+        print(f"YOLOv8 {self.backend}{' INT8' if self.int8 else ''} model loaded from {exported_path}")
+    
     def detect_persons(self, frame: np.ndarray) -> List[Tuple[int, int, int, int, float]]:
         """
         Detect persons in a frame.
@@ -59,32 +100,282 @@ class PersonDetector:
         Returns:
             List of detections as (x1, y1, x2, y2, confidence) tuples
         """
+        return self._to_tuples(self.detect_persons_array(frame))
+    
+    def detect_persons_array(self, frame: np.ndarray, min_confidence: Optional[float] = None) -> np.ndarray:
+        """
+        Detect persons in a frame and return them in SORT input format.
+        
+        Args:
+            frame: Input frame as numpy array
+            min_confidence: Override confidence_threshold, e.g. to keep low-confidence
+                boxes for the tracker's second association pass
+            
+        Returns:
+            float32 array of shape (N, 5) with rows [x1, y1, x2, y2, confidence],
+            ready to be passed to Sort.update
+        """
         if self.model is None:
-            return []
+            return np.empty((0, 5), dtype=np.float32)
         
         try:
-            # Run inference
-            results = self.model(frame, verbose=False)
-            
-            detections = []
-            for result in results:
-                boxes = result.boxes
-                if boxes is not None:
-                    for box in boxes:
-                        # Get class ID (0 is person in COCO dataset)
-                        class_id = int(box.cls[0])
-                        if class_id == 0:  # Person class
-                            confidence = float(box.conf[0])
-                            if confidence >= self.confidence_threshold:
-                                # Get bounding box coordinates
-                                x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                                detections.append((int(x1), int(y1), int(x2), int(y2), confidence))
+            # Run inference (conf is passed so YOLO's own NMS cut-off does not drop low boxes)
+            threshold = self.confidence_threshold if min_confidence is None else min_confidence
+            results = self.model(frame, verbose=False, conf=threshold)
             
-            return detections
+            decoded = [self._decode_result(result, threshold) for result in results]
+            if len(decoded) == 1:
+                return decoded[0]
+            if len(decoded) == 0:
+                return np.empty((0, 5), dtype=np.float32)
+            return np.concatenate(decoded, axis=0)
             
         except Exception as e:
             print(f"Error during detection: {e}")
+            return np.empty((0, 5), dtype=np.float32)
+    
+    def detect_persons_batch(self, frames: List[np.ndarray], as_array: bool = False,
+                             min_confidence: Optional[float] = None) -> List:
+        """
+        Detect persons in several frames with a single forward pass.
+        
+        Args:
+            frames: List of input frames as numpy arrays (e.g. one per camera)
+            as_array: Return (N, 5) float32 arrays instead of lists of tuples
+            min_confidence: Override confidence_threshold for this call
+            
+        Returns:
+            One result per input frame, in input order. Each result is a list of
+            (x1, y1, x2, y2, confidence) tuples, or an (N, 5) array if as_array is set
+        """
+        if len(frames) == 0:
             return []
+        if self.model is None:
+            empty = np.empty((0, 5), dtype=np.float32)
+            return [empty.copy() if as_array else [] for _ in frames]
+        
+        try:
+            # Ultralytics stacks a list of images into one batch tensor
+            threshold = self.confidence_threshold if min_confidence is None else min_confidence
+            results = self.model(list(frames), verbose=False, conf=threshold)
+            decoded = [self._decode_result(result, threshold) for result in results]
+            
+        except Exception as e:
+            print(f"Error during batch detection: {e}")
+            decoded = [np.empty((0, 5), dtype=np.float32) for _ in frames]
+        
+        if as_array:
+            return decoded
+        return [self._to_tuples(dets) for dets in decoded]
+    
+    def detect_persons_tiled(self, frame: np.ndarray, roi_mask: Optional[np.ndarray] = None,
+                             output_size: Optional[Tuple[int, int]] = None,
+                             min_confidence: Optional[float] = None) -> np.ndarray:
+        """
+        Detect persons with sliced inference over overlapping tiles of a native-resolution frame.
+        
+        Small, distant people keep their pixel size instead of being shrunk with the
+        whole frame. All active tiles (plus an optional downscaled full-frame view for
+        large, close people) run as one batch and are merged with cross-tile NMS.
+        Tiles outside the ROI are never run; tiles without motion since the previous
+        frame reuse their last detections until TILE_REFRESH_INTERVAL frames pass.
+        The full-frame view follows the same rule (it reruns when any ROI tile moves)
+        and only keeps boxes whose center lies inside the ROI.
+        
+        Args:
+            frame: Input frame at native camera resolution
+            roi_mask: Optional mask (any resolution) where non-zero marks the region of
+                interest; defaults to self.roi_mask
+            output_size: Optional (W, H) to rescale boxes to, e.g. VIDEO_RESOLUTION
+            min_confidence: Override confidence_threshold for this call
+            
+        Returns:
+            float32 array of shape (N, 5) with rows [x1, y1, x2, y2, confidence]
+        """
+        if self.model is None:
+            return np.empty((0, 5), dtype=np.float32)
+        
+        frame_h, frame_w = frame.shape[:2]
+        tiles = self._tile_grid(frame_w, frame_h)
+        roi_mask = self.roi_mask if roi_mask is None else roi_mask
+        active = self._active_tiles(frame, tiles, roi_mask)
+        
+        # Decide per tile whether to run inference or reuse its cached detections
+        to_run = []
+        for tile, (in_roi, moving) in zip(tiles, active):
+            key = tile[:2]
+            if not in_roi:
+                self._tile_cache.pop(key, None)
+                self._tile_age.pop(key, None)
+                continue
+            age = self._tile_age.get(key, TILE_REFRESH_INTERVAL)
+            if moving or key not in self._tile_cache or age >= TILE_REFRESH_INTERVAL:
+                to_run.append(tile)
+            else:
+                self._tile_age[key] = age + 1
+        
+        use_full_frame = TILE_INCLUDE_FULL_FRAME and len(tiles) > 1 and any(in_roi for in_roi, _ in active)
+        run_full_frame = use_full_frame and (
+            any(in_roi and moving for in_roi, moving in active) or self._full_frame_cache is None or
+            self._full_frame_age >= TILE_REFRESH_INTERVAL)
+        if use_full_frame and not run_full_frame:
+            self._full_frame_age += 1
+        
+        crops = [frame[y:y + h, x:x + w] for x, y, w, h in to_run]
+        if run_full_frame:
+            crops.append(frame)
+        
+        results = self.detect_persons_batch(crops, as_array=True, min_confidence=min_confidence) if crops else []
+        if run_full_frame:
+            self._full_frame_cache = results[-1]
+            self._full_frame_age = 0
+        
+        for (x, y, w, h), dets in zip(to_run, results):
+            dets = dets.copy()
+            dets[:, [0, 2]] += x
+            dets[:, [1, 3]] += y
+            self._tile_cache[(x, y)] = dets
+            self._tile_age[(x, y)] = 0
+        
+        merged = [self._tile_cache[tile[:2]] for tile, (in_roi, _) in zip(tiles, active)
+                  if in_roi and tile[:2] in self._tile_cache]
+        if use_full_frame and self._full_frame_cache is not None:
+            merged.append(self._inside_roi(self._full_frame_cache, roi_mask, frame_w, frame_h))
+        
+        self.last_tile_stats = {'tiles_total': len(tiles), 'tiles_run': len(to_run),
+                                'full_frame_run': run_full_frame}
+        
+        if not merged:
+            return np.empty((0, 5), dtype=np.float32)
+        detections = non_max_suppression(np.concatenate(merged, axis=0), TILE_NMS_IOU_THRESHOLD, match_metric="ios")
+        
+        if output_size is not None and (output_size[0] != frame_w or output_size[1] != frame_h):
+            detections[:, [0, 2]] *= output_size[0] / frame_w
+            detections[:, [1, 3]] *= output_size[1] / frame_h
+        return detections
+    
+    def _tile_grid(self, frame_w: int, frame_h: int) -> List[Tuple[int, int, int, int]]:
+        """
+        Compute overlapping tiles covering the frame.
+        
+        Returns:
+            List of (x, y, w, h) tiles; the last tile on each axis is flush with the frame edge
+        """
+        def starts(length: int) -> List[int]:
+            size = min(self.tile_size, length)
+            stride = max(1, int(size * (1.0 - self.tile_overlap)))
+            positions = list(range(0, length - size + 1, stride))
+            if positions[-1] + size < length:
+                positions.append(length - size)
+            return positions
+        
+        tile_w, tile_h = min(self.tile_size, frame_w), min(self.tile_size, frame_h)
+        if (frame_w, frame_h) != self._tile_frame_size:
+            # Geometry changed - cached detections no longer line up
+            self._tile_frame_size = (frame_w, frame_h)
+            self._tile_cache.clear()
+            self._tile_age.clear()
+            self._full_frame_cache = None
+            self._prev_motion_gray = None
+        return [(x, y, tile_w, tile_h) for y in starts(frame_h) for x in starts(frame_w)]
+    
+    def _active_tiles(self, frame: np.ndarray, tiles: List[Tuple[int, int, int, int]],
+                      roi_mask: Optional[np.ndarray]) -> List[Tuple[bool, bool]]:
+        """
+        Flag each tile as inside the ROI and/or containing motion.
+        
+        Motion is the mean absolute grayscale difference to the previous frame,
+        computed on a 4x downscaled frame with an integral image so each tile costs O(1).
+        
+        Returns:
+            List of (in_roi, moving) flags, one per tile
+        """
+        scale = 4
+        frame_h, frame_w = frame.shape[:2]
+        small_size = (max(1, frame_w // scale), max(1, frame_h // scale))
+        gray = cv2.cvtColor(cv2.resize(frame, small_size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        
+        motion_integral = None
+        if self._prev_motion_gray is not None:
+            motion_integral = cv2.integral(cv2.absdiff(gray, self._prev_motion_gray))
+        self._prev_motion_gray = gray
+        
+        roi_integral = None
+        if roi_mask is not None:
+            small_roi = cv2.resize((roi_mask > 0).astype(np.uint8), small_size, interpolation=cv2.INTER_NEAREST)
+            roi_integral = cv2.integral(small_roi)
+        
+        def region_sum(integral: np.ndarray, x: int, y: int, w: int, h: int) -> Tuple[float, int]:
+            x1, y1 = x // scale, y // scale
+            x2 = max(x1 + 1, min(small_size[0], (x + w) // scale))
+            y2 = max(y1 + 1, min(small_size[1], (y + h) // scale))
+            total = integral[y2, x2] - integral[y1, x2] - integral[y2, x1] + integral[y1, x1]
+            return float(total), (x2 - x1) * (y2 - y1)
+        
+        flags = []
+        for x, y, w, h in tiles:
+            in_roi = roi_integral is None or region_sum(roi_integral, x, y, w, h)[0] > 0
+            if motion_integral is None:
+                moving = True  # No previous frame - treat everything as new
+            else:
+                total, area = region_sum(motion_integral, x, y, w, h)
+                moving = total / area >= TILE_MOTION_THRESHOLD
+            flags.append((in_roi, moving))
+        return flags
+    
+    @staticmethod
+    def _inside_roi(detections: np.ndarray, roi_mask: Optional[np.ndarray], frame_w: int, frame_h: int) -> np.ndarray:
+        """
+        Keep the detections whose box center lies inside the ROI.
+        
+        Args:
+            detections: (N, 5) boxes in frame coordinates
+            roi_mask: Mask of any resolution (non-zero inside), or None for no ROI
+            frame_w, frame_h: Size of the frame the boxes refer to
+        """
+        if roi_mask is None or len(detections) == 0:
+            return detections
+        mask_h, mask_w = roi_mask.shape[:2]
+        cx = ((detections[:, 0] + detections[:, 2]) * 0.5 * mask_w / frame_w).astype(np.intp)
+        cy = ((detections[:, 1] + detections[:, 3]) * 0.5 * mask_h / frame_h).astype(np.intp)
+        inside = roi_mask[np.clip(cy, 0, mask_h - 1), np.clip(cx, 0, mask_w - 1)] > 0
+        return detections[inside]
+    
+    def _decode_result(self, result, min_confidence: Optional[float] = None) -> np.ndarray:
+        """
+        Extract person detections from a single YOLO result.
+        
+        The whole box tensor is copied to the host once and filtered in NumPy,
+        instead of reading cls/conf/xyxy box by box.
+        
+        Args:
+            result: Ultralytics result object for one image
+            min_confidence: Confidence cut-off; defaults to confidence_threshold
+            
+        Returns:
+            float32 array of shape (N, 5) with rows [x1, y1, x2, y2, confidence]
+        """
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return np.empty((0, 5), dtype=np.float32)
+        
+        # boxes.data rows are [x1, y1, x2, y2, conf, cls]
+        data = boxes.data
+        if hasattr(data, 'cpu'):
+            data = data.cpu().numpy()
+        data = np.asarray(data, dtype=np.float32)
+        
+        # Keep persons (class 0 in COCO) above the confidence threshold
+        threshold = self.confidence_threshold if min_confidence is None else min_confidence
+        keep = (data[:, 5] == 0) & (data[:, 4] >= threshold)
+        return np.ascontiguousarray(data[keep, :5])
+    
+    @staticmethod
+    def _to_tuples(detections: np.ndarray) -> List[Tuple[int, int, int, int, float]]:
+        """Convert an (N, 5) detection array to (x1, y1, x2, y2, confidence) tuples."""
+        coords = detections[:, :4].astype(int).tolist()
+        confidences = detections[:, 4].tolist()
+        return [(x1, y1, x2, y2, conf) for (x1, y1, x2, y2), conf in zip(coords, confidences)]
     
     def draw_detections(self, frame: np.ndarray, detections: List[Tuple[int, int, int, int, float]]) -> np.ndarray:
         """
@@ -114,6 +405,47 @@ class PersonDetector:
         return frame_copy
 
 
+def non_max_suppression(detections: np.ndarray, iou_threshold: float = 0.5, match_metric: str = "iou") -> np.ndarray:
+    """
+    Greedy non-maximum suppression over [x1, y1, x2, y2, confidence] rows.
+    
+    Args:
+        detections: Array of shape (N, 5)
+        iou_threshold: Boxes overlapping a higher-scoring box above this value are dropped
+        match_metric: "iou" (intersection over union) or "ios" (intersection over the
+            smaller box). "ios" also removes partial boxes of a person cut by a tile edge
+        
+    Returns:
+        Array of kept detections, sorted by descending confidence
+    """
+    if len(detections) == 0:
+        return detections
+    
+    order = np.argsort(-detections[:, 4])
+    boxes = detections[order]
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1) * (y2 - y1)
+    
+    suppressed = np.zeros(len(boxes), dtype=bool)
+    for i in range(len(boxes)):
+        if suppressed[i]:
+            continue
+        rest = np.arange(i + 1, len(boxes))
+        rest = rest[~suppressed[rest]]
+        if len(rest) == 0:
+            break
+        w = np.maximum(0.0, np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]))
+        h = np.maximum(0.0, np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]))
+        inter = w * h
+        if match_metric == "ios":
+            overlap = inter / (np.minimum(areas[i], areas[rest]) + 1e-9)
+        else:
+            overlap = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        suppressed[rest[overlap > iou_threshold]] = True
+    
+    return boxes[~suppressed]
+
+
 def test_detection():
     """Test function for the person detector."""
     detector = PersonDetector()
@@ -125,6 +457,39 @@ def test_detection():
     detections = detector.detect_persons(test_frame)
     print(f"Detected {len(detections)} persons")
     
+    # Test batched detection
+    batch_detections = detector.detect_persons_batch([test_frame, test_frame])
+    print(f"Batch detection returned results for {len(batch_detections)} frames")
+    
+    # Test tiled detection on a native-resolution frame
+    native_frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    tiled_detections = detector.detect_persons_tiled(native_frame, output_size=(640, 480))
+    print(f"Tiled detection: {len(tiled_detections)} persons, {detector.last_tile_stats}")
+    
+    # Full-frame view: skipped with the tiles on a static scene, and its boxes are
+    # held to the ROI (a fake batch finds two people in the full-frame view only)
+    def fake_batch(crops, as_array=True, min_confidence=None):
+        batches.append(len(crops))
+        people = np.array([[10, 10, 50, 90, 0.9], [1500, 800, 1560, 900, 0.8]], dtype=np.float32)
+        return [people if crop.shape == native_frame.shape else np.empty((0, 5), dtype=np.float32)
+                for crop in crops]
+    
+    batches = []
+    tiled = PersonDetector()
+    tiled.detect_persons_batch = fake_batch
+    tiled.detect_persons_tiled(native_frame)
+    assert tiled.last_tile_stats['full_frame_run'] and batches[-1] == tiled.last_tile_stats['tiles_run'] + 1
+    for _ in range(3):
+        tiled.detect_persons_tiled(native_frame)
+        assert tiled.last_tile_stats['tiles_run'] == 0 and not tiled.last_tile_stats['full_frame_run']
+    assert len(batches) == 1
+    
+    roi = np.zeros((108, 192), dtype=np.uint8)
+    roi[60:, 120:] = 1  # Bottom-right corner only, at a tenth of the frame resolution
+    tiled.roi_mask = roi
+    roi_detections = tiled.detect_persons_tiled(native_frame)
+    assert len(roi_detections) == 1 and roi_detections[0, 0] == 1500
+    
     # Test drawing
     result_frame = detector.draw_detections(test_frame, detections)
     print("Detection test completed successfully")
@@ -0,0 +1,273 @@
+"""
+Export of the YOLOv8 person detector to CPU-optimized inference backends.
+Converts the PyTorch weights once to ONNX Runtime or OpenVINO format, optionally
+with INT8 quantization calibrated on frames from our own footage.
+"""
+
+import cv2
+import numpy as np
+import glob
+import os
+import sys
+import tempfile
+from typing import List, Optional
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import YOLO_MODEL_PATH, DETECTOR_IMAGE_SIZE
+
+SUPPORTED_BACKENDS = ("pytorch", "onnx", "openvino")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def exported_model_path(model_path: str, backend: str, int8: bool = False) -> str:
+    """
+    Get the location of the exported model for a backend.
+
+    Args:
+        model_path: Path to the PyTorch .pt weights
+        backend: One of SUPPORTED_BACKENDS
+        int8: Whether the INT8-quantized variant is requested
+
+    Returns:
+        Path to the exported model file (ONNX) or directory (OpenVINO)
+    """
+    if backend not in SUPPORTED_BACKENDS:
+        raise ValueError(f"Unsupported detector backend '{backend}'. Choose from: {SUPPORTED_BACKENDS}")
+
+    base = os.path.splitext(model_path)[0]
+    suffix = "_int8" if int8 else ""
+    if backend == "onnx":
+        return f"{base}{suffix}.onnx"
+    if backend == "openvino":
+        # Matches the directory name Ultralytics writes on export
+        return f"{base}{suffix}_openvino_model"
+    return model_path
+
+
+def load_calibration_frames(source: str, max_frames: int = 200) -> List[np.ndarray]:
+    """
+    Load BGR frames for INT8 calibration from a video file or an image directory.
+
+    Frames are sampled evenly across the source so that calibration covers the
+    whole clip rather than only its first seconds.
+
+    Args:
+        source: Path to a video file or a directory of images
+        max_frames: Maximum number of frames to return
+
+    Returns:
+        List of frames as numpy arrays
+    """
+    if os.path.isdir(source):
+        paths = sorted(p for p in glob.glob(os.path.join(source, "*"))
+                       if p.lower().endswith(IMAGE_EXTENSIONS))
+        step = max(1, len(paths) // max_frames)
+        frames = [cv2.imread(p) for p in paths[::step][:max_frames]]
+        return [f for f in frames if f is not None]
+
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise ValueError(f"Cannot open calibration source: {source}")
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or max_frames
+    step = max(1, total // max_frames)
+
+    frames = []
+    index = 0
+    try:
+        while len(frames) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if index % step == 0:
+                frames.append(frame)
+            index += 1
+    finally:
+        cap.release()
+    return frames
+
+
+def preprocess_for_export(frame: np.ndarray, imgsz: int = DETECTOR_IMAGE_SIZE) -> np.ndarray:
+    """
+    Letterbox a BGR frame into the exported model's NCHW float32 input layout.
+
+    Args:
+        frame: Input frame as numpy array
+        imgsz: Square input size of the exported model
+
+    Returns:
+        Array of shape (1, 3, imgsz, imgsz) scaled to [0, 1]
+    """
+    h, w = frame.shape[:2]
+    scale = min(imgsz / h, imgsz / w)
+    new_w, new_h = int(round(w * scale)), int(round(h * scale))
+    resized = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    top = (imgsz - new_h) // 2
+    left = (imgsz - new_w) // 2
+    canvas[top:top + new_h, left:left + new_w] = resized
+
+    rgb = cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB)
+    return np.ascontiguousarray(rgb.transpose(2, 0, 1)[np.newaxis], dtype=np.float32) / 255.0
+
+
+def _quantize_onnx(fp32_path: str, int8_path: str, frames: List[np.ndarray], imgsz: int) -> None:
+    """Statically quantize an ONNX model to INT8 using calibration frames."""
+    import onnx
+    from onnxruntime.quantization import CalibrationDataReader, QuantType, quantize_static
+
+    graph = onnx.load(fp32_path, load_external_data=False).graph
+    input_name = graph.input[0].name
+
+    # Keep the detection head's box/score decoding in float: boxes (0..imgsz) and
+    # class scores (0..1) share one output tensor and a single INT8 scale wipes out
+    # the scores. Only the head's conv branches ("cv2"/"cv3") are quantized.
+    head = graph.node[-1].name.rsplit("/", 1)[0] + "/"
+    excluded = [node.name for node in graph.node
+                if node.name.startswith(head) and not node.name.startswith(head + "cv")]
+
+    class FrameReader(CalibrationDataReader):
+        def __init__(self):
+            self._frames = iter(frames)
+
+        def get_next(self):
+            frame = next(self._frames, None)
+            if frame is None:
+                return None
+            return {input_name: preprocess_for_export(frame, imgsz)}
+
+    quantize_static(fp32_path, int8_path, FrameReader(), nodes_to_exclude=excluded,
+                    activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8,
+                    per_channel=True)
+
+    # Keep the Ultralytics metadata (class names, stride, imgsz) on the quantized model
+    source = onnx.load(fp32_path)
+    quantized = onnx.load(int8_path)
+    quantized.metadata_props.extend(source.metadata_props)
+    onnx.save(quantized, int8_path)
+
+
+def _write_calibration_dataset(frames: List[np.ndarray], workdir: str) -> str:
+    """Dump calibration frames to disk and write an Ultralytics dataset YAML for them."""
+    image_dir = os.path.join(workdir, "images")
+    os.makedirs(image_dir, exist_ok=True)
+    for i, frame in enumerate(frames):
+        cv2.imwrite(os.path.join(image_dir, f"calib_{i:05d}.jpg"), frame)
+
+    yaml_path = os.path.join(workdir, "calibration.yaml")
+    with open(yaml_path, "w") as f:
+        f.write(f"path: {workdir}\ntrain: images\nval: images\nnames:\n  0: person\n")
+    return yaml_path
+
+
+def export_detector(model_path: str = YOLO_MODEL_PATH, backend: str = "onnx", int8: bool = False,
+                    calibration_source: Optional[str] = None, imgsz: int = DETECTOR_IMAGE_SIZE,
+                    max_calibration_frames: int = 200) -> str:
+    """
+    Export the PyTorch detector to a CPU inference backend.
+
+    Args:
+        model_path: Path to the PyTorch .pt weights
+        backend: "onnx" or "openvino"
+        int8: Produce an INT8-quantized model
+        calibration_source: Video file or image directory used for INT8 calibration
+        imgsz: Square input size of the exported model
+        max_calibration_frames: Maximum number of calibration frames to use
+
+    Returns:
+        Path to the exported model
+    """
+    from ultralytics import YOLO
+
+    target = exported_model_path(model_path, backend, int8)
+    if backend == "pytorch":
+        return target
+    if int8 and not calibration_source:
+        raise ValueError("INT8 export requires a calibration_source (video file or image directory)")
+
+    frames = load_calibration_frames(calibration_source, max_calibration_frames) if int8 else []
+    if int8 and not frames:
+        raise ValueError(f"No calibration frames could be read from {calibration_source}")
+
+    model = YOLO(model_path)
+    print(f"Exporting {model_path} to {backend}{' (INT8)' if int8 else ''}...")
+
+    if backend == "onnx":
+        fp32_path = exported_model_path(model_path, "onnx", int8=False)
+        if not os.path.exists(fp32_path):
+            fp32_path = model.export(format="onnx", imgsz=imgsz, simplify=True)
+        if int8:
+            _quantize_onnx(fp32_path, target, frames, imgsz)
+        exported = target
+
+    else:  # openvino
+        with tempfile.TemporaryDirectory() as workdir:
+            data = _write_calibration_dataset(frames, workdir) if int8 else None
+            exported = model.export(format="openvino", imgsz=imgsz, int8=int8, data=data)
+
+    print(f"Exported model saved to {exported}")
+    return exported
+
+
+def test_export():
+    """Test function for detector export."""
+    import shutil
+
+    assert exported_model_path("models/yolov8n.pt", "onnx", int8=True) == "models/yolov8n_int8.onnx"
+    assert exported_model_path("models/yolov8n.pt", "openvino") == "models/yolov8n_openvino_model"
+
+    # Letterboxed NCHW float32 in [0, 1]: BGR -> RGB, gray (114) padding above and below
+    test_frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    test_frame[..., 0] = 255  # Pure blue
+    blob = preprocess_for_export(test_frame, imgsz=640)
+    assert blob.shape == (1, 3, 640, 640) and blob.dtype == np.float32
+    assert blob.min() >= 0.0 and blob.max() <= 1.0
+    assert np.allclose(blob[0, :, 320, 320], [0.0, 0.0, 1.0])
+    assert np.allclose(blob[0, :, 10, 320], 114 / 255.0) and np.allclose(blob[0, :, 630, 320], 114 / 255.0)
+    print(f"Preprocessed input shape: {blob.shape}")
+
+    # The ONNX Runtime detector finds the same people as PyTorch
+    try:
+        import onnxruntime  # noqa: F401
+    except ImportError:
+        print("onnxruntime not installed - skipping ONNX parity check")
+        print("Export test completed successfully")
+        return
+    from ultralytics.utils import ASSETS
+    from engine.detection import PersonDetector
+    from engine.tracking import iou_batch
+
+    frame = cv2.imread(str(ASSETS / "bus.jpg"))
+    with tempfile.TemporaryDirectory() as workdir:
+        # Export a copy of the weights, so the test leaves no model files behind
+        weights = os.path.join(workdir, os.path.basename(YOLO_MODEL_PATH))
+        shutil.copy(YOLO_MODEL_PATH, weights)
+        export_detector(weights, "onnx")
+        reference = PersonDetector(weights).detect_persons_array(frame)
+        onnx_detector = PersonDetector(weights, backend="onnx")
+        assert onnx_detector.backend == "onnx"
+        exported = onnx_detector.detect_persons_array(frame)
+
+    assert len(reference) > 0 and len(exported) == len(reference)
+    assert np.all(iou_batch(reference[:, :4], exported[:, :4]).max(axis=1) > 0.95)
+    print(f"ONNX and PyTorch agree on {len(reference)} persons")
+
+    print("Export test completed successfully")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export the Argus person detector (runs the self-test by default)")
+    parser.add_argument("--export", action="store_true", help="Export the detector instead of running the self-test")
+    parser.add_argument("--backend", choices=["onnx", "openvino"], default="onnx")
+    parser.add_argument("--int8", action="store_true", help="Quantize to INT8")
+    parser.add_argument("--calibration", help="Video file or image directory for INT8 calibration")
+    parser.add_argument("--model", default=YOLO_MODEL_PATH)
+    args = parser.parse_args()
+
+    if args.export:
+        export_detector(args.model, args.backend, args.int8, args.calibration)
+    else:
+        test_export()
@@ -0,0 +1,720 @@
+"""
+Shared capture-and-process hub for The Argus Protocol.
+Captures and processes every frame of a source exactly once and fans the result
+out to all connected clients (MJPEG viewers, WebSocket dashboards), so adding a
+viewer costs a queue put instead of another inference run.
+"""
+
+import asyncio
+import cv2
+import numpy as np
+import threading
+import time
+import queue
+from typing import Callable, Dict, List, Optional
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from engine.pipelined import BoundedStageQueue, PipelinedExecutor, PipelineItem
+from config import PROCESSING_FPS, HUB_SUBSCRIBER_QUEUE_SIZE, JPEG_QUALITY, PIPELINED_EXECUTION
+
+SUBSCRIPTION_KINDS = ("video", "analytics")
+
+
+class HubFrame:
+    """
+    One processed frame as published to subscribers.
+    """
+
+    def __init__(self, result, source_label: str = "", annotate: Optional[Callable] = None):
+        """
+        Args:
+            result: FrameResult from ArgusCorePipeline.process_frame
+            source_label: Human-readable name of the capture source
+            annotate: Optional callable (processed_frame, hub_frame) drawing extra
+                overlays; applied once, together with the lazy render
+        """
+        self.result = result
+        self.source_label = source_label
+        self.published_at = time.time()
+        self._annotate = annotate
+        self._annotated = annotate is None
+        self._lock = threading.Lock()
+
+    @property
+    def frame_number(self) -> int:
+        return self.result.frame_number
+
+    @property
+    def analytics_data(self) -> Dict:
+        return self.result.analytics_data
+
+    @property
+    def processed_frame(self) -> np.ndarray:
+        """Annotated frame, drawn once on first access by any subscriber."""
+        frame = self.result.processed_frame
+        if not self._annotated:
+            with self._lock:
+                if not self._annotated:
+                    self._annotate(frame, self)
+                    self._annotated = True
+        return frame
+
+
+class JpegCache:
+    """
+    Latest encoded JPEGs of a hub, keyed by (frame number, quality).
+
+    Every MJPEG client of a source asks for the same newest frame, so each
+    frame is encoded once per quality level no matter how many clients watch.
+    """
+
+    def __init__(self):
+        self._frame_number = None
+        self._encoded: Dict[int, bytes] = {}
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.encodes = 0
+        self.hits = 0
+
+    def get(self, hub_frame: HubFrame, quality: int = JPEG_QUALITY) -> bytes:
+        """
+        Get the JPEG bytes of a frame, encoding it on first request.
+
+        Args:
+            hub_frame: Frame to encode
+            quality: JPEG quality (1-100)
+
+        Returns:
+            Encoded JPEG
+        """
+        with self._lock:
+            if hub_frame.frame_number == self._frame_number and quality in self._encoded:
+                self.hits += 1
+                return self._encoded[quality]
+
+            # Encoding under the lock makes concurrent clients wait for one encode
+            # instead of each running their own
+            _, buffer = cv2.imencode('.jpg', hub_frame.processed_frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            jpeg = buffer.tobytes()
+            self.encodes += 1
+
+            if self._frame_number is None or hub_frame.frame_number > self._frame_number:
+                self._frame_number = hub_frame.frame_number
+                self._encoded = {}
+            if hub_frame.frame_number == self._frame_number:
+                self._encoded[quality] = jpeg
+            return jpeg
+
+    def peek(self, frame_number: int, quality: int = JPEG_QUALITY) -> Optional[bytes]:
+        """
+        Cached JPEG of a frame without encoding.
+
+        Returns:
+            Encoded JPEG, or None if that frame and quality are not cached
+        """
+        with self._lock:
+            if frame_number == self._frame_number and quality in self._encoded:
+                self.hits += 1
+                return self._encoded[quality]
+        return None
+
+    def get_stats(self) -> Dict:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with cache statistics
+        """
+        return {
+            'frame_number': self._frame_number,
+            'qualities': sorted(self._encoded),
+            'encodes': self.encodes,
+            'hits': self.hits
+        }
+
+
+class Subscription:
+    """
+    A client's view of a FrameBroker: a small drop-oldest queue, so a slow
+    client falls behind by at most a couple of frames and never stalls the
+    producer or other clients.
+    """
+
+    def __init__(self, broker: 'FrameBroker', kind: str, queue_size: int):
+        self.broker = broker
+        self.kind = kind
+        self.queue = BoundedStageQueue(queue_size, "drop_oldest")
+        self.skipped = 0
+
+        # Set when an asyncio consumer first waits; the broker wakes it thread-safely
+        self._loop = None
+        self._event = None
+
+    @property
+    def closed(self) -> bool:
+        return self.queue.closed
+
+    def get(self, timeout: Optional[float] = None) -> Optional[HubFrame]:
+        """
+        Wait for the next frame.
+
+        Args:
+            timeout: Maximum time to wait, in seconds
+
+        Returns:
+            HubFrame, or None on timeout or once the subscription is closed
+        """
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def get_latest(self, timeout: Optional[float] = None) -> Optional[HubFrame]:
+        """
+        Wait for a frame, then skip ahead to the newest one queued.
+
+        Used by clients that only ever want to show the current frame (video),
+        so a slow client never works through stale frames.
+
+        Args:
+            timeout: Maximum time to wait for the first frame, in seconds
+
+        Returns:
+            Newest HubFrame, or None on timeout or once the subscription is closed
+        """
+        item = self.get(timeout)
+        while item is not None:
+            try:
+                newer = self.queue.get(timeout=0)
+            except queue.Empty:
+                break
+            if newer is None:
+                break
+            item = newer
+            self.skipped += 1
+        return item
+
+    async def get_latest_async(self, timeout: Optional[float] = None) -> Optional[HubFrame]:
+        """
+        Asyncio version of get_latest that waits on the event loop instead of
+        blocking a worker thread.
+
+        Args:
+            timeout: Maximum time to wait, in seconds
+
+        Returns:
+            Newest HubFrame, or None on timeout or once the subscription is closed
+        """
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._event = asyncio.Event()
+
+        deadline = None if timeout is None else self._loop.time() + timeout
+        while True:
+            # Clear before checking, so a frame published in between still wakes us
+            self._event.clear()
+            item = self.get_latest(timeout=0)
+            if item is not None or self.closed:
+                return item
+            remaining = None if deadline is None else deadline - self._loop.time()
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(self._event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+
+    def notify(self) -> None:
+        """Wake an asyncio consumer; called by the broker from the producer thread."""
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._event.set)
+            except RuntimeError:
+                pass  # Event loop already closed
+
+    def close(self) -> None:
+        """Unsubscribe from the broker."""
+        self.broker.unsubscribe(self)
+
+    def __enter__(self) -> 'Subscription':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class FrameBroker:
+    """
+    Fan-out of published frames to any number of subscriptions.
+    """
+
+    def __init__(self, queue_size: int = HUB_SUBSCRIBER_QUEUE_SIZE,
+                 on_change: Optional[Callable[[str, int], None]] = None):
+        """
+        Initialize the broker.
+
+        Args:
+            queue_size: Per-subscriber queue depth
+            on_change: Optional callback (kind, delta) run when a subscription is added (+1) or removed (-1)
+        """
+        self.queue_size = queue_size
+        self.on_change = on_change
+        self._subscriptions: List[Subscription] = []
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self, kind: str = "analytics") -> Subscription:
+        """
+        Add a subscriber.
+
+        Args:
+            kind: "video" for clients that need annotated frames, "analytics" for data-only clients
+
+        Returns:
+            New Subscription
+        """
+        if kind not in SUBSCRIPTION_KINDS:
+            raise ValueError(f"Unknown subscription kind '{kind}', expected one of {SUBSCRIPTION_KINDS}")
+        subscription = Subscription(self, kind, self.queue_size)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        if self.on_change is not None:
+            self.on_change(kind, +1)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscriber; safe to call more than once."""
+        with self._lock:
+            if subscription not in self._subscriptions:
+                return
+            self._subscriptions.remove(subscription)
+        subscription.queue.close()
+        subscription.notify()
+        if self.on_change is not None:
+            self.on_change(subscription.kind, -1)
+
+    def publish(self, item) -> int:
+        """
+        Deliver an item to every subscriber.
+
+        Returns:
+            Number of subscribers the item was delivered to
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.queue.put(item)
+            subscription.notify()
+        self.published += 1
+        return len(subscriptions)
+
+    def close_all(self) -> None:
+        """Close every subscription, ending all client streams."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            self.unsubscribe(subscription)
+
+    def subscriber_count(self, kind: Optional[str] = None) -> int:
+        """Number of subscribers, optionally of one kind."""
+        with self._lock:
+            return sum(1 for s in self._subscriptions if kind is None or s.kind == kind)
+
+    def get_stats(self) -> Dict:
+        """
+        Get broker statistics
+
+        Returns:
+            Dictionary with broker statistics
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        return {
+            'published': self.published,
+            'subscribers': {kind: sum(1 for s in subscriptions if s.kind == kind) for kind in SUBSCRIPTION_KINDS},
+            'dropped': sum(s.queue.dropped for s in subscriptions)
+        }
+
+
+class CaptureHub:
+    """
+    Per-source producer. A background thread reads the source, runs the frame
+    through the pipeline once and publishes it to all subscribers. The thread
+    (and the capture device) only run while someone is subscribed.
+    """
+
+    def __init__(self, pipeline, source_factory: Callable, fps: float = PROCESSING_FPS,
+                 annotate: Optional[Callable] = None, on_frame: Optional[Callable[[HubFrame], None]] = None,
+                 queue_size: int = HUB_SUBSCRIBER_QUEUE_SIZE, pipelined: bool = PIPELINED_EXECUTION):
+        """
+        Initialize the hub.
+
+        Args:
+            pipeline: ArgusCorePipeline owned by this source
+            source_factory: Callable returning a source object with read() ->
+                (frame, native_frame, source_label) or None, and release()
+            fps: Target processing rate
+            annotate: Optional callable (processed_frame, hub_frame) for source overlays
+            on_frame: Optional callback run once per processed frame (e.g. console logging)
+            queue_size: Per-subscriber queue depth
+            pipelined: Process frames with a PipelinedExecutor (one thread per stage)
+                instead of calling process_frame on the producer thread
+        """
+        self.pipeline = pipeline
+        self.source_factory = source_factory
+        self.fps = fps
+        self.annotate = annotate
+        self.on_frame = on_frame
+        self.pipelined = pipelined
+        self.broker = FrameBroker(queue_size, on_change=self._on_subscribers_changed)
+        self.jpeg_cache = JpegCache()
+
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop_event = None  # Stop flag of the current producer generation
+
+        # Statistics
+        self.frames_processed = 0
+        self.read_failures = 0
+        self.frame_errors = 0
+        self.delivered_fps = 0.0
+        self._last_publish = None
+
+    def subscribe(self, kind: str = "analytics") -> Subscription:
+        """
+        Subscribe to processed frames, starting the producer if needed.
+
+        Args:
+            kind: "video" or "analytics"
+
+        Returns:
+            Subscription; close() it when the client disconnects
+        """
+        return self.broker.subscribe(kind)
+
+    def encode_jpeg(self, hub_frame: HubFrame, quality: int = JPEG_QUALITY) -> bytes:
+        """
+        JPEG bytes of a published frame, shared by all clients of this hub.
+
+        Args:
+            hub_frame: Frame received from a subscription
+            quality: JPEG quality (1-100)
+
+        Returns:
+            Encoded JPEG
+        """
+        return self.jpeg_cache.get(hub_frame, quality)
+
+    async def encode_jpeg_async(self, hub_frame: HubFrame, quality: int = JPEG_QUALITY) -> bytes:
+        """
+        encode_jpeg for asyncio clients: cache hits are served directly, misses
+        are encoded in a worker thread so the event loop never blocks.
+        """
+        jpeg = self.jpeg_cache.peek(hub_frame.frame_number, quality)
+        if jpeg is None:
+            jpeg = await asyncio.to_thread(self.jpeg_cache.get, hub_frame, quality)
+        return jpeg
+
+    def _on_subscribers_changed(self, kind: str, delta: int) -> None:
+        if kind == "video":
+            if delta > 0:
+                self.pipeline.add_video_subscriber()
+            else:
+                self.pipeline.remove_video_subscriber()
+        # Count and start/stop under one lock, so a concurrent unsubscribe cannot
+        # stop the producer a new subscriber has just started
+        with self._lock:
+            if self.broker.subscriber_count() > 0:
+                self._start_locked()
+            else:
+                self._stop_locked()
+
+    @property
+    def running(self) -> bool:
+        """Whether a producer generation is active (not asked to stop)."""
+        return self._stop_event is not None and not self._stop_event.is_set()
+
+    def start(self) -> None:
+        """Start the producer thread."""
+        with self._lock:
+            self._start_locked()
+
+    def _start_locked(self) -> None:
+        if self.running:
+            return
+        # Never join here (this runs on the event loop for async clients): the new
+        # producer waits for the previous one to finish its last frame itself
+        stop_event = threading.Event()
+        self._stop_event = stop_event
+        self._thread = threading.Thread(target=self._run, args=(stop_event, self._thread),
+                                        name="argus-capture-hub", daemon=True)
+        self._thread.start()
+
+    def stop(self, wait: bool = False) -> None:
+        """
+        Ask the producer thread to stop after the current frame.
+
+        Args:
+            wait: Block until the thread has exited and the source is released
+        """
+        with self._lock:
+            self._stop_locked()
+            thread = self._thread
+        if wait and thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _stop_locked(self) -> None:
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    def close(self) -> None:
+        """Stop the producer for good and release the source."""
+        self.stop(wait=True)
+
+    def _run(self, stop_event: threading.Event, previous: Optional[threading.Thread]) -> None:
+        """
+        Producer loop: capture, process once, publish.
+
+        Args:
+            stop_event: Stop flag of this producer generation
+            previous: Producer of the previous generation, still finishing its last frame
+        """
+        # One producer at a time uses the pipeline and the capture device
+        if previous is not None:
+            previous.join()
+        source = None
+        executor = None
+        interval = 1.0 / self.fps if self.fps > 0 else 0.0
+        next_deadline = time.monotonic()
+        try:
+            if stop_event.is_set():
+                return
+            source = self.source_factory()
+            if self.pipelined:
+                # Stage threads publish finished frames; JPEGs are encoded by the cache
+                executor = PipelinedExecutor(self.pipeline, jpeg_quality=None,
+                                             on_result=lambda item: self._publish_item(executor, item))
+                executor.start()
+            while not stop_event.is_set():
+                # A failure anywhere in one frame (read, pipeline, render, encode,
+                # callback) skips that frame instead of killing the producer
+                try:
+                    self._produce(source, executor)
+                except Exception as e:
+                    self.frame_errors += 1
+                    print(f"Error in capture hub: {e}")
+
+                # Pace to the target frame rate from a fixed schedule, so processing
+                # time is subtracted from the wait instead of added to it
+                next_deadline += interval
+                delay = next_deadline - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_deadline = time.monotonic()  # Running late: don't try to catch up
+        except Exception as e:
+            print(f"Error in capture hub source: {e}")
+        finally:
+            if executor is not None:
+                executor.stop()  # Finishes and publishes the frames in flight
+            if source is not None:
+                source.release()
+            # If this producer died on its own, let the next subscriber start a new one
+            stop_event.set()
+
+    def _produce(self, source, executor: Optional[PipelinedExecutor] = None) -> None:
+        """Capture one frame, then process and publish it (or hand it to the executor)."""
+        captured = source.read()
+        if captured is None:
+            self.read_failures += 1
+            return
+        frame, native_frame, source_label = captured
+
+        if executor is not None:
+            executor.submit(frame, native_frame, context=source_label)
+        else:
+            self._publish(self.pipeline.process_frame(frame, native_frame), source_label)
+
+    def _publish_item(self, executor: PipelinedExecutor, item: PipelineItem) -> None:
+        """Executor callback: publish a frame finished by the stage threads."""
+        try:
+            self._publish(executor.frame_result(item), item.context)
+        except Exception as e:
+            self.frame_errors += 1
+            print(f"Error in capture hub: {e}")
+
+    def _publish(self, result, source_label: str) -> None:
+        """Publish one processed frame to all subscribers."""
+        item = HubFrame(result, source_label, self.annotate)
+
+        # Draw and encode once here, rather than in whichever client asks first
+        # (and off the event loop for async clients)
+        if self.pipeline.wants_video():
+            self.jpeg_cache.get(item)
+
+        self.frames_processed += 1
+        now = time.monotonic()
+        if self._last_publish is not None and now > self._last_publish:
+            fps = 1.0 / (now - self._last_publish)
+            self.delivered_fps = fps if self.delivered_fps == 0.0 else 0.9 * self.delivered_fps + 0.1 * fps
+        self._last_publish = now
+
+        self.broker.publish(item)
+        if self.on_frame is not None:
+            self.on_frame(item)
+
+    def get_stats(self) -> Dict:
+        """
+        Get hub statistics
+
+        Returns:
+            Dictionary with hub statistics
+        """
+        return {
+            'running': self.running,
+            'frames_processed': self.frames_processed,
+            'read_failures': self.read_failures,
+            'frame_errors': self.frame_errors,
+            'target_fps': self.fps,
+            'delivered_fps': self.delivered_fps,
+            'broker': self.broker.get_stats(),
+            'jpeg_cache': self.jpeg_cache.get_stats()
+        }
+
+
+def test_hub():
+    """Test function for the capture hub."""
+    from engine.core_pipeline import ArgusCorePipeline
+
+    class StaticSource:
+        def __init__(self):
+            self.frame = np.zeros((480, 640, 3), dtype=np.uint8)
+            self.released = False
+
+        def read(self):
+            return self.frame.copy(), None, "Test"
+
+        def release(self):
+            self.released = True
+
+    sources = []
+
+    def source_factory():
+        sources.append(StaticSource())
+        return sources[-1]
+
+    pipeline = ArgusCorePipeline()
+    hub = CaptureHub(pipeline, source_factory, fps=30)
+
+    # Several clients share one pipeline run per frame
+    video = hub.subscribe("video")
+    dashboards = [hub.subscribe("analytics") for _ in range(3)]
+    frames = [video.get(timeout=30) for _ in range(5)]
+    updates = [dashboard.get(timeout=30) for dashboard in dashboards]
+
+    assert all(frame.result.is_rendered for frame in frames)
+    assert all(update is not None for update in updates)
+    assert pipeline.video_subscribers == 1
+
+    # Many MJPEG clients asking for the newest frame share one encode
+    latest = video.get_latest(timeout=30)
+    encodes = hub.jpeg_cache.encodes
+    jpegs = [hub.encode_jpeg(latest) for _ in range(10)]
+    assert hub.jpeg_cache.encodes <= encodes + 1 and all(jpeg is jpegs[0] for jpeg in jpegs)
+
+    # Async clients wait on the event loop, not on a worker thread
+    async def read_async():
+        hub_frame = await video.get_latest_async(timeout=30)
+        return hub_frame, await hub.encode_jpeg_async(hub_frame)
+
+    hub_frame, jpeg = asyncio.run(read_async())
+    assert hub_frame.frame_number > latest.frame_number and jpeg
+    print(f"Hub stats with 1 video + 3 analytics clients: {hub.get_stats()}")
+
+    video.close()
+    for dashboard in dashboards:
+        dashboard.close()
+    hub._thread.join(timeout=30)
+    assert pipeline.video_subscribers == 0 and sources[0].released
+    assert hub.frames_processed == pipeline.frame_count
+
+    # Errors in one frame (source read, frame callback) skip that frame only
+    class FlakySource(StaticSource):
+        reads = 0
+
+        def read(self):
+            FlakySource.reads += 1
+            if FlakySource.reads == 2:
+                raise IOError("decoder hiccup")
+            return super().read()
+
+    callbacks = []
+
+    def flaky_callback(hub_frame):
+        callbacks.append(hub_frame)
+        if len(callbacks) == 1:
+            raise RuntimeError("logging failed")
+
+    flaky_hub = CaptureHub(ArgusCorePipeline(), FlakySource, fps=30, on_frame=flaky_callback)
+    with flaky_hub.subscribe("analytics") as subscription:
+        assert all(subscription.get(timeout=30) is not None for _ in range(3))
+    assert flaky_hub.frame_errors == 2
+    flaky_hub.close()
+
+    # Reconnecting while the producer is mid-frame neither blocks the caller nor
+    # loses the producer, even with subscribes and unsubscribes racing
+    class SlowSource(StaticSource):
+        def read(self):
+            time.sleep(0.2)
+            return super().read()
+
+    slow_hub = CaptureHub(ArgusCorePipeline(), SlowSource, fps=30)
+    subscription = slow_hub.subscribe("analytics")
+    assert subscription.get(timeout=30) is not None
+    subscription.close()
+    start = time.perf_counter()
+    subscription = slow_hub.subscribe("analytics")
+    assert time.perf_counter() - start < 0.1
+    assert subscription.get(timeout=30) is not None
+    subscription.close()
+
+    def churn(keep: bool):
+        for _ in range(20):
+            churn_subscription = slow_hub.subscribe("analytics")
+            if not keep:
+                churn_subscription.close()
+
+    churners = [threading.Thread(target=churn, args=(i == 0,)) for i in range(4)]
+    for churner in churners:
+        churner.start()
+    for churner in churners:
+        churner.join()
+    assert slow_hub.broker.subscriber_count() == 20 and slow_hub.running
+    slow_hub.broker.close_all()
+    assert not slow_hub.running
+    slow_hub.close()
+
+    # Pipelined mode publishes the same rendered frames from the stage threads,
+    # numbered on from earlier producer generations
+    pipelined_hub = CaptureHub(ArgusCorePipeline(), StaticSource, fps=30, pipelined=True)
+    for _ in range(2):
+        with pipelined_hub.subscribe("video") as subscription:
+            frames = [subscription.get(timeout=30) for _ in range(3)]
+        assert all(frame.result.is_rendered and frame.source_label == "Test" for frame in frames)
+        assert pipelined_hub.encode_jpeg(frames[-1])
+        pipelined_hub.stop(wait=True)
+    numbers = [frame.frame_number for frame in frames]
+    assert numbers == sorted(numbers) and numbers[0] > 3
+    # Frames dropped between stages under "drop_oldest" are numbered but never published
+    assert 6 <= pipelined_hub.frames_processed <= pipelined_hub.pipeline.frame_count
+    pipelined_hub.close()
+
+    print("Capture hub test completed successfully")
+
+
+if __name__ == "__main__":
+    test_hub()
@@ -0,0 +1,235 @@
+"""
+Optical-flow motion field for The Argus Protocol.
+Measures crowd motion directly from pixels, independently of detection, so
+coherence and kinetic energy stay meaningful in packed crowds where the
+detector (and therefore the tracker) loses most people. Flow runs on a
+downscaled grayscale frame whose size adapts to a per-frame time budget.
+"""
+
+import time
+import cv2
+import numpy as np
+from typing import Dict, Optional, Tuple
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    DENSITY_GRID_SIZE, MOTION_FIELD_METHOD, MOTION_FIELD_BUDGET_MS,
+    MOTION_FIELD_MIN_WIDTH, MOTION_FIELD_MAX_WIDTH,
+    MOTION_FIELD_DIRECTION_BINS, MOTION_FIELD_MIN_SPEED
+)
+
+MOTION_FIELD_METHODS = ("dis", "farneback")
+
+
+class MotionField:
+    """
+    Dense optical flow summarized per density-grid cell.
+
+    Each frame is converted to grayscale at a working width, flow is computed
+    against the previous frame and scaled back to processing-resolution pixels
+    per frame. Per-cell mean magnitude and magnitude-weighted direction
+    histograms are computed with one np.bincount each. The working width
+    shrinks when the smoothed flow time exceeds the budget and grows again when
+    there is headroom, so the CPU cost per frame stays bounded.
+    """
+
+    def __init__(self, grid_size: Tuple[int, int] = DENSITY_GRID_SIZE, method: str = MOTION_FIELD_METHOD,
+                 budget_ms: float = MOTION_FIELD_BUDGET_MS, min_width: int = MOTION_FIELD_MIN_WIDTH,
+                 max_width: int = MOTION_FIELD_MAX_WIDTH, direction_bins: int = MOTION_FIELD_DIRECTION_BINS,
+                 min_speed: float = MOTION_FIELD_MIN_SPEED):
+        """
+        Initialize the motion field.
+
+        Args:
+            grid_size: (rows, cols) of the per-cell summaries
+            method: "dis" (DIS optical flow, ultrafast preset) or "farneback"
+            budget_ms: Target flow computation time per frame, in milliseconds
+            min_width: Smallest working width, in pixels
+            max_width: Largest (and initial) working width, in pixels
+            direction_bins: Number of direction histogram bins per cell
+            min_speed: Flow magnitude (processing-resolution pixels per frame) above
+                which a pixel counts as moving
+        """
+        if method not in MOTION_FIELD_METHODS:
+            raise ValueError(f"Unknown motion field method '{method}', expected one of {MOTION_FIELD_METHODS}")
+        self.grid_size = tuple(grid_size)
+        self.method = method
+        self.budget_ms = budget_ms
+        self.min_width = min_width
+        self.max_width = max(min_width, max_width)
+        self.direction_bins = direction_bins
+        self.min_speed = min_speed
+
+        self.width = self.max_width
+        self._dis = cv2.DISOpticalFlow_create(cv2.DISOPTICAL_FLOW_PRESET_ULTRAFAST) if method == "dis" else None
+        self._prev_gray = None
+        self._cells = None
+        self._cells_key = None
+
+        # Statistics
+        self.frames = 0
+        self.elapsed_ms = 0.0
+        self.resizes = 0
+
+    def _working_size(self, frame: np.ndarray) -> Tuple[int, int]:
+        width = min(self.width, frame.shape[1])
+        height = max(1, round(frame.shape[0] * width / frame.shape[1]))
+        return width, height
+
+    def _cell_index(self, size: Tuple[int, int]) -> np.ndarray:
+        """Flattened grid cell index of every working-resolution pixel (cached per size)."""
+        if self._cells_key != size:
+            width, height = size
+            rows, cols = self.grid_size
+            row = np.minimum(np.arange(height) * rows // height, rows - 1)
+            col = np.minimum(np.arange(width) * cols // width, cols - 1)
+            self._cells = (row[:, None] * cols + col[None, :]).ravel()
+            self._cells_key = size
+        return self._cells
+
+    def _flow(self, prev: np.ndarray, gray: np.ndarray) -> np.ndarray:
+        if self._dis is not None:
+            return self._dis.calc(prev, gray, None)
+        return cv2.calcOpticalFlowFarneback(prev, gray, None, 0.5, 2, 9, 2, 5, 1.1, 0)
+
+    def _adapt(self, elapsed_ms: float) -> None:
+        """Adjust the working width to the time budget."""
+        self.elapsed_ms = elapsed_ms if self.frames <= 1 else 0.8 * self.elapsed_ms + 0.2 * elapsed_ms
+        width = self.width
+        if self.elapsed_ms > self.budget_ms:
+            width = max(self.min_width, int(self.width * 0.8))
+        elif self.elapsed_ms < 0.5 * self.budget_ms:
+            width = min(self.max_width, int(self.width * 1.25))
+        if width != self.width:
+            self.width = width
+            self.resizes += 1
+
+    def compute(self, frame: np.ndarray) -> Optional[Dict]:
+        """
+        Compute the motion field between the previous frame and this one.
+
+        Args:
+            frame: BGR frame at processing resolution
+
+        Returns:
+            Dictionary with per-cell 'magnitude', 'active_fraction' and
+            'kinetic_energy_grid' grids, 'resultant_grid' (rows x cols x 2 mean
+            unit direction of moving pixels), 'direction_histograms'
+            (rows x cols x bins), frame-level
+            'kinetic_energy', 'resultant' (mean unit direction vector of moving
+            pixels), 'moving_pixels' and 'width'; None for the first frame
+        """
+        start_time = time.perf_counter()
+        size = self._working_size(frame)
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+        prev = self._prev_gray
+        self._prev_gray = gray
+        self.frames += 1
+        if prev is None:
+            return None
+        if prev.shape != gray.shape:
+            prev = cv2.resize(prev, size, interpolation=cv2.INTER_AREA)
+
+        # Flow in processing-resolution pixels per frame
+        flow = self._flow(prev, gray) * (frame.shape[1] / size[0])
+        magnitude, angle = cv2.cartToPolar(flow[..., 0], flow[..., 1])
+        magnitude, angle = magnitude.ravel(), angle.ravel()
+
+        rows, cols = self.grid_size
+        num_cells = rows * cols
+        cells = self._cell_index(size)
+        pixels_per_cell = np.bincount(cells, minlength=num_cells)
+        moving = magnitude > self.min_speed
+        moving_cells = cells[moving]
+
+        mean_magnitude = np.bincount(cells, weights=magnitude, minlength=num_cells) / pixels_per_cell
+        active_fraction = np.bincount(moving_cells, minlength=num_cells) / pixels_per_cell
+        bins = (angle[moving] * (self.direction_bins / (2 * np.pi))).astype(np.intp) % self.direction_bins
+        histograms = np.bincount(moving_cells * self.direction_bins + bins, weights=magnitude[moving],
+                                 minlength=num_cells * self.direction_bins)
+
+        # Per-cell kinetic energy and mean unit direction of moving pixels
+        moving_count = int(np.count_nonzero(moving))
+        moving_per_cell = np.bincount(moving_cells, minlength=num_cells)
+        energy = magnitude[moving] ** 2 / 2.0
+        units = flow.reshape(-1, 2)[moving] / magnitude[moving, None]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cell_energy = np.bincount(moving_cells, weights=energy, minlength=num_cells) / moving_per_cell
+            cell_resultant = np.stack([np.bincount(moving_cells, weights=units[:, axis], minlength=num_cells)
+                                       for axis in (0, 1)], axis=-1) / moving_per_cell[:, None]
+        cell_energy[moving_per_cell == 0] = 0.0
+        cell_resultant[moving_per_cell == 0] = 0.0
+        if moving_count > 0:
+            kinetic_energy = float(energy.mean())
+            resultant = units.mean(axis=0)
+        else:
+            kinetic_energy, resultant = 0.0, np.zeros(2)
+
+        self._adapt((time.perf_counter() - start_time) * 1000.0)
+
+        return {
+            'grid_size': self.grid_size,
+            'magnitude': mean_magnitude.reshape(rows, cols),
+            'active_fraction': active_fraction.reshape(rows, cols),
+            'direction_histograms': histograms.reshape(rows, cols, self.direction_bins),
+            'kinetic_energy_grid': cell_energy.reshape(rows, cols),
+            'resultant_grid': cell_resultant.reshape(rows, cols, 2),
+            'kinetic_energy': kinetic_energy,
+            'resultant': (float(resultant[0]), float(resultant[1])),
+            'moving_pixels': moving_count,
+            'width': size[0]
+        }
+
+    def get_stats(self) -> Dict:
+        """
+        Get motion field statistics
+
+        Returns:
+            Dictionary with motion field statistics
+        """
+        return {
+            'method': self.method,
+            'frames': self.frames,
+            'width': self.width,
+            'elapsed_ms': self.elapsed_ms,
+            'budget_ms': self.budget_ms,
+            'resizes': self.resizes
+        }
+
+
+def test_motion_field():
+    """Test function for the motion field."""
+    rng = np.random.default_rng(0)
+    texture = cv2.GaussianBlur(rng.integers(0, 255, (480, 640), dtype=np.uint8), (0, 0), 2)
+    texture = cv2.cvtColor(texture, cv2.COLOR_GRAY2BGR)
+
+    # Left half drifts right by 4 px per frame, right half stays still
+    field = MotionField(grid_size=(4, 4), budget_ms=50.0)
+    assert field.compute(texture) is None
+    moved = texture.copy()
+    moved[:, :320] = np.roll(texture[:, :320], 4, axis=1)
+    motion = field.compute(moved)
+
+    magnitude = motion['magnitude']
+    assert magnitude[1:3, 0:1].mean() > 2.0 and magnitude[:, 3].mean() < 0.5
+    dominant = motion['direction_histograms'][1:3, 0].sum(axis=0).argmax()
+    assert dominant in (0, field.direction_bins - 1)  # Pointing right (angle ~0)
+    assert motion['resultant'][0] > 0.8 and motion['kinetic_energy'] > 2.0
+    assert motion['resultant_grid'][1:3, 0, 0].min() > 0.8 and motion['kinetic_energy_grid'][1:3, 0].min() > 2.0
+
+    # A tiny budget drives the working width down to the minimum
+    budgeted = MotionField(budget_ms=0.001, min_width=80)
+    for frame in (texture, moved) * 10:
+        budgeted.compute(frame)
+    assert budgeted.width == 80
+    print(f"Motion field: {field.get_stats()}, budgeted: {budgeted.get_stats()}")
+    print("Motion field test completed successfully")
+
+
+if __name__ == "__main__":
+    test_motion_field()
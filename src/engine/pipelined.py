@@ -0,0 +1,446 @@
+"""
+Stage-parallel execution of the Argus pipeline.
+Runs detect, track/analyze, draw and encode on separate worker threads joined
+by bounded queues, so detection of frame N+1 overlaps with drawing and JPEG
+encoding of frame N. Throughput is limited by the slowest stage instead of the
+sum of all stages.
+"""
+
+import cv2
+import numpy as np
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import PIPELINE_QUEUE_SIZE, PIPELINE_QUEUE_POLICY, JPEG_QUALITY
+
+QUEUE_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+
+class BoundedStageQueue:
+    """
+    Bounded FIFO between two pipeline stages with a configurable policy for
+    when it is full:
+
+    - "drop_oldest": discard the oldest queued item to make room (freshest frames win)
+    - "drop_newest": discard the incoming item
+    - "block": wait until the consumer frees a slot
+    """
+
+    def __init__(self, maxsize: int = PIPELINE_QUEUE_SIZE, policy: str = PIPELINE_QUEUE_POLICY):
+        """
+        Initialize the queue.
+
+        Args:
+            maxsize: Maximum number of queued items
+            policy: One of QUEUE_POLICIES
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown queue policy '{policy}', expected one of {QUEUE_POLICIES}")
+
+        self.maxsize = maxsize
+        self.policy = policy
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._closed = False
+
+        # Statistics
+        self.enqueued = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def put(self, item) -> bool:
+        """
+        Add an item, applying the full-queue policy.
+
+        Args:
+            item: Item to enqueue
+
+        Returns:
+            True if the item was enqueued, False if it was dropped or the queue is closed
+        """
+        with self._lock:
+            if self._closed:
+                return False
+            if len(self._items) >= self.maxsize:
+                if self.policy == "drop_newest":
+                    self.dropped += 1
+                    return False
+                if self.policy == "drop_oldest":
+                    self._items.popleft()
+                    self.dropped += 1
+                else:
+                    while len(self._items) >= self.maxsize and not self._closed:
+                        self._not_full.wait()
+                    if self._closed:
+                        return False
+
+            self._items.append(item)
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, len(self._items))
+            self._not_empty.notify()
+            return True
+
+    def get(self, timeout: Optional[float] = None):
+        """
+        Remove and return the oldest item.
+
+        Args:
+            timeout: Maximum time to wait, in seconds (None waits forever)
+
+        Returns:
+            The item, or None once the queue is closed and drained
+
+        Raises:
+            queue.Empty: If no item arrived within timeout
+        """
+        with self._lock:
+            if not self._not_empty.wait_for(lambda: self._items or self._closed, timeout):
+                raise queue.Empty
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._not_full.notify()
+            return item
+
+    def close(self) -> None:
+        """Stop accepting items and wake up all waiting producers and consumers."""
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+    def get_stats(self) -> Dict:
+        """
+        Get queue statistics
+
+        Returns:
+            Dictionary with queue statistics
+        """
+        with self._lock:
+            depth = len(self._items)
+        return {
+            'depth': depth,
+            'max_depth': self.max_depth,
+            'capacity': self.maxsize,
+            'policy': self.policy,
+            'enqueued': self.enqueued,
+            'dropped': self.dropped
+        }
+
+
+class PipelineItem:
+    """
+    One frame travelling through the stages; each stage fills in its own field.
+    """
+
+    def __init__(self, frame_number: int, frame: np.ndarray, native_frame: Optional[np.ndarray] = None,
+                 context: Any = None):
+        self.frame_number = frame_number
+        self.frame = frame
+        self.native_frame = native_frame
+        self.context = context      # opaque caller value handed back with the result
+        self.captured_at = time.perf_counter()
+        self.detections = None      # (N, 5) array, None on tracker-only frames
+        self.motion = None          # optical-flow motion field, when enabled
+        self.tracks = None          # [[x1,y1,x2,y2,id],...]
+        self.analytics_data = None  # CrowdAnalytics.analyze_frame payload
+        self.processed_frame = None # annotated frame, None when nobody watches video
+        self.jpeg = None            # encoded processed_frame
+
+
+class PipelinedExecutor:
+    """
+    Runs an ArgusCorePipeline as a chain of stage workers:
+
+        submit() -> [detect] -> [track + analyze] -> [draw] -> [encode] -> results
+
+    Each stage has exactly one thread, so frames stay in order and the
+    tracker sees them sequentially. With the "drop_oldest" / "drop_newest"
+    policies a frame dropped before the track stage is simply never tracked
+    (as if the camera skipped it); after the track stage it is only not drawn.
+    """
+
+    STAGES = ("detect", "track", "draw", "encode")
+
+    def __init__(self, pipeline, queue_size: int = PIPELINE_QUEUE_SIZE,
+                 policy: str = PIPELINE_QUEUE_POLICY, jpeg_quality: int = JPEG_QUALITY,
+                 on_result: Optional[Callable[[PipelineItem], None]] = None):
+        """
+        Initialize the executor.
+
+        Args:
+            pipeline: ArgusCorePipeline whose stage methods are run
+            queue_size: Capacity of every inter-stage queue
+            policy: Full-queue policy for every inter-stage queue (see BoundedStageQueue)
+            jpeg_quality: JPEG quality of the encode stage (None skips encoding)
+            on_result: Optional callback receiving each finished PipelineItem; when
+                omitted, results are available through get_result()
+        """
+        self.pipeline = pipeline
+        self.jpeg_quality = jpeg_quality
+        self.on_result = on_result
+
+        # One input queue per stage plus the result queue
+        self.queues = {stage: BoundedStageQueue(queue_size, policy) for stage in self.STAGES}
+        self.results = BoundedStageQueue(queue_size, policy)
+
+        self._handlers = {
+            "detect": self._detect,
+            "track": self._track,
+            "draw": self._draw,
+            "encode": self._encode
+        }
+        self._threads: List[threading.Thread] = []
+        self._running = False
+        # Continue the pipeline's numbering, so frame numbers stay increasing when
+        # a new executor takes over a pipeline from an earlier one
+        self._frame_number = pipeline.frame_count
+
+        # Per-stage statistics
+        self.stage_stats = {stage: {'processed': 0, 'errors': 0, 'avg_latency_ms': 0.0, 'last_latency_ms': 0.0}
+                            for stage in self.STAGES}
+        self.frames_completed = 0
+        self.avg_end_to_end_ms = 0.0
+
+    def start(self) -> None:
+        """Start one worker thread per stage."""
+        if self._running:
+            return
+        self._running = True
+        for index, stage in enumerate(self.STAGES):
+            next_queue = self.queues[self.STAGES[index + 1]] if index + 1 < len(self.STAGES) else None
+            thread = threading.Thread(target=self._run_stage, args=(stage, next_queue),
+                                      name=f"argus-stage-{stage}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """
+        Stop all stages. Frames already queued are processed (and passed to
+        on_result) before the workers exit; results not yet collected with
+        get_result() stay readable, but frames finishing after stop() began are
+        not added to the result queue.
+        """
+        if not self._running:
+            return
+        self._running = False
+        # Close the result queue first: under the "block" policy the last stage
+        # could otherwise wait forever on a result queue nobody drains
+        self.results.close()
+        # Closing a queue lets its consumer drain it and then exit, which in turn
+        # closes the next queue
+        self.queues[self.STAGES[0]].close()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def submit(self, frame: np.ndarray, native_frame: Optional[np.ndarray] = None, context: Any = None) -> bool:
+        """
+        Feed a captured frame into the pipeline.
+
+        Args:
+            frame: Input frame as numpy array
+            native_frame: Optional full-resolution frame for tiled inference
+            context: Optional value returned as PipelineItem.context (e.g. the source label)
+
+        Returns:
+            True if the frame was queued, False if the detect queue dropped it
+        """
+        if not self._running:
+            self.start()
+        self.pipeline.validate_frame(frame)
+        self._frame_number += 1
+        return self.queues["detect"].put(PipelineItem(self._frame_number, frame, native_frame, context))
+
+    def get_result(self, timeout: Optional[float] = None) -> Optional[PipelineItem]:
+        """
+        Get the next finished frame (only when no on_result callback is set).
+
+        Args:
+            timeout: Maximum time to wait, in seconds
+
+        Returns:
+            Finished PipelineItem, or None if nothing arrived in time or the executor stopped
+        """
+        try:
+            return self.results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def frame_result(self, item: PipelineItem):
+        """
+        FrameResult view of a finished item, for consumers of process_frame results.
+        Frames the draw stage skipped (no video subscriber at the time) are drawn
+        on first access.
+        """
+        from engine.core_pipeline import FrameResult
+
+        def render(result) -> np.ndarray:
+            if item.processed_frame is not None:
+                return item.processed_frame
+            return self.pipeline.visualize_results(result.frame, result.tracks, result.analytics_data,
+                                                   frame_number=result.frame_number)
+
+        return FrameResult(item.frame_number, item.frame, item.tracks, item.analytics_data,
+                           render=None if self.pipeline.headless else render)
+
+    def _detect(self, item: PipelineItem) -> None:
+        item.detections = self.pipeline.detect(item.frame, item.native_frame)
+        item.motion = self.pipeline.compute_motion(item.frame)
+        item.native_frame = None  # Not needed downstream; release it early
+
+    def _track(self, item: PipelineItem) -> None:
+        self.pipeline.frame_count = item.frame_number
+        item.tracks, item.analytics_data = self.pipeline.track_and_analyze(
+            item.detections, frame_size=(item.frame.shape[1], item.frame.shape[0]), motion=item.motion)
+
+    def _draw(self, item: PipelineItem) -> None:
+        if not self.pipeline.wants_video():
+            return  # Headless, or no video subscriber attached
+        item.processed_frame = self.pipeline.visualize_results(item.frame, item.tracks, item.analytics_data,
+                                                               frame_number=item.frame_number)
+
+    def _encode(self, item: PipelineItem) -> None:
+        if self.jpeg_quality is None or item.processed_frame is None:
+            return
+        ok, buffer = cv2.imencode('.jpg', item.processed_frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        item.jpeg = buffer.tobytes() if ok else None
+
+    def _run_stage(self, stage: str, next_queue: Optional[BoundedStageQueue]) -> None:
+        """Worker loop for one stage: take an item, run the handler, hand it on."""
+        inbox = self.queues[stage]
+        handler = self._handlers[stage]
+        stats = self.stage_stats[stage]
+
+        while True:
+            item = inbox.get()
+            if item is None:
+                break
+
+            start = time.perf_counter()
+            try:
+                handler(item)
+            except Exception as e:
+                stats['errors'] += 1
+                print(f"Error in pipeline stage '{stage}' (frame {item.frame_number}): {e}")
+                continue
+            latency = (time.perf_counter() - start) * 1000.0
+
+            stats['processed'] += 1
+            stats['last_latency_ms'] = latency
+            # Exponential moving average so the figure tracks the current load
+            stats['avg_latency_ms'] = latency if stats['processed'] == 1 else \
+                0.9 * stats['avg_latency_ms'] + 0.1 * latency
+
+            if next_queue is not None:
+                next_queue.put(item)
+            else:
+                self._finish(item)
+
+        if next_queue is not None:
+            next_queue.close()
+
+    def _finish(self, item: PipelineItem) -> None:
+        """Publish a fully processed frame."""
+        end_to_end = (time.perf_counter() - item.captured_at) * 1000.0
+        self.frames_completed += 1
+        self.avg_end_to_end_ms = end_to_end if self.frames_completed == 1 else \
+            0.9 * self.avg_end_to_end_ms + 0.1 * end_to_end
+
+        if self.on_result is not None:
+            try:
+                self.on_result(item)
+            except Exception as e:
+                print(f"Error in pipeline result callback: {e}")
+        else:
+            self.results.put(item)
+
+    def get_stats(self) -> Dict:
+        """
+        Get per-stage queue depth and latency
+
+        Returns:
+            Dictionary with executor statistics
+        """
+        stages = {}
+        for stage in self.STAGES:
+            stages[stage] = dict(self.stage_stats[stage], queue=self.queues[stage].get_stats())
+        return {
+            'frames_submitted': self._frame_number,
+            'frames_completed': self.frames_completed,
+            'avg_end_to_end_ms': self.avg_end_to_end_ms,
+            'stages': stages,
+            'results_queue': self.results.get_stats()
+        }
+
+
+def test_pipelined():
+    """Test function for the stage-parallel executor."""
+    # Queue policies
+    for policy, expected in (("drop_oldest", [2, 3]), ("drop_newest", [1, 2])):
+        stage_queue = BoundedStageQueue(maxsize=2, policy=policy)
+        for i in (1, 2, 3):
+            stage_queue.put(i)
+        assert [stage_queue.get(timeout=0), stage_queue.get(timeout=0)] == expected, policy
+        assert stage_queue.dropped == 1
+
+    from engine.core_pipeline import ArgusCorePipeline
+
+    pipeline = ArgusCorePipeline()
+    pipeline.add_video_subscriber()
+    executor = PipelinedExecutor(pipeline, queue_size=4, policy="block")
+    executor.start()
+
+    num_frames = 8
+    for _ in range(num_frames):
+        executor.submit(np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8))
+
+    results = [executor.get_result(timeout=30) for _ in range(num_frames)]
+    executor.stop()
+
+    assert [item.frame_number for item in results] == list(range(1, num_frames + 1))
+    assert all(item.jpeg for item in results)
+
+    # Stopping a "block" executor whose results nobody reads must not hang
+    unread = PipelinedExecutor(pipeline, queue_size=1, policy="block")
+    for _ in range(4):
+        unread.submit(np.zeros((480, 640, 3), dtype=np.uint8))
+    deadline = time.monotonic() + 60
+    while len(unread.results) == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    stopper = threading.Thread(target=unread.stop)
+    stopper.start()
+    stopper.join(timeout=60)
+    assert not stopper.is_alive(), "stop() hung on a full result queue"
+    assert unread.get_result(timeout=0).frame_number == num_frames + 1
+
+    stats = executor.get_stats()
+    for stage, stage_stats in stats['stages'].items():
+        print(f"{stage:>7}: {stage_stats['processed']} frames, {stage_stats['avg_latency_ms']:.1f} ms avg, "
+              f"queue depth {stage_stats['queue']['depth']}/{stage_stats['queue']['capacity']} "
+              f"(max {stage_stats['queue']['max_depth']})")
+    print(f"End-to-end latency: {stats['avg_end_to_end_ms']:.1f} ms avg")
+    print("Pipelined executor test completed successfully")
+
+
+if __name__ == "__main__":
+    test_pipelined()
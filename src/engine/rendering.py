@@ -0,0 +1,137 @@
+"""
+Overlay rendering helpers for The Argus Protocol.
+Draws the density grid with a fixed number of full-frame operations, however
+many cells are occupied.
+"""
+
+import cv2
+import numpy as np
+from typing import List, Tuple, Optional
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import DENSITY_THRESHOLD_WARNING, DENSITY_THRESHOLD_CRITICAL
+
+# BGR cell colors indexed by density level: normal, warning, critical
+DENSITY_PALETTE = np.array([[0, 255, 255],   # Yellow
+                            [0, 165, 255],   # Orange
+                            [0, 0, 255]],    # Red
+                           dtype=np.uint8)
+GRID_LINE_COLOR = (100, 100, 100)
+
+
+class DensityOverlayRenderer:
+    """
+    Single-pass density overlay.
+
+    All cell colors are rasterized into one grid-sized color map, upsampled to
+    the frame with nearest-neighbour interpolation and blended once. The grid
+    lines never change for a given frame and grid size, so they are rendered
+    once into a cached layer and masked onto each frame with a single copy.
+    """
+
+    def __init__(self, alpha: float = 0.2):
+        """
+        Initialize the renderer.
+
+        Args:
+            alpha: Opacity of the cell colors
+        """
+        self.alpha = alpha
+        self._layout_key = None
+        self._line_layer = None
+        self._line_mask = None
+        self._cell_x = None
+        self._cell_y = None
+
+    def _layout(self, frame_size: Tuple[int, int], grid_shape: Tuple[int, int]) -> None:
+        """
+        Precompute the grid line layer and cell edges for a frame (W, H) and grid (rows, cols).
+        """
+        key = (frame_size, grid_shape)
+        if key == self._layout_key:
+            return
+        width, height = frame_size
+        grid_height, grid_width = grid_shape
+        cell_width = width / grid_width
+        cell_height = height / grid_height
+
+        # Cell edges, as in the original per-cell drawing code
+        self._cell_x = [int(j * cell_width) for j in range(grid_width + 1)]
+        self._cell_y = [int(i * cell_height) for i in range(grid_height + 1)]
+
+        # Lines on the far edge fall outside the frame and are dropped, like cv2.line clipping
+        self._line_mask = np.zeros((height, width), dtype=np.uint8)
+        self._line_mask[[y for y in self._cell_y if y < height], :] = 1
+        self._line_mask[:, [x for x in self._cell_x if x < width]] = 1
+        self._line_layer = np.full((height, width, 3), GRID_LINE_COLOR, dtype=np.uint8)
+        self._layout_key = key
+
+    def draw(self, frame: np.ndarray, density_grid: List[List[float]],
+             frame_size: Optional[Tuple[int, int]] = None) -> None:
+        """
+        Draw the density grid overlay on a frame in place.
+
+        Args:
+            frame: Frame to draw on
+            density_grid: 2D density grid (rows x cols)
+            frame_size: (W, H) area the grid covers; defaults to the frame size
+        """
+        density = np.asarray(density_grid, dtype=np.float32)
+        if density.ndim != 2 or density.size == 0:
+            return
+        if frame_size is None:
+            frame_size = (frame.shape[1], frame.shape[0])
+        self._layout(frame_size, density.shape)
+
+        region = frame[:frame_size[1], :frame_size[0]]
+
+        # Grid line layer
+        cv2.copyTo(self._line_layer, self._line_mask, region)
+
+        occupied = density > 0
+        if not occupied.any():
+            return
+
+        # One low-resolution color map, upsampled and blended once
+        levels = np.digitize(density, [DENSITY_THRESHOLD_WARNING, DENSITY_THRESHOLD_CRITICAL])
+        color_map = cv2.resize(DENSITY_PALETTE[levels], frame_size, interpolation=cv2.INTER_NEAREST)
+        mask = cv2.resize(occupied.astype(np.uint8), frame_size, interpolation=cv2.INTER_NEAREST)
+
+        blended = cv2.addWeighted(region, 1.0 - self.alpha, color_map, self.alpha, 0)
+        cv2.copyTo(blended, mask, region)
+
+        # Density values
+        for i, j in zip(*np.nonzero(occupied)):
+            x1, x2 = self._cell_x[j], self._cell_x[j + 1]
+            y1, y2 = self._cell_y[i], self._cell_y[i + 1]
+            text = f"{density[i, j]:.0f}"
+            text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)[0]
+            text_x = x1 + (x2 - x1 - text_size[0]) // 2
+            text_y = y1 + (y2 - y1 + text_size[1]) // 2
+            cv2.putText(frame, text, (text_x, text_y),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
+
+def test_rendering():
+    """Test function for the density overlay renderer."""
+    renderer = DensityOverlayRenderer()
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+    grid = [[0.0] * 10 for _ in range(10)]
+    grid[0][0], grid[5][5], grid[9][9] = 2.0, 5.0, 7.0
+    renderer.draw(frame, grid)
+
+    assert tuple(frame[0, 300]) == GRID_LINE_COLOR           # grid line
+    assert tuple(frame[200, 64]) == GRID_LINE_COLOR
+    assert frame[250, 340, 2] > 0 and frame[250, 340, 0] == 0  # orange-tinted warning cell
+    assert frame[440, 590, 2] > 0 and frame[440, 590, 1] == 0  # red-tinted critical cell
+    assert not frame[100, 100].any()                          # empty cell untouched
+
+    print("Density overlay rendering test completed successfully")
+
+
+if __name__ == "__main__":
+    test_rendering()
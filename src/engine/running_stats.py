@@ -0,0 +1,206 @@
+"""
+Incremental statistics for The Argus Protocol.
+Constant-time-per-sample mean and variance over sliding windows (running sums
+with Welford updates) and exponentially weighted moving averages, used for the
+multi-window kinetic-energy baselines.
+"""
+
+import math
+import numpy as np
+from typing import Dict, Optional
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import PROCESSING_FPS, KE_BASELINE_WINDOWS, KE_EWMA_HALF_LIFE_S, KE_ZSCORE_MIN_STD
+
+
+class RollingStats:
+    """
+    Mean and variance of the last `size` samples, O(1) per sample.
+
+    Samples live in a preallocated ring buffer. Adding a sample when the
+    window is full removes the oldest one with the inverse Welford update, so
+    neither the mean nor the variance is ever recomputed from the buffer.
+    """
+
+    def __init__(self, size: int):
+        """
+        Args:
+            size: Window length in samples
+        """
+        self.size = max(1, int(size))
+        self._buffer = np.zeros(self.size)
+        self._next = 0
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0  # Sum of squared deviations from the mean
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, value: float) -> None:
+        """Add a sample, evicting the oldest one when the window is full."""
+        if self.count == self.size:
+            oldest = self._buffer[self._next]
+            self.count -= 1
+            if self.count == 0:
+                self.mean, self._m2 = 0.0, 0.0
+            else:
+                delta = oldest - self.mean
+                self.mean -= delta / self.count
+                self._m2 -= delta * (oldest - self.mean)
+        self._buffer[self._next] = value
+        self._next = (self._next + 1) % self.size
+
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        """Population variance of the window (0 with fewer than two samples)."""
+        if self.count < 2:
+            return 0.0
+        return max(self._m2, 0.0) / self.count
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def values(self) -> np.ndarray:
+        """Samples in the window, oldest first."""
+        if self.count < self.size:
+            return self._buffer[:self.count].copy()
+        return np.roll(self._buffer, -self._next)
+
+
+class EWMAStats:
+    """
+    Exponentially weighted moving mean and variance, O(1) per sample.
+    Samples may be scalars or equally shaped NumPy arrays (updated elementwise).
+    """
+
+    def __init__(self, alpha: float):
+        """
+        Args:
+            alpha: Weight of the newest sample (0-1)
+        """
+        self.alpha = alpha
+        self.count = 0
+        self.mean = 0.0
+        self.variance = 0.0
+
+    @classmethod
+    def from_half_life(cls, half_life_samples: float) -> 'EWMAStats':
+        """EWMA whose weights halve every `half_life_samples` samples."""
+        return cls(1.0 - 0.5 ** (1.0 / max(half_life_samples, 1e-9)))
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if self.count == 1:
+            self.mean = value * 1.0  # Copies arrays
+            self.variance = value * 0.0
+            return
+        delta = value - self.mean
+        increment = self.alpha * delta
+        self.mean += increment
+        self.variance = (1.0 - self.alpha) * (self.variance + delta * increment)
+
+    @property
+    def std(self):
+        return np.sqrt(np.maximum(self.variance, 0.0))
+
+
+class MultiWindowBaseline:
+    """
+    Baselines of one time series over several windows at once, plus an EWMA.
+
+    Every update costs O(number of windows), independent of window lengths, so
+    a 5-minute window is as cheap as a 1-second one.
+    """
+
+    def __init__(self, windows_s: Optional[Dict[str, float]] = None, fps: float = PROCESSING_FPS,
+                 ewma_half_life_s: float = KE_EWMA_HALF_LIFE_S, min_std: float = KE_ZSCORE_MIN_STD):
+        """
+        Args:
+            windows_s: Window name -> length in seconds
+            fps: Samples per second
+            ewma_half_life_s: Half-life of the EWMA baseline, in seconds
+            min_std: Floor on the standard deviation used for z-scores, so a
+                perfectly still scene does not turn noise into huge z-scores
+        """
+        windows_s = KE_BASELINE_WINDOWS if windows_s is None else windows_s
+        self.windows = {name: RollingStats(round(seconds * fps)) for name, seconds in windows_s.items()}
+        self.ewma = EWMAStats.from_half_life(ewma_half_life_s * fps)
+        self.min_std = min_std
+
+    def add(self, value: float) -> None:
+        for window in self.windows.values():
+            window.add(value)
+        self.ewma.add(value)
+
+    def zscore(self, value: float, window: str) -> float:
+        """
+        Standardized distance of a value from a baseline.
+
+        Args:
+            value: Sample to score (typically before it is added)
+            window: Window name, or "ewma"
+
+        Returns:
+            (value - mean) / max(std, min_std); 0 without history
+        """
+        stats = self.ewma if window == "ewma" else self.windows[window]
+        if stats.count == 0:
+            return 0.0
+        return (value - stats.mean) / max(stats.std, self.min_std)
+
+    def get_stats(self) -> Dict:
+        """
+        Current baselines
+
+        Returns:
+            {window: {'mean', 'std', 'samples'}} including "ewma"
+        """
+        stats = {name: {'mean': float(window.mean), 'std': float(window.std), 'samples': window.count}
+                 for name, window in self.windows.items()}
+        stats['ewma'] = {'mean': float(self.ewma.mean), 'std': float(self.ewma.std), 'samples': self.ewma.count}
+        return stats
+
+
+def test_running_stats():
+    """Test function comparing incremental statistics against NumPy."""
+    rng = np.random.default_rng(0)
+    samples = np.concatenate([rng.gamma(2.0, 0.5, 1000), rng.gamma(2.0, 2.0, 200)])
+
+    window = RollingStats(45)
+    for i, value in enumerate(samples):
+        window.add(value)
+        recent = samples[max(0, i - 44):i + 1]
+        assert abs(window.mean - recent.mean()) < 1e-9
+        assert abs(window.variance - recent.var()) < 1e-8
+    assert np.allclose(window.values(), samples[-45:])
+
+    baseline = MultiWindowBaseline({'1s': 1, '30s': 30}, fps=15, ewma_half_life_s=10)
+    for value in samples[:1000]:
+        baseline.add(value)
+    stats = baseline.get_stats()
+    assert stats['1s']['samples'] == 15 and stats['30s']['samples'] == 450
+    assert abs(stats['30s']['mean'] - samples[550:1000].mean()) < 1e-9
+    assert baseline.zscore(10.0, '30s') > 3 and abs(baseline.zscore(stats['ewma']['mean'], 'ewma')) < 1e-9
+
+    # EWMA over arrays matches the scalar EWMA element by element
+    scalar, grid = EWMAStats(0.1), EWMAStats(0.1)
+    for value in samples[:100]:
+        scalar.add(value)
+        grid.add(np.array([value, 2 * value]))
+    assert np.allclose(grid.mean, [scalar.mean, 2 * scalar.mean]) and np.allclose(grid.std[0], scalar.std)
+    print(f"Baselines: {stats}")
+    print("Running statistics test completed successfully")
+
+
+if __name__ == "__main__":
+    test_running_stats()
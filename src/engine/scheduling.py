@@ -0,0 +1,152 @@
+"""
+Adaptive detection scheduling for The Argus Protocol.
+Decides per frame whether the detector must run or whether the tracker can
+carry the scene forward with Kalman prediction alone.
+"""
+
+import cv2
+import numpy as np
+from typing import Dict, Optional
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    DETECTION_MIN_INTERVAL, DETECTION_MAX_INTERVAL,
+    DETECTION_MOTION_THRESHOLD, DETECTION_KE_REFERENCE
+)
+
+
+class DetectionScheduler:
+    """
+    Runs the detector every N frames, or immediately when a frame-difference
+    motion score crosses a threshold. N shrinks as crowd kinetic energy rises,
+    so calm scenes skip most detector calls while fast-moving crowds get
+    full-rate detection.
+    """
+
+    def __init__(self, min_interval: int = DETECTION_MIN_INTERVAL,
+                 max_interval: int = DETECTION_MAX_INTERVAL,
+                 motion_threshold: float = DETECTION_MOTION_THRESHOLD,
+                 ke_reference: float = DETECTION_KE_REFERENCE):
+        """
+        Initialize the scheduler.
+
+        Args:
+            min_interval: Detection interval (frames) for fast-moving crowds
+            max_interval: Detection interval (frames) for static scenes
+            motion_threshold: Mean absolute gray-level difference that forces detection
+            ke_reference: Kinetic energy at which the interval is halved
+        """
+        self.min_interval = max(1, min_interval)
+        self.max_interval = max(self.min_interval, max_interval)
+        self.motion_threshold = motion_threshold
+        self.ke_reference = ke_reference
+
+        self.interval = self.max_interval
+        self.frames_since_detection = 0
+        self.last_motion_score = 0.0
+        self._prev_gray = None
+
+        # Statistics
+        self.frames_seen = 0
+        self.detections_run = 0
+
+    def motion_score(self, frame: np.ndarray) -> Optional[float]:
+        """
+        Mean absolute gray-level difference to the previous frame, on an 8x downscaled copy.
+
+        Args:
+            frame: Input frame as numpy array
+
+        Returns:
+            Motion score in [0, 255], or None for the first frame
+        """
+        small = cv2.resize(frame, (max(1, frame.shape[1] // 8), max(1, frame.shape[0] // 8)),
+                           interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+        score = None
+        if self._prev_gray is not None and self._prev_gray.shape == gray.shape:
+            score = float(cv2.absdiff(gray, self._prev_gray).mean())
+        self._prev_gray = gray
+        return score
+
+    def should_detect(self, frame: np.ndarray) -> bool:
+        """
+        Decide whether the detector should run on this frame.
+
+        Args:
+            frame: Input frame as numpy array
+
+        Returns:
+            True if the detector should run, False for a tracker-only frame
+        """
+        self.frames_seen += 1
+        self.frames_since_detection += 1
+
+        score = self.motion_score(frame)
+        self.last_motion_score = score if score is not None else 0.0
+
+        run = (score is None or
+               score >= self.motion_threshold or
+               self.frames_since_detection >= self.interval)
+        if run:
+            self.frames_since_detection = 0
+            self.detections_run += 1
+        return run
+
+    def update_interval(self, kinetic_energy: float) -> int:
+        """
+        Adapt the detection interval to current crowd speed.
+
+        Args:
+            kinetic_energy: Current kinetic energy from CrowdAnalytics
+
+        Returns:
+            The new detection interval in frames
+        """
+        ratio = max(0.0, kinetic_energy) / self.ke_reference if self.ke_reference > 0 else 0.0
+        interval = int(round(self.max_interval / (1.0 + ratio)))
+        self.interval = max(self.min_interval, min(self.max_interval, interval))
+        return self.interval
+
+    def get_stats(self) -> Dict:
+        """
+        Get scheduling statistics
+
+        Returns:
+            Dictionary with scheduling statistics
+        """
+        return {
+            'frames_seen': self.frames_seen,
+            'detections_run': self.detections_run,
+            'detection_ratio': self.detections_run / self.frames_seen if self.frames_seen else 0.0,
+            'current_interval': self.interval,
+            'last_motion_score': self.last_motion_score
+        }
+
+
+def test_scheduling():
+    """Test function for the detection scheduler."""
+    scheduler = DetectionScheduler(min_interval=1, max_interval=5, motion_threshold=4.0)
+
+    static_frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    decisions = [scheduler.should_detect(static_frame) for _ in range(10)]
+    print(f"Static scene: detector ran on {sum(decisions)}/10 frames")
+
+    # Sudden motion forces detection
+    moving_frame = static_frame.copy()
+    cv2.rectangle(moving_frame, (100, 100), (400, 400), (255, 255, 255), -1)
+    print(f"Sudden motion triggers detection: {scheduler.should_detect(moving_frame)}")
+
+    # Fast crowd shortens the interval
+    print(f"Interval at KE=0: {scheduler.update_interval(0.0)}")
+    print(f"Interval at KE=5: {scheduler.update_interval(5.0)}")
+
+    print("Scheduling test completed successfully")
+
+
+if __name__ == "__main__":
+    test_scheduling()
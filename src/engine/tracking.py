@@ -6,6 +6,15 @@ Assigns and maintains unique IDs for each detected person across frames.
 import numpy as np
 from typing import List, Tuple, Dict, Optional
 import cv2
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    TRACKER_ASSOCIATION, TRACKER_GATING_MIN_PAIRS,
+    TRACKER_HIGH_SCORE_THRESHOLD, TRACKER_LOW_SCORE_THRESHOLD, TRACKER_SECOND_IOU_THRESHOLD
+)
 
 
 class KalmanBoxTracker:
@@ -95,6 +104,22 @@ class KalmanBoxTracker:
             else:
                 return np.array([0, 0, 50, 50])
 
+    def extrapolate(self):
+        """
+        Advances the state vector on a frame where detection was skipped.
+        
+        Unlike predict(), this does not count the frame as a missed detection,
+        so the track stays confirmed while the detector is idle.
+        
+        Returns:
+            Predicted bounding box in format [x1, y1, x2, y2]
+        """
+        if (self.kf.statePost[6] + self.kf.statePost[2]) <= 0:
+            self.kf.statePost[6] = 0.0
+        self.kf.predict()
+        self.age += 1
+        return self.get_state()
+
     def get_state(self):
         """
         Returns the current bounding box estimate.
@@ -141,10 +166,10 @@ def associate_detections_to_trackers(detections: np.ndarray, trackers: np.ndarra
     """
     Assigns detections to tracked object (both represented as bounding boxes)
     
-    Returns 3 lists of matches, unmatched_detections and unmatched_trackers
+    Returns 3 arrays of matches, unmatched_detections and unmatched_trackers
     """
     if len(trackers) == 0:
-        return np.empty((0, 2), dtype=int), np.arange(len(detections)), np.empty((0, 5), dtype=int)
+        return np.empty((0, 2), dtype=int), np.arange(len(detections)), np.empty(0, dtype=int)
 
     iou_matrix = iou_batch(detections, trackers)
 
@@ -156,30 +181,245 @@ def associate_detections_to_trackers(detections: np.ndarray, trackers: np.ndarra
             matched_indices = linear_assignment(-iou_matrix)
     else:
         matched_indices = np.empty(shape=(0, 2))
-
-    unmatched_detections = []
-    for d, det in enumerate(detections):
-        if d not in matched_indices[:, 0]:
-            unmatched_detections.append(d)
-    unmatched_trackers = []
-    for t, trk in enumerate(trackers):
-        if t not in matched_indices[:, 1]:
-            unmatched_trackers.append(t)
+    matched_indices = np.asarray(matched_indices, dtype=int).reshape(-1, 2)
 
     # filter out matched with low IOU
+    low_iou = iou_matrix[matched_indices[:, 0], matched_indices[:, 1]] < iou_threshold
+    matches = matched_indices[~low_iou]
+
+    # Everything not in a surviving match is unmatched (boolean masks, O(N + M))
+    detection_matched = np.zeros(len(detections), dtype=bool)
+    detection_matched[matches[:, 0]] = True
+    tracker_matched = np.zeros(len(trackers), dtype=bool)
+    tracker_matched[matches[:, 1]] = True
+
+    return matches, np.flatnonzero(~detection_matched), np.flatnonzero(~tracker_matched)
+
+
+def associate_detections_to_trackers_gated(detections: np.ndarray, trackers: np.ndarray,
+                                           iou_threshold: float = 0.3, cell_size: Optional[float] = None):
+    """
+    Sparse variant of associate_detections_to_trackers for very large crowds.
+    
+    Boxes are bucketed into a uniform spatial grid by their extent, so IoU is only
+    computed for detection/tracker pairs that share a cell (any overlapping pair
+    does). Pairs above iou_threshold form a sparse bipartite graph and the
+    assignment is solved independently for each connected component.
+    
+    Returns 3 arrays of matches, unmatched_detections and unmatched_trackers
+    """
+    num_dets, num_trks = len(detections), len(trackers)
+    if num_trks == 0 or num_dets == 0:
+        return np.empty((0, 2), dtype=int), np.arange(num_dets), np.arange(num_trks)
+
+    det_boxes = np.asarray(detections[:, :4], dtype=np.float64)
+    trk_boxes = np.asarray(trackers[:, :4], dtype=np.float64)
+
+    if cell_size is None:
+        # About two typical person boxes per cell: each box spans 1-4 cells
+        extents = np.maximum(trk_boxes[:, 2] - trk_boxes[:, 0], trk_boxes[:, 3] - trk_boxes[:, 1])
+        cell_size = max(2.0 * float(np.median(extents)), 1.0)
+
+    det_idx, trk_idx = _grid_candidate_pairs(det_boxes, trk_boxes, cell_size)
+    if len(det_idx) == 0:
+        return np.empty((0, 2), dtype=int), np.arange(num_dets), np.arange(num_trks)
+
+    # IoU only for candidate pairs; keep edges that could become matches
+    iou = _pairwise_iou(det_boxes[det_idx], trk_boxes[trk_idx])
+    edge = iou >= iou_threshold
+    det_idx, trk_idx, iou = det_idx[edge], trk_idx[edge], iou[edge]
+
     matches = []
-    for m in matched_indices:
-        if iou_matrix[m[0], m[1]] < iou_threshold:
-            unmatched_detections.append(m[0])
-            unmatched_trackers.append(m[1])
-        else:
-            matches.append(m.reshape(1, 2))
-    if len(matches) == 0:
-        matches = np.empty((0, 2), dtype=int)
+    if len(det_idx) > 0:
+        labels = _bipartite_components(det_idx, trk_idx, num_dets, num_trks)
+        edge_labels = labels[det_idx]
+        order = np.argsort(edge_labels, kind='stable')
+        det_idx, trk_idx, iou, edge_labels = det_idx[order], trk_idx[order], iou[order], edge_labels[order]
+        boundaries = np.flatnonzero(np.diff(edge_labels)) + 1
+        starts = np.concatenate([[0], boundaries])
+        ends = np.concatenate([boundaries, [len(edge_labels)]])
+
+        # Components with a single edge are a 1:1 match - no solver needed
+        single = (ends - starts) == 1
+        matches.append(np.stack([det_idx[starts[single]], trk_idx[starts[single]]], axis=1))
+
+        for start, end in zip(starts[~single], ends[~single]):
+            comp_dets, local_d = np.unique(det_idx[start:end], return_inverse=True)
+            comp_trks, local_t = np.unique(trk_idx[start:end], return_inverse=True)
+            cost = np.zeros((len(comp_dets), len(comp_trks)))
+            cost[local_d, local_t] = -iou[start:end]
+            assigned = linear_assignment(cost)
+            # Non-edges have zero IoU and are never valid matches
+            assigned = assigned[cost[assigned[:, 0], assigned[:, 1]] < 0]
+            matches.append(np.stack([comp_dets[assigned[:, 0]], comp_trks[assigned[:, 1]]], axis=1))
+
+    matches = np.concatenate(matches, axis=0).astype(int) if matches else np.empty((0, 2), dtype=int)
+
+    detection_matched = np.zeros(num_dets, dtype=bool)
+    detection_matched[matches[:, 0]] = True
+    tracker_matched = np.zeros(num_trks, dtype=bool)
+    tracker_matched[matches[:, 1]] = True
+
+    return matches, np.flatnonzero(~detection_matched), np.flatnonzero(~tracker_matched)
+
+
+def _grid_cells(boxes: np.ndarray, cell_size: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Expand boxes to (box index, cell key) pairs for every grid cell each box overlaps.
+    """
+    cx1 = np.floor(boxes[:, 0] / cell_size).astype(np.int64)
+    cy1 = np.floor(boxes[:, 1] / cell_size).astype(np.int64)
+    cx2 = np.maximum(np.floor(boxes[:, 2] / cell_size).astype(np.int64), cx1)
+    cy2 = np.maximum(np.floor(boxes[:, 3] / cell_size).astype(np.int64), cy1)
+    spans_x = cx2 - cx1 + 1
+    counts = spans_x * (cy2 - cy1 + 1)
+
+    box_idx = np.repeat(np.arange(len(boxes)), counts)
+    offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    cell_x = np.repeat(cx1, counts) + offset % np.repeat(spans_x, counts)
+    cell_y = np.repeat(cy1, counts) + offset // np.repeat(spans_x, counts)
+    # Pack (x, y) into one integer key; offsets keep negative (off-frame) cells distinct
+    keys = (cell_y + (1 << 20)) * (1 << 21) + (cell_x + (1 << 20))
+    return box_idx, keys
+
+
+def _grid_candidate_pairs(det_boxes: np.ndarray, trk_boxes: np.ndarray,
+                          cell_size: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Unique (detection, tracker) index pairs that share at least one grid cell.
+    """
+    det_of, det_keys = _grid_cells(det_boxes, cell_size)
+    trk_of, trk_keys = _grid_cells(trk_boxes, cell_size)
+
+    order = np.argsort(trk_keys, kind='stable')
+    trk_of, trk_keys = trk_of[order], trk_keys[order]
+    lo = np.searchsorted(trk_keys, det_keys, side='left')
+    hi = np.searchsorted(trk_keys, det_keys, side='right')
+    counts = hi - lo
+    if counts.sum() == 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+
+    det_idx = np.repeat(det_of, counts)
+    positions = np.repeat(lo, counts) + (np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts))
+    trk_idx = trk_of[positions]
+
+    # A pair sharing several cells appears once per shared cell
+    pair_keys = np.unique(det_idx * len(trk_boxes) + trk_idx)
+    return pair_keys // len(trk_boxes), pair_keys % len(trk_boxes)
+
+
+def _pairwise_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    Element-wise IOU between two (K, 4) arrays of [x1,y1,x2,y2] boxes.
+    """
+    w = np.maximum(0., np.minimum(boxes_a[:, 2], boxes_b[:, 2]) - np.maximum(boxes_a[:, 0], boxes_b[:, 0]))
+    h = np.maximum(0., np.minimum(boxes_a[:, 3], boxes_b[:, 3]) - np.maximum(boxes_a[:, 1], boxes_b[:, 1]))
+    wh = w * h
+    return wh / ((boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+                 + (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1]) - wh)
+
+
+def _bipartite_components(det_idx: np.ndarray, trk_idx: np.ndarray, num_dets: int, num_trks: int) -> np.ndarray:
+    """
+    Connected-component label per node of the detection/tracker graph.
+    Detections are nodes 0..num_dets-1, trackers num_dets..num_dets+num_trks-1.
+    """
+    num_nodes = num_dets + num_trks
+    try:
+        from scipy.sparse import coo_matrix
+        from scipy.sparse.csgraph import connected_components
+        graph = coo_matrix((np.ones(len(det_idx)), (det_idx, trk_idx + num_dets)), shape=(num_nodes, num_nodes))
+        _, labels = connected_components(graph, directed=False)
+        return labels
+    except ImportError:
+        # Fallback: min-label propagation along edges until stable
+        labels = np.arange(num_nodes)
+        src, dst = det_idx, trk_idx + num_dets
+        while True:
+            edge_min = np.minimum(labels[src], labels[dst])
+            new_labels = labels.copy()
+            np.minimum.at(new_labels, src, edge_min)
+            np.minimum.at(new_labels, dst, edge_min)
+            new_labels = new_labels[new_labels]  # pointer jumping
+            if np.array_equal(new_labels, labels):
+                return labels
+            labels = new_labels
+
+
+def associate(detections: np.ndarray, trackers: np.ndarray, iou_threshold: float = 0.3,
+              mode: str = "dense", gating_min_pairs: int = 10000):
+    """
+    Dispatch to dense or gated association.
+    
+    Args:
+        detections: Detections as [[x1,y1,x2,y2,score],...]
+        trackers: Predicted tracker boxes as [[x1,y1,x2,y2,...],...]
+        iou_threshold: Minimum IOU for match
+        mode: "dense", "gated", or "auto" (gated once detections x trackers >= gating_min_pairs)
+        gating_min_pairs: Problem size at which "auto" switches to gated association
+        
+    Returns 3 arrays of matches, unmatched_detections and unmatched_trackers
+    """
+    if mode == "gated" or (mode == "auto" and len(detections) * len(trackers) >= gating_min_pairs):
+        return associate_detections_to_trackers_gated(detections, trackers, iou_threshold)
+    return associate_detections_to_trackers(detections, trackers, iou_threshold)
+
+
+def associate_two_stage(dets: np.ndarray, trackers: np.ndarray, iou_threshold: float = 0.3,
+                        mode: str = "dense", high_score_threshold: float = 0.5,
+                        low_score_threshold: Optional[float] = None,
+                        second_iou_threshold: float = 0.5, gating_min_pairs: int = 10000):
+    """
+    ByteTrack-style two-stage association.
+    
+    High-confidence detections are associated first. Trackers left over are then
+    matched against low-confidence detections (between low_score_threshold and
+    high_score_threshold), which keeps occluded people on their existing track.
+    Low-confidence detections never start new tracks.
+    
+    Args:
+        dets: Detections as [[x1,y1,x2,y2,score],...]
+        trackers: Predicted tracker boxes as [[x1,y1,x2,y2,...],...]
+        iou_threshold: Minimum IOU for a first-stage match
+        mode: Association mode for the first stage (see associate())
+        high_score_threshold: Detections at or above this score take part in the first stage
+        low_score_threshold: Lowest score used in the second stage; None disables it
+        second_iou_threshold: Minimum IOU for a second-stage match
+        gating_min_pairs: Problem size at which "auto" mode switches to gated association
+        
+    Returns:
+        matches (K, 2) as [det_index, tracker_index] into dets/trackers,
+        unmatched high-confidence detection indices (candidates for new tracks),
+        unmatched tracker indices
+    """
+    scores = dets[:, 4] if len(dets) > 0 else np.empty(0)
+    high_idx = np.flatnonzero(scores >= high_score_threshold)
+    if low_score_threshold is None or low_score_threshold >= high_score_threshold:
+        low_idx = np.empty(0, dtype=int)
     else:
-        matches = np.concatenate(matches, axis=0)
+        low_idx = np.flatnonzero((scores >= low_score_threshold) & (scores < high_score_threshold))
+
+    # Stage 1: high-confidence detections against all trackers
+    if len(trackers) > 0 and len(high_idx) > 0:
+        matched, unmatched_high, unmatched_trks = associate(dets[high_idx], trackers, iou_threshold,
+                                                            mode, gating_min_pairs)
+        matches = np.stack([high_idx[matched[:, 0]], matched[:, 1]], axis=1)
+        unmatched_high = high_idx[unmatched_high]
+    else:
+        matches = np.empty((0, 2), dtype=int)
+        unmatched_high = high_idx
+        unmatched_trks = np.arange(len(trackers))
+
+    # Stage 2: leftover trackers against low-confidence detections
+    if len(unmatched_trks) > 0 and len(low_idx) > 0:
+        matched_low, _, still_unmatched = associate(dets[low_idx], trackers[unmatched_trks],
+                                                    second_iou_threshold, mode, gating_min_pairs)
+        if len(matched_low) > 0:
+            second = np.stack([low_idx[matched_low[:, 0]], unmatched_trks[matched_low[:, 1]]], axis=1)
+            matches = np.concatenate([matches, second], axis=0)
+        unmatched_trks = unmatched_trks[still_unmatched]
 
-    return matches, np.array(unmatched_detections), np.array(unmatched_trackers)
+    return matches.astype(int), unmatched_high, unmatched_trks
 
 
 def iou_batch(bb_test: np.ndarray, bb_gt: np.ndarray) -> np.ndarray:
@@ -208,7 +448,7 @@ def linear_assignment(cost_matrix: np.ndarray) -> np.ndarray:
     try:
         from scipy.optimize import linear_sum_assignment
         row_ind, col_ind = linear_sum_assignment(cost_matrix)
-        return np.array(list(zip(row_ind, col_ind)))
+        return np.stack([row_ind, col_ind], axis=1)
     except ImportError:
         # Fallback to simple greedy assignment
         assignments = []
@@ -220,7 +460,61 @@ def linear_assignment(cost_matrix: np.ndarray) -> np.ndarray:
             # Set row and column to infinity to avoid reassignment
             cost_matrix[min_idx[0], :] = np.inf
             cost_matrix[:, min_idx[1]] = np.inf
-        return np.array(assignments)
+        return np.array(assignments, dtype=int).reshape(-1, 2)
+
+
+class TrackSnapshot:
+    """
+    Columnar view of the active tracks: one contiguous array per field, row i
+    describing the same track in every array. Analytics work on these arrays
+    directly; dictionaries are only built for JSON output (to_dicts).
+    """
+
+    def __init__(self, ids: np.ndarray, bboxes: np.ndarray, velocities: np.ndarray,
+                 ages: np.ndarray, hits: np.ndarray):
+        """
+        Args:
+            ids: (N,) track ids
+            bboxes: (N, 4) boxes as [x1, y1, x2, y2]
+            velocities: (N, 2) Kalman velocities of the box center, pixels per frame
+            ages: (N,) frames since each track was created
+            hits: (N,) number of detections associated with each track
+        """
+        self.ids = np.ascontiguousarray(ids, dtype=np.int64).reshape(-1)
+        self.bboxes = np.ascontiguousarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        self.velocities = np.ascontiguousarray(velocities, dtype=np.float64).reshape(-1, 2)
+        self.ages = np.ascontiguousarray(ages, dtype=np.int64).reshape(-1)
+        self.hits = np.ascontiguousarray(hits, dtype=np.int64).reshape(-1)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def empty(cls) -> 'TrackSnapshot':
+        return cls(np.empty(0), np.empty((0, 4)), np.empty((0, 2)), np.empty(0), np.empty(0))
+
+    @classmethod
+    def from_dicts(cls, tracker_info: List[Dict]) -> 'TrackSnapshot':
+        """
+        Build a snapshot from tracker dictionaries (the get_trackers() format).
+        """
+        if len(tracker_info) == 0:
+            return cls.empty()
+        return cls([t['id'] for t in tracker_info], [t['bbox'] for t in tracker_info],
+                   [t['velocity'] for t in tracker_info], [t.get('age', 0) for t in tracker_info],
+                   [t.get('hits', 0) for t in tracker_info])
+
+    def to_dicts(self) -> List[Dict]:
+        """
+        Materialize tracker dictionaries for JSON payloads
+
+        Returns:
+            List of tracker dictionaries with id, bbox, velocity, age and hits
+        """
+        ids, bboxes, velocities = self.ids.tolist(), self.bboxes.tolist(), self.velocities.tolist()
+        ages, hits = self.ages.tolist(), self.hits.tolist()
+        return [{'id': ids[i], 'bbox': bboxes[i], 'velocity': velocities[i], 'age': ages[i], 'hits': hits[i]}
+                for i in range(len(ids))]
 
 
 class Sort:
@@ -228,7 +522,10 @@ class Sort:
     Simplified SORT tracker implementation
     """
     
-    def __init__(self, max_age: int = 30, min_hits: int = 3, iou_threshold: float = 0.3):
+    def __init__(self, max_age: int = 30, min_hits: int = 3, iou_threshold: float = 0.3,
+                 association: str = TRACKER_ASSOCIATION,
+                 high_score_threshold: float = TRACKER_HIGH_SCORE_THRESHOLD,
+                 low_score_threshold: Optional[float] = TRACKER_LOW_SCORE_THRESHOLD):
         """
         Initialize SORT tracker
         
@@ -236,10 +533,16 @@ class Sort:
             max_age: Maximum number of frames to keep alive a track without associated detections
             min_hits: Minimum number of associated detections before track is initialised
             iou_threshold: Minimum IOU for match
+            association: "dense", "gated" or "auto" (see associate())
+            high_score_threshold: Minimum detection score to start a track or match in the first pass
+            low_score_threshold: Minimum score for the second, low-confidence pass (None disables it)
         """
         self.max_age = max_age
         self.min_hits = min_hits
         self.iou_threshold = iou_threshold
+        self.association = association
+        self.high_score_threshold = high_score_threshold
+        self.low_score_threshold = low_score_threshold
         self.trackers = []
         self.frame_count = 0
 
@@ -277,19 +580,17 @@ class Sort:
             self.trackers.pop(t)
             trks = np.delete(trks, t, axis=0)
 
-        # Associate detections to trackers
-        if len(self.trackers) > 0 and len(dets) > 0:
-            matched, unmatched_dets, unmatched_trks = associate_detections_to_trackers(dets, trks, self.iou_threshold)
-        else:
-            matched = np.empty((0, 2), dtype=int)
-            unmatched_dets = np.arange(len(dets))
-            unmatched_trks = np.arange(len(self.trackers))
+        # Associate detections to trackers (high-confidence first, then low-confidence)
+        matched, unmatched_dets, unmatched_trks = associate_two_stage(
+            dets, trks, self.iou_threshold, self.association,
+            self.high_score_threshold, self.low_score_threshold,
+            TRACKER_SECOND_IOU_THRESHOLD, TRACKER_GATING_MIN_PAIRS)
 
         # Update matched trackers with assigned detections
         for m in matched:
             self.trackers[m[1]].update(dets[m[0], :4])  # Only pass bbox, not confidence
 
-        # Create and initialise new trackers for unmatched detections
+        # Create and initialise new trackers for unmatched high-confidence detections
         for i in unmatched_dets:
             trk = KalmanBoxTracker(dets[i, :4])  # Only pass bbox
             self.trackers.append(trk)
@@ -314,6 +615,46 @@ class Sort:
             return np.concatenate(ret)
         return np.empty((0, 5))
 
+    def predict_only(self) -> np.ndarray:
+        """
+        Advance all tracks by one frame using Kalman prediction only.
+        
+        Used on frames where the detector is skipped. Tracks are neither aged out
+        nor created; their boxes follow the constant-velocity model.
+        
+        Returns:
+            numpy array of tracks in format [[x1,y1,x2,y2,id],...]
+        """
+        ret = []
+        for trk in reversed(self.trackers):  # Same ordering as update()
+            d = trk.extrapolate()
+            if np.any(np.isnan(d)):
+                continue
+            if (trk.time_since_update < 1) and (trk.hit_streak >= self.min_hits or self.frame_count <= self.min_hits):
+                ret.append(np.concatenate((d, [trk.id + 1])).reshape(1, -1))
+        
+        if len(ret) > 0:
+            return np.concatenate(ret)
+        return np.empty((0, 5))
+
+    def get_snapshot(self) -> TrackSnapshot:
+        """
+        Get the tracks updated this frame as columnar arrays
+        
+        Returns:
+            TrackSnapshot of the active tracks
+        """
+        active = [trk for trk in self.trackers if trk.time_since_update < 1]
+        if not active:
+            return TrackSnapshot.empty()
+        states = np.array([trk.kf.statePost[:7, 0] for trk in active])
+        return TrackSnapshot(
+            ids=[trk.id for trk in active],
+            bboxes=np.vstack([trk.get_state() for trk in active]).reshape(-1, 4),
+            velocities=states[:, 4:6],
+            ages=[trk.age for trk in active],
+            hits=[trk.hits for trk in active])
+    
     def get_trackers(self) -> List[Dict]:
         """
         Get current tracker information for analytics
@@ -321,22 +662,7 @@ class Sort:
         Returns:
             List of tracker dictionaries with id, bbox, and velocity info
         """
-        tracker_info = []
-        for trk in self.trackers:
-            if trk.time_since_update < 1:
-                state = trk.get_state()[0]
-                # Calculate velocity from Kalman filter state
-                velocity_x = trk.kf.statePost[4, 0] if len(trk.kf.statePost) > 4 else 0
-                velocity_y = trk.kf.statePost[5, 0] if len(trk.kf.statePost) > 5 else 0
-                
-                tracker_info.append({
-                    'id': trk.id,
-                    'bbox': [float(state[0]), float(state[1]), float(state[2]), float(state[3])],
-                    'velocity': [float(velocity_x), float(velocity_y)],
-                    'age': trk.age,
-                    'hits': trk.hits
-                })
-        return tracker_info
+        return self.get_snapshot().to_dicts()
 
 
 def test_tracking():
@@ -0,0 +1,368 @@
+"""
+Video sources for The Argus Protocol.
+One interface over webcams, video files, RTSP/HTTP streams and directories of
+images. Each source decodes on its own reader thread and keeps only the newest
+frame, so a slow camera or decoder never blocks the processing loop, and lost
+streams are reopened with exponential backoff.
+"""
+
+import cv2
+import numpy as np
+import glob
+import threading
+import time
+from typing import Dict, Optional, Tuple, Union
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from engine.export import IMAGE_EXTENSIONS
+from config import (
+    VIDEO_RESOLUTION, PROCESSING_FPS,
+    SOURCE_RECONNECT_INITIAL_S, SOURCE_RECONNECT_MAX_S, SOURCE_LOOP_FILES
+)
+
+STREAM_SCHEMES = ("rtsp://", "rtsps://", "rtmp://", "http://", "https://", "udp://", "tcp://")
+SOURCE_KINDS = ("webcam", "file", "stream", "images")
+
+
+def source_kind(uri: Union[int, str]) -> str:
+    """
+    Classify a source URI.
+
+    Args:
+        uri: Webcam index (int or digit string), video file path, stream URL or image directory
+
+    Returns:
+        One of SOURCE_KINDS
+    """
+    if isinstance(uri, int) or str(uri).isdigit():
+        return "webcam"
+    if str(uri).lower().startswith(STREAM_SCHEMES):
+        return "stream"
+    if os.path.isdir(uri):
+        return "images"
+    return "file"
+
+
+class ImageSequenceCapture:
+    """
+    Minimal cv2.VideoCapture look-alike over a directory of images (sorted by name).
+    """
+
+    def __init__(self, directory: str):
+        self.paths = sorted(p for p in glob.glob(os.path.join(directory, "*"))
+                            if p.lower().endswith(IMAGE_EXTENSIONS))
+        self.index = 0
+
+    def isOpened(self) -> bool:
+        return len(self.paths) > 0
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        while self.index < len(self.paths):
+            frame = cv2.imread(self.paths[self.index])
+            self.index += 1
+            if frame is not None:
+                return True, frame
+        return False, None
+
+    def set(self, prop: int, value: float) -> bool:
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            self.index = int(value)
+            return True
+        return False
+
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(len(self.paths))
+        return 0.0
+
+    def release(self) -> None:
+        self.paths = []
+
+
+class VideoSource:
+    """
+    Threaded frame source.
+
+    The reader thread decodes continuously and overwrites a single "latest
+    frame" slot; read() returns the newest frame the consumer has not seen
+    yet. Webcams and streams are read as fast as they deliver. Files and image
+    directories are played back at their native frame rate (looping if
+    enabled), as if they were live cameras.
+    """
+
+    def __init__(self, uri: Union[int, str], resolution: Optional[Tuple[int, int]] = VIDEO_RESOLUTION,
+                 loop: bool = SOURCE_LOOP_FILES, reconnect: bool = True,
+                 backoff_initial: float = SOURCE_RECONNECT_INITIAL_S,
+                 backoff_max: float = SOURCE_RECONNECT_MAX_S, name: Optional[str] = None):
+        """
+        Initialize the source (call start() to begin reading).
+
+        Args:
+            uri: Webcam index, video file, RTSP/HTTP URL or image directory
+            resolution: (W, H) frames are resized to; None keeps the native size
+            loop: Restart files and image directories when they end
+            reconnect: Reopen the source with backoff after it fails or ends
+            backoff_initial: First reconnect delay, in seconds
+            backoff_max: Maximum reconnect delay, in seconds
+            name: Label reported with each frame; defaults to the URI
+        """
+        self.uri = int(uri) if source_kind(uri) == "webcam" else uri
+        self.kind = source_kind(uri)
+        self.resolution = resolution
+        self.loop = loop
+        self.reconnect = reconnect
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.name = name or (f"Webcam {self.uri}" if self.kind == "webcam" else str(uri))
+
+        self._cap = None
+        self._thread = None
+        self._running = False
+        self._condition = threading.Condition()
+        self._latest = None        # (frame, native_frame)
+        self._latest_seq = 0
+        self._consumed_seq = 0
+
+        # Status and statistics
+        self.connected = False
+        self.finished = False
+        self.last_error = None
+        self.frames_read = 0
+        self.frames_dropped = 0
+        self.reconnects = 0
+
+    def start(self) -> 'VideoSource':
+        """Start the reader thread."""
+        if not self._running:
+            self._running = True
+            self.finished = False
+            self._thread = threading.Thread(target=self._run, name=f"argus-source-{self.name}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the reader thread and close the capture."""
+        self._running = False
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def release(self) -> None:
+        """Alias of stop(), so a VideoSource can be used wherever a capture is released."""
+        self.stop()
+
+    def read(self, timeout: Optional[float] = 1.0) -> Optional[Tuple[np.ndarray, Optional[np.ndarray], str]]:
+        """
+        Get the newest frame not returned before.
+
+        Args:
+            timeout: Maximum time to wait for a new frame, in seconds
+
+        Returns:
+            (frame, native_frame, source_label), or None if no new frame arrived in time.
+            native_frame is None when no resizing was needed.
+        """
+        if not self._running:
+            self.start()
+        with self._condition:
+            if not self._condition.wait_for(
+                    lambda: self._latest_seq > self._consumed_seq or not self._running, timeout):
+                return None
+            if self._latest_seq <= self._consumed_seq:
+                return None
+            self._consumed_seq = self._latest_seq
+            frame, native_frame = self._latest
+        return frame, native_frame, self.name
+
+    def _open(self):
+        """Open the underlying capture."""
+        if self.kind == "images":
+            return ImageSequenceCapture(self.uri)
+        if self.kind == "stream":
+            return cv2.VideoCapture(self.uri, cv2.CAP_FFMPEG)
+        return cv2.VideoCapture(self.uri)
+
+    def _frame_interval(self, cap) -> float:
+        """Playback interval for files and image directories; 0 for live sources."""
+        if self.kind in ("webcam", "stream"):
+            return 0.0
+        fps = cap.get(cv2.CAP_PROP_FPS) if self.kind == "file" else 0.0
+        return 1.0 / (fps if 0 < fps < 240 else PROCESSING_FPS)
+
+    def _wait(self, seconds: float) -> None:
+        """Sleep that returns early on stop()."""
+        with self._condition:
+            self._condition.wait_for(lambda: not self._running, seconds)
+
+    def _publish(self, native_frame: np.ndarray) -> None:
+        """Store a decoded frame as the newest one."""
+        frame = native_frame
+        if self.resolution is not None and (native_frame.shape[1], native_frame.shape[0]) != tuple(self.resolution):
+            frame = cv2.resize(native_frame, tuple(self.resolution))
+        else:
+            native_frame = None
+        with self._condition:
+            if self._latest_seq > self._consumed_seq:
+                self.frames_dropped += 1  # Previous frame was never read
+            self._latest = (frame, native_frame)
+            self._latest_seq += 1
+            self.frames_read += 1
+            self._condition.notify_all()
+
+    def _run(self) -> None:
+        """Reader loop: open, decode, publish, reconnect with backoff."""
+        backoff = self.backoff_initial
+        try:
+            while self._running:
+                cap = self._open()
+                if not cap.isOpened():
+                    cap.release()
+                    self.connected = False
+                    self.last_error = f"Cannot open {self.kind} source: {self.uri}"
+                    if not self.reconnect:
+                        break
+                    self.reconnects += 1
+                    self._wait(backoff)
+                    backoff = min(backoff * 2, self.backoff_max)
+                    continue
+
+                self._cap = cap
+                self.connected = True
+                interval = self._frame_interval(cap)
+                next_deadline = time.monotonic()
+                ended = False
+
+                while self._running:
+                    ret, native_frame = cap.read()
+                    if not ret or native_frame is None:
+                        if self.kind in ("file", "images") and self.loop and self.frames_read > 0:
+                            # Rewind finished files instead of reopening them
+                            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                            ret, native_frame = cap.read()
+                        if not ret or native_frame is None:
+                            ended = True
+                            break
+
+                    backoff = self.backoff_initial  # Healthy again
+                    self._publish(native_frame)
+
+                    if interval > 0:
+                        next_deadline += interval
+                        delay = next_deadline - time.monotonic()
+                        if delay > 0:
+                            self._wait(delay)
+                        else:
+                            next_deadline = time.monotonic()
+
+                cap.release()
+                self._cap = None
+                self.connected = False
+                if ended:
+                    self.last_error = f"{self.kind} source ended: {self.uri}"
+                    if self.kind in ("file", "images") and not self.loop:
+                        break
+                    if not self.reconnect:
+                        break
+                    self.reconnects += 1
+                    self._wait(backoff)
+                    backoff = min(backoff * 2, self.backoff_max)
+        finally:
+            self.connected = False
+            self.finished = True
+            with self._condition:
+                self._condition.notify_all()
+
+    def get_stats(self) -> Dict:
+        """
+        Get source statistics
+
+        Returns:
+            Dictionary with source statistics
+        """
+        return {
+            'name': self.name,
+            'kind': self.kind,
+            'connected': self.connected,
+            'finished': self.finished,
+            'frames_read': self.frames_read,
+            'frames_dropped': self.frames_dropped,
+            'reconnects': self.reconnects,
+            'last_error': self.last_error
+        }
+
+
+def test_video_source():
+    """Test function for video sources using a local file, an image directory and a local HTTP stream."""
+    import tempfile
+    import http.server
+    import functools
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Local clip: 20 frames at 30 fps with a moving square
+        clip_path = os.path.join(tmp, "clip.avi")
+        writer = cv2.VideoWriter(clip_path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (320, 240))
+        image_dir = os.path.join(tmp, "stills")
+        os.makedirs(image_dir)
+        for i in range(20):
+            frame = np.zeros((240, 320, 3), dtype=np.uint8)
+            cv2.rectangle(frame, (10 * i, 50), (10 * i + 40, 120), (255, 255, 255), -1)
+            writer.write(frame)
+            if i < 5:
+                cv2.imwrite(os.path.join(image_dir, f"{i:03d}.jpg"), frame)
+        writer.release()
+
+        # Video file, resized to the processing resolution
+        source = VideoSource(clip_path, loop=False).start()
+        frames = []
+        while True:
+            item = source.read(timeout=2.0)
+            if item is None:
+                break
+            frames.append(item)
+        source.stop()
+        assert frames and frames[0][0].shape == (VIDEO_RESOLUTION[1], VIDEO_RESOLUTION[0], 3)
+        assert frames[0][1].shape == (240, 320, 3) and source.finished
+        print(f"File source: {source.get_stats()}")
+
+        # Image directory, looping
+        source = VideoSource(image_dir, resolution=None).start()
+        frames = [source.read(timeout=2.0) for _ in range(8)]
+        source.stop()
+        assert all(item is not None and item[1] is None for item in frames)
+        print(f"Image directory source: {source.get_stats()}")
+
+        # Local HTTP server standing in for a network camera
+        class QuietHandler(http.server.SimpleHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=tmp))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/clip.avi"
+
+        source = VideoSource(url, backoff_initial=0.1, backoff_max=0.4).start()
+        assert source.read(timeout=10.0) is not None
+        server.shutdown()
+        server.server_close()
+        time.sleep(1.5)  # Clip ends, reopening fails while the server is down
+        stats = source.get_stats()
+        source.stop()
+        assert stats['reconnects'] >= 1
+        print(f"Stream source: {stats}")
+
+        # Unreachable stream: retries with backoff, never blocks the consumer
+        source = VideoSource("rtsp://127.0.0.1:1/argus", backoff_initial=0.05, backoff_max=0.1).start()
+        assert source.read(timeout=0.5) is None
+        source.stop()
+        print(f"Unreachable stream: {source.get_stats()}")
+
+    print("Video source test completed successfully")
+
+
+if __name__ == "__main__":
+    test_video_source()
@@ -0,0 +1,691 @@
+"""
+Process worker mode for The Argus Protocol.
+Runs each camera's pipeline (detection, tracking, analytics, drawing and JPEG
+encoding) in its own process, so cameras scale across cores instead of sharing
+one GIL. Frames travel between the capture side and the worker through
+shared-memory ring buffers; only sequence numbers and the small analytics
+dictionaries cross the process boundary through queues.
+"""
+
+import asyncio
+import cv2
+import numpy as np
+import multiprocessing as mp
+import threading
+import time
+import queue
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Optional, Tuple
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from engine.hub import FrameBroker, JpegCache, Subscription
+from config import (
+    VIDEO_RESOLUTION, PROCESSING_FPS, JPEG_QUALITY, HUB_SUBSCRIBER_QUEUE_SIZE,
+    ADAPTIVE_DETECTION, HEADLESS, WORKER_RING_SLOTS, CALIBRATION_FILE
+)
+
+# "spawn" starts workers from a clean interpreter: forking a server process that
+# already runs PyTorch and OpenMP thread pools can deadlock the child
+WORKER_START_METHOD = "spawn"
+WORKER_STARTUP_TIMEOUT_S = 120.0
+WORKER_MAX_RESTARTS = 3  # consecutive worker deaths without a processed frame before giving up
+
+
+class SharedFrameRing:
+    """
+    Fixed-size ring of byte slots in multiprocessing.shared_memory.
+
+    One writer, any number of readers. Each slot carries a header
+    (seq_begin, seq_end, nbytes): the writer stamps seq_begin, copies the
+    payload, then stamps seq_end. A reader accepts a copy only if both stamps
+    still equal the sequence number it asked for, so a slot the writer lapped
+    mid-read is reported as lost instead of returned torn.
+    """
+
+    def __init__(self, slots: int, slot_bytes: int, name: Optional[str] = None):
+        """
+        Create a ring, or attach to an existing one.
+
+        Args:
+            slots: Number of slots
+            slot_bytes: Capacity of each slot, in bytes
+            name: Shared memory block to attach to; a new block is created when omitted
+        """
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.owner = name is None
+        header_bytes = slots * 3 * np.dtype(np.int64).itemsize
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner,
+                                              size=header_bytes + slots * slot_bytes)
+        self.header = np.ndarray((slots, 3), dtype=np.int64, buffer=self.shm.buf)
+        self.data = np.ndarray((slots, slot_bytes), dtype=np.uint8, buffer=self.shm.buf, offset=header_bytes)
+        if self.owner:
+            self.header[:] = -1
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write(self, seq: int, payload) -> None:
+        """
+        Copy a payload into the slot of a sequence number.
+
+        Args:
+            seq: Non-negative, increasing sequence number
+            payload: Contiguous uint8 array (e.g. a frame) or bytes
+
+        Raises:
+            ValueError: If the payload does not fit in a slot
+        """
+        flat = np.frombuffer(payload, dtype=np.uint8) if isinstance(payload, (bytes, bytearray)) \
+            else payload.reshape(-1)
+        if flat.size > self.slot_bytes:
+            raise ValueError(f"Payload of {flat.size} bytes exceeds slot size {self.slot_bytes}")
+        header = self.header[seq % self.slots]
+        header[1] = -1
+        header[0] = seq
+        self.data[seq % self.slots, :flat.size] = flat
+        header[2] = flat.size
+        header[1] = seq
+
+    def read(self, seq: int) -> Optional[np.ndarray]:
+        """
+        Copy the payload of a sequence number out of the ring.
+
+        Returns:
+            uint8 array, or None if the slot holds another sequence number
+            (not written yet, or already overwritten)
+        """
+        header = self.header[seq % self.slots]
+        if header[1] != seq:
+            return None
+        payload = self.data[seq % self.slots, :header[2]].copy()
+        if header[0] != seq:
+            return None  # Overwritten while copying
+        return payload
+
+    def close(self) -> None:
+        """Detach from the block, and remove it if this ring created it."""
+        self.header = None
+        self.data = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _draw_worker_label(frame: np.ndarray, label: str) -> None:
+    cv2.putText(frame, f"Source: {label}", (10, frame.shape[0] - 20),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
+
+def _worker_main(in_ring_name: str, out_ring_name: str, slots: int, frame_shape: Tuple[int, int, int],
+                 tasks, results, video_flag, label: Optional[str], jpeg_quality: int,
+                 adaptive_detection: bool, headless: bool, calibration: str) -> None:
+    """
+    Worker process loop: take the newest submitted frame from the input ring,
+    run the pipeline, write the JPEG to the output ring and report analytics.
+    """
+    from engine.core_pipeline import ArgusCorePipeline
+
+    frame_bytes = int(np.prod(frame_shape))
+    in_ring = SharedFrameRing(slots, frame_bytes, name=in_ring_name)
+    out_ring = SharedFrameRing(slots, frame_bytes, name=out_ring_name)
+    try:
+        pipeline = ArgusCorePipeline(tiled_inference=False, adaptive_detection=adaptive_detection,
+                                     headless=headless, calibration=calibration)
+        results.put(("ready", os.getpid()))
+
+        while True:
+            seq = tasks.get()
+            if seq is None:
+                break
+            # Work on the newest frame only; older ones are already stale
+            skipped = 0
+            while True:
+                try:
+                    newer = tasks.get_nowait()
+                except queue.Empty:
+                    break
+                if newer is None:
+                    return
+                seq = newer
+                skipped += 1
+
+            payload = in_ring.read(seq)
+            if payload is None:
+                results.put(("lost", seq, skipped))
+                continue
+
+            # A bad frame is reported and skipped, as in thread mode
+            try:
+                start_time = time.perf_counter()
+                result = pipeline.process_frame(payload.reshape(frame_shape))
+                has_jpeg = False
+                if video_flag.value > 0 and not headless:
+                    processed_frame = result.processed_frame
+                    if label:
+                        _draw_worker_label(processed_frame, label)
+                    _, buffer = cv2.imencode('.jpg', processed_frame, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+                    try:
+                        out_ring.write(seq, buffer)
+                        has_jpeg = True
+                    except ValueError:
+                        pass  # Larger than a raw frame; deliver analytics only
+                elapsed = time.perf_counter() - start_time
+            except Exception as e:
+                results.put(("error", seq, skipped, repr(e)))
+                continue
+            results.put(("frame", seq, result.analytics_data, has_jpeg, skipped, elapsed))
+    except Exception as e:
+        results.put(("fatal", repr(e)))
+    finally:
+        in_ring.close()
+        out_ring.close()
+
+
+class WorkerFrame:
+    """
+    One frame processed by a worker process, as published to subscribers.
+    Offers the same fields as HubFrame.
+    """
+
+    def __init__(self, frame_number: int, analytics_data: Dict, jpeg: Optional[bytes], source_label: str = ""):
+        self.frame_number = frame_number
+        self.analytics_data = analytics_data
+        self.jpeg = jpeg
+        self.source_label = source_label
+        self.published_at = time.time()
+        self._processed_frame = None
+
+    @property
+    def processed_frame(self) -> Optional[np.ndarray]:
+        """Annotated frame decoded from the worker's JPEG (None if none was encoded)."""
+        if self._processed_frame is None and self.jpeg is not None:
+            self._processed_frame = cv2.imdecode(np.frombuffer(self.jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+        return self._processed_frame
+
+
+class ProcessCaptureHub:
+    """
+    CaptureHub counterpart whose pipeline runs in a dedicated worker process.
+
+    In this process a capture thread only reads the source and copies frames
+    into the input ring, and a result thread reads JPEGs from the output ring
+    and publishes them to subscribers. Capture runs while someone is
+    subscribed; the worker process is started with the first subscriber and
+    kept warm until close().
+    """
+
+    def __init__(self, source_factory: Callable, fps: float = PROCESSING_FPS, label: Optional[str] = None,
+                 on_frame: Optional[Callable[[WorkerFrame], None]] = None,
+                 queue_size: int = HUB_SUBSCRIBER_QUEUE_SIZE, ring_slots: int = WORKER_RING_SLOTS,
+                 resolution: Tuple[int, int] = VIDEO_RESOLUTION, jpeg_quality: int = JPEG_QUALITY,
+                 adaptive_detection: bool = ADAPTIVE_DETECTION, headless: bool = HEADLESS,
+                 calibration: str = CALIBRATION_FILE):
+        """
+        Initialize the hub.
+
+        Args:
+            source_factory: Callable returning a source object with read() ->
+                (frame, native_frame, source_label) or None, and release()
+            fps: Target processing rate
+            label: Source label drawn on annotated frames by the worker
+            on_frame: Optional callback run once per processed frame
+            queue_size: Per-subscriber queue depth
+            ring_slots: Frames buffered in each shared-memory ring
+            resolution: (W, H) of frames sent to the worker; other sizes are resized
+            jpeg_quality: Quality of the JPEGs encoded by the worker
+            adaptive_detection: Passed to the worker's ArgusCorePipeline
+            headless: Never draw or encode frames
+            calibration: Ground-plane calibration file loaded by the worker ('' for none)
+        """
+        self.source_factory = source_factory
+        self.fps = fps
+        self.label = label
+        self.on_frame = on_frame
+        self.resolution = tuple(resolution)
+        self.jpeg_quality = jpeg_quality
+        self.adaptive_detection = adaptive_detection
+        self.headless = headless
+        self.calibration = calibration
+        self.broker = FrameBroker(queue_size, on_change=self._on_subscribers_changed)
+        self.jpeg_cache = JpegCache()  # Re-encodes for clients asking for another quality
+
+        self.frame_shape = (self.resolution[1], self.resolution[0], 3)
+        frame_bytes = int(np.prod(self.frame_shape))
+        self.in_ring = SharedFrameRing(ring_slots, frame_bytes)
+        self.out_ring = SharedFrameRing(ring_slots, frame_bytes)
+
+        context = mp.get_context(WORKER_START_METHOD)
+        self._context = context
+        self._tasks = None
+        self._results = None
+        self._video_flag = context.Value('i', 0)
+        self._process = None
+        self._ready = threading.Event()
+        self._failed = False          # Gave up restarting the worker
+        self._restart_streak = 0      # Worker deaths since the last processed frame
+
+        self._lock = threading.Lock()
+        self._capture_thread = None
+        self._result_thread = None
+        self._stop_event = None       # Stop flag of the current capture generation
+        self._closed = False
+        self._labels: Dict[int, str] = {}
+
+        # Statistics
+        self.frames_submitted = 0
+        self.frames_processed = 0
+        self.frames_dropped = 0   # Not submitted: worker still busy with earlier frames
+        self.frames_skipped = 0   # Submitted, superseded before the worker got to them
+        self.frames_lost = 0      # Overwritten in the ring before the worker read them
+        self.read_failures = 0
+        self.worker_errors = 0
+        self.worker_restarts = 0
+        self.last_error = None
+        self.processing_ms = 0.0
+        self.delivered_fps = 0.0
+        self._last_publish = None
+        self._completed_seq = -1
+
+    def subscribe(self, kind: str = "analytics") -> Subscription:
+        """
+        Subscribe to processed frames, starting capture (and the worker) if needed.
+
+        Args:
+            kind: "video" or "analytics"
+
+        Returns:
+            Subscription; close() it when the client disconnects
+        """
+        return self.broker.subscribe(kind)
+
+    def encode_jpeg(self, hub_frame: WorkerFrame, quality: int = JPEG_QUALITY) -> Optional[bytes]:
+        """
+        JPEG bytes of a published frame.
+
+        Args:
+            hub_frame: Frame received from a subscription
+            quality: JPEG quality (1-100)
+
+        Returns:
+            Encoded JPEG, or None for frames the worker produced while no video
+            client was attached
+        """
+        if hub_frame.jpeg is None or quality == self.jpeg_quality:
+            return hub_frame.jpeg
+        return self.jpeg_cache.get(hub_frame, quality)
+
+    async def encode_jpeg_async(self, hub_frame: WorkerFrame, quality: int = JPEG_QUALITY) -> Optional[bytes]:
+        """encode_jpeg for asyncio clients; re-encodes run in a worker thread."""
+        if hub_frame.jpeg is None or quality == self.jpeg_quality:
+            return hub_frame.jpeg
+        jpeg = self.jpeg_cache.peek(hub_frame.frame_number, quality)
+        if jpeg is None:
+            jpeg = await asyncio.to_thread(self.jpeg_cache.get, hub_frame, quality)
+        return jpeg
+
+    def _on_subscribers_changed(self, kind: str, delta: int) -> None:
+        if kind == "video":
+            with self._video_flag.get_lock():
+                self._video_flag.value += delta
+        # Count and start/stop under one lock (see CaptureHub._on_subscribers_changed)
+        with self._lock:
+            if self.broker.subscriber_count() > 0:
+                self._start_locked()
+            else:
+                self._stop_locked()
+
+    @property
+    def running(self) -> bool:
+        """Whether a capture generation is active (not asked to stop)."""
+        return self._stop_event is not None and not self._stop_event.is_set()
+
+    def _start_worker(self) -> None:
+        """Start a worker process and its result thread, unless one is running. Call with the lock held."""
+        if self._process is not None:
+            return
+        # Fresh queues: a worker that died mid-operation may leave the old ones unusable
+        self._tasks = self._context.Queue()
+        self._results = self._context.Queue()
+        self._ready.clear()
+        self._process = self._context.Process(
+            target=_worker_main, name="argus-camera-worker", daemon=True,
+            args=(self.in_ring.name, self.out_ring.name, self.in_ring.slots, self.frame_shape,
+                  self._tasks, self._results, self._video_flag, self.label, self.jpeg_quality,
+                  self.adaptive_detection, self.headless, self.calibration))
+        self._process.start()
+        self._result_thread = threading.Thread(target=self._run_results, args=(self._process, self._results),
+                                               name="argus-worker-results", daemon=True)
+        self._result_thread.start()
+
+    def start(self) -> None:
+        """Start the capture thread, starting the worker process first if needed."""
+        with self._lock:
+            self._start_locked()
+
+    def _start_locked(self) -> None:
+        if self.running or self._closed or self._failed:
+            return
+        self._start_worker()
+        # Never join here; the new capture thread waits for the previous one itself
+        stop_event = threading.Event()
+        self._stop_event = stop_event
+        self._capture_thread = threading.Thread(target=self._run_capture, args=(stop_event, self._capture_thread),
+                                                name="argus-worker-capture", daemon=True)
+        self._capture_thread.start()
+
+    def stop(self, wait: bool = False) -> None:
+        """
+        Stop capturing; the worker process stays up for the next subscriber.
+
+        Args:
+            wait: Block until the capture thread has exited and the source is released
+        """
+        with self._lock:
+            self._stop_locked()
+            thread = self._capture_thread
+        if wait and thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _stop_locked(self) -> None:
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    def close(self) -> None:
+        """Stop capture, shut the worker process down and free the shared memory."""
+        self.stop(wait=True)
+        with self._lock:
+            self._closed = True
+            process = self._process
+            result_thread = self._result_thread
+        if process is not None:
+            self._tasks.put(None)
+            process.join(timeout=10.0)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        if result_thread is not None:
+            result_thread.join()
+        self.in_ring.close()
+        self.out_ring.close()
+
+    def _run_capture(self, stop_event: threading.Event, previous: Optional[threading.Thread]) -> None:
+        """
+        Capture loop: read, copy into the input ring, hand the sequence number to the worker.
+
+        Args:
+            stop_event: Stop flag of this capture generation
+            previous: Capture thread of the previous generation, possibly still finishing
+        """
+        if previous is not None:
+            previous.join()
+        # Don't queue up stale frames while the worker is still loading its model
+        while not stop_event.is_set() and not self._ready.wait(0.1):
+            pass
+        if stop_event.is_set():
+            return
+        source = None
+        interval = 1.0 / self.fps if self.fps > 0 else 0.0
+        next_deadline = time.monotonic()
+        try:
+            source = self.source_factory()
+            while not stop_event.is_set():
+                try:
+                    self._submit(source)
+                except Exception as e:
+                    self.read_failures += 1
+                    print(f"Error in camera worker capture: {e}")
+
+                next_deadline += interval
+                delay = next_deadline - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_deadline = time.monotonic()
+        except Exception as e:
+            print(f"Error in camera worker source: {e}")
+        finally:
+            if source is not None:
+                source.release()
+            stop_event.set()  # Let the next subscriber start a new capture thread
+
+    def _submit(self, source) -> None:
+        """Capture one frame and pass it to the worker."""
+        captured = source.read()
+        if captured is None:
+            self.read_failures += 1
+            return
+        frame, _, source_label = captured
+
+        # Never lap the worker: a slot it may still be reading must not be overwritten
+        if not self._ready.is_set() or self.frames_submitted - 1 - self._completed_seq >= self.in_ring.slots - 1:
+            self.frames_dropped += 1
+            return
+        if frame.shape != self.frame_shape:
+            frame = cv2.resize(frame, self.resolution)
+
+        seq = self.frames_submitted
+        self.in_ring.write(seq, np.ascontiguousarray(frame, dtype=np.uint8))
+        self._labels[seq % self.in_ring.slots] = source_label
+        self.frames_submitted += 1
+        self._tasks.put(seq)
+
+    def _run_results(self, process, results) -> None:
+        """
+        Result loop of one worker process: collect its output and publish it to subscribers.
+
+        Args:
+            process: Worker process this thread serves
+            results: That worker's result queue
+        """
+        while True:
+            try:
+                message = results.get(timeout=0.5)
+            except queue.Empty:
+                if not process.is_alive():
+                    break
+                continue
+
+            kind = message[0]
+            if kind == "ready":
+                self._ready.set()
+            elif kind == "lost":
+                _, seq, skipped = message
+                self.frames_lost += 1
+                self.frames_skipped += skipped
+                self._completed_seq = max(self._completed_seq, seq)
+            elif kind == "error":
+                _, seq, skipped, error = message
+                self.worker_errors += 1
+                self.frames_skipped += skipped
+                self.last_error = error
+                self._completed_seq = max(self._completed_seq, seq)
+                print(f"Error in camera worker process (frame {seq + 1}): {error}")
+            elif kind == "fatal":
+                self.worker_errors += 1
+                self.last_error = message[1]
+                print(f"Camera worker process failed: {message[1]}")
+            elif kind == "frame":
+                _, seq, analytics_data, has_jpeg, skipped, elapsed = message
+                self._completed_seq = max(self._completed_seq, seq)
+                self.frames_skipped += skipped
+                self._restart_streak = 0
+                self._publish(seq, analytics_data, has_jpeg, elapsed)
+        self._on_worker_exit(process)
+
+    def _on_worker_exit(self, process) -> None:
+        """Restart a worker that died while clients are subscribed, or end their streams."""
+        with self._lock:
+            if self._closed or process is not self._process:
+                return
+            self._process = None
+            self._ready.clear()
+            self._completed_seq = self.frames_submitted - 1  # Frames in flight died with the worker
+            self._restart_streak += 1
+            if self.broker.subscriber_count() == 0:
+                return  # Restarted by the next subscriber
+            if self._restart_streak <= WORKER_MAX_RESTARTS:
+                self.worker_restarts += 1
+                print(f"Camera worker process exited (code {process.exitcode}); restarting")
+                self._start_worker()
+                return
+            self._failed = True
+        print(f"Camera worker process keeps failing ({self.last_error}); closing its streams")
+        self.broker.close_all()
+
+    def _publish(self, seq: int, analytics_data: Dict, has_jpeg: bool, elapsed: float) -> None:
+        jpeg = None
+        if has_jpeg:
+            payload = self.out_ring.read(seq)
+            jpeg = payload.tobytes() if payload is not None else None
+        item = WorkerFrame(seq + 1, analytics_data, jpeg, self._labels.get(seq % self.in_ring.slots, ""))
+
+        self.frames_processed += 1
+        self.processing_ms = elapsed * 1000.0 if self.processing_ms == 0.0 \
+            else 0.9 * self.processing_ms + 0.1 * elapsed * 1000.0
+        now = time.monotonic()
+        if self._last_publish is not None and now > self._last_publish:
+            fps = 1.0 / (now - self._last_publish)
+            self.delivered_fps = fps if self.delivered_fps == 0.0 else 0.9 * self.delivered_fps + 0.1 * fps
+        self._last_publish = now
+
+        self.broker.publish(item)
+        if self.on_frame is not None:
+            self.on_frame(item)
+
+    def wait_ready(self, timeout: Optional[float] = WORKER_STARTUP_TIMEOUT_S) -> bool:
+        """
+        Wait until the worker process has loaded its pipeline.
+
+        Returns:
+            True once the worker is ready, False on timeout or if the worker keeps failing
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._ready.wait(0.1):
+            if self._failed or (deadline is not None and time.monotonic() >= deadline):
+                return False
+        return True
+
+    def get_stats(self) -> Dict:
+        """
+        Get hub statistics
+
+        Returns:
+            Dictionary with hub and worker process statistics
+        """
+        process = self._process
+        return {
+            'running': self.running,
+            'frames_processed': self.frames_processed,
+            'read_failures': self.read_failures,
+            'target_fps': self.fps,
+            'delivered_fps': self.delivered_fps,
+            'broker': self.broker.get_stats(),
+            'jpeg_cache': self.jpeg_cache.get_stats(),
+            'worker': {
+                'pid': process.pid if process is not None else None,
+                'alive': process is not None and process.is_alive(),
+                'ready': self._ready.is_set(),
+                'frames_submitted': self.frames_submitted,
+                'frames_dropped': self.frames_dropped,
+                'frames_skipped': self.frames_skipped,
+                'frames_lost': self.frames_lost,
+                'processing_ms': self.processing_ms,
+                'errors': self.worker_errors,
+                'restarts': self.worker_restarts,
+                'failed': self._failed,
+                'last_error': self.last_error
+            }
+        }
+
+
+def test_workers():
+    """Test function for the shared-memory ring and the process worker hub."""
+    # Ring: torn or lapped slots are reported, never returned
+    ring = SharedFrameRing(slots=2, slot_bytes=16)
+    attached = SharedFrameRing(slots=2, slot_bytes=16, name=ring.name)
+    ring.write(0, b"abc")
+    ring.write(1, np.arange(5, dtype=np.uint8))
+    assert attached.read(0).tobytes() == b"abc" and attached.read(1).tolist() == [0, 1, 2, 3, 4]
+    ring.write(2, b"xyz")
+    assert attached.read(0) is None and attached.read(2).tobytes() == b"xyz"
+    attached.close()
+    ring.close()
+
+    # The worker loop reports a bad frame and carries on (run in a thread here)
+    frame_shape = (48, 64, 3)
+    in_ring = SharedFrameRing(2, int(np.prod(frame_shape)))
+    out_ring = SharedFrameRing(2, int(np.prod(frame_shape)))
+    tasks, results = queue.Queue(), queue.Queue()
+    loop = threading.Thread(target=_worker_main, args=(in_ring.name, out_ring.name, 2, frame_shape, tasks, results,
+                                                       mp.Value('i', 0), None, JPEG_QUALITY, False, True, ''))
+    loop.start()
+    assert results.get(timeout=120)[0] == "ready"
+    in_ring.write(0, b"truncated")
+    tasks.put(0)
+    assert results.get(timeout=60)[:2] == ("error", 0)
+    in_ring.write(1, np.zeros(frame_shape, dtype=np.uint8))
+    tasks.put(1)
+    assert results.get(timeout=60)[:2] == ("frame", 1)
+    tasks.put(None)
+    loop.join()
+    in_ring.close()
+    out_ring.close()
+
+    class StaticSource:
+        def __init__(self):
+            self.frame = np.zeros((240, 320, 3), dtype=np.uint8)
+
+        def read(self):
+            return self.frame.copy(), None, "Test"
+
+        def release(self):
+            pass
+
+    hub = ProcessCaptureHub(StaticSource, fps=30, label="Test")
+    try:
+        video = hub.subscribe("video")
+        dashboard = hub.subscribe("analytics")
+        assert hub.wait_ready(), hub.last_error
+        frames = [video.get_latest(timeout=60) for _ in range(3)]
+        update = dashboard.get(timeout=60)
+
+        assert all(frame is not None for frame in frames) and update is not None
+        jpegs = [hub.encode_jpeg(frame) for frame in frames]
+        jpegs = [jpeg for jpeg in jpegs if jpeg is not None]
+        assert jpegs and frames[-1].processed_frame.shape == (VIDEO_RESOLUTION[1], VIDEO_RESOLUTION[0], 3)
+        assert hub.encode_jpeg(frames[-1], quality=30) is not None
+        assert update.analytics_data['person_count'] == 0
+        assert hub.get_stats()['worker']['pid'] != os.getpid()
+        print(f"Process hub stats: {hub.get_stats()}")
+
+        # A worker that dies is restarted and subscribers keep receiving frames
+        hub._process.kill()
+        deadline = time.monotonic() + 120
+        while hub.worker_restarts == 0 and time.monotonic() < deadline:
+            time.sleep(0.1)
+        assert hub.worker_restarts == 1 and hub.wait_ready(), hub.last_error
+        processed = hub.frames_processed
+        assert dashboard.get(timeout=60) is not None
+        while hub.frames_processed <= processed and time.monotonic() < deadline:
+            time.sleep(0.1)
+        assert hub.frames_processed > processed and hub.running
+
+        video.close()
+        dashboard.close()
+    finally:
+        hub.close()
+    assert not hub.get_stats()['worker']['alive']
+
+    print("Process worker test completed successfully")
+
+
+if __name__ == "__main__":
+    test_workers()
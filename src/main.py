@@ -6,12 +6,13 @@ Provides HTTP endpoints for video streaming and WebSocket for real-time data.
 
 import cv2
 import numpy as np
-from fastapi import FastAPI, Response, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Response, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import Optional
 import io
 import os
 import sys
-import time
 import math
 import asyncio
 
@@ -20,7 +21,10 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from engine.detection import PersonDetector
 from engine.core_pipeline import ArgusCorePipeline
-from config import VIDEO_RESOLUTION, PROCESSING_FPS
+from engine.hub import CaptureHub, HubFrame
+from engine.video_source import VideoSource
+from engine.cameras import CameraRegistry, DuplicateCameraError, parse_camera_list
+from config import VIDEO_RESOLUTION, PROCESSING_FPS, JPEG_QUALITY, VIDEO_SOURCE, CAMERAS
 import json
 
 app = FastAPI(title="Argus Protocol Backend", description="Real-time crowd analytics system")
@@ -75,22 +79,17 @@ async def get_test_frame():
 @app.get("/test_frame_with_video")
 async def get_test_frame_with_video():
     """
-    Test endpoint that processes a frame from webcam or test pattern if available.
+    Test endpoint that processes a frame from the video source or test pattern if available.
     """
     try:
-        # Try to open webcam, fallback to test pattern
-        cap = cv2.VideoCapture(0)
+        # Try the configured video source, fallback to test pattern
+        source = VideoSource(VIDEO_SOURCE, reconnect=False)
+        captured = await asyncio.to_thread(source.read, 2.0)
+        source.stop()
         
-        if cap.isOpened():
-            ret, frame = cap.read()
-            cap.release()
-            
-            if ret:
-                # Resize frame to target resolution
-                frame = cv2.resize(frame, VIDEO_RESOLUTION)
-            else:
-                # Fallback to test pattern
-                frame = create_test_pattern()
+        if captured is not None:
+            # Already resized to target resolution
+            frame = captured[0]
         else:
             # Fallback to test pattern
             frame = create_test_pattern()
@@ -118,141 +117,126 @@ async def get_test_frame_with_video():
         print(f"Video frame processing error: {str(e)}")
         return {"error": "Video frame processing failed. Please check server logs."}
 
-@app.get("/video_stream")
-async def video_stream():
+class CameraSource:
     """
-    Basic video streaming endpoint with YOLO detections.
-    This satisfies Task 2 milestone: A live video stream with YOLO detections.
+    Configured video source (ARGUS_VIDEO_SOURCE) that falls back to an animated
+    test pattern while the source is unavailable or reconnecting.
     """
-    def generate_frames():
-        # Try to open webcam first, fallback to test pattern generation
-        cap = cv2.VideoCapture(0)
-        frame_count = 0
-        
-        # If webcam is not available, we'll generate test patterns
-        use_webcam = cap.isOpened()
+    
+    def __init__(self, uri=VIDEO_SOURCE):
+        self.source = VideoSource(uri).start()
+        self.frame_count = 0
+    
+    def read(self):
+        """Return (frame, native_frame, source_label) at VIDEO_RESOLUTION."""
+        if self.source.connected:
+            captured = self.source.read(timeout=1.0 / PROCESSING_FPS)
+            if captured is not None:
+                return captured
+            return None
         
-        try:
-            while True:
-                if use_webcam:
-                    ret, frame = cap.read()
-                    if not ret:
-                        # If webcam fails, switch to test pattern
-                        use_webcam = False
-                        cap.release()
-                        frame = create_test_pattern()
-                    else:
-                        # Resize webcam frame to target resolution
-                        frame = cv2.resize(frame, VIDEO_RESOLUTION)
-                else:
-                    # Generate test pattern
-                    frame = create_test_pattern()
-                
-                # Perform person detection only (no tracking/analytics for basic stream)
-                detections = detector.detect_persons(frame)
-                processed_frame = detector.draw_detections(frame, detections)
-                
-                # Add detection info to frame
-                cv2.putText(processed_frame, f"Persons detected: {len(detections)}", (10, 30), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-                cv2.putText(processed_frame, "Argus Protocol - Basic Stream", (10, 60), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-                cv2.putText(processed_frame, f"Source: {'Webcam' if use_webcam else 'Test Pattern'}", 
-                           (10, VIDEO_RESOLUTION[1] - 20), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-                
-                # Encode frame as JPEG
-                _, buffer = cv2.imencode('.jpg', processed_frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
-                
-                # Yield frame in multipart format
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n')
-                
-                frame_count += 1
-                
-                # Control frame rate
-                time.sleep(1.0 / PROCESSING_FPS)
-                
-        except Exception as e:
-            print(f"Error in video stream: {e}")
-        finally:
-            if cap.isOpened():
-                cap.release()
+        frame = create_test_pattern_with_motion(self.frame_count)
+        self.frame_count += 1
+        return frame, None, 'Test Pattern'
     
-    return StreamingResponse(generate_frames(), media_type="multipart/x-mixed-replace; boundary=frame")
+    def release(self):
+        self.source.stop()
+
+
+def draw_source_label(processed_frame: np.ndarray, hub_frame: HubFrame):
+    """Add source info to an annotated hub frame."""
+    cv2.putText(processed_frame, f"Source: {hub_frame.source_label}", 
+               (10, VIDEO_RESOLUTION[1] - 20), 
+               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
+
+def print_analytics(hub_frame: HubFrame):
+    """Print analytics to console (Task 3 milestone requirement), once per second."""
+    analytics_data = hub_frame.analytics_data
+    if hub_frame.frame_number % PROCESSING_FPS != 1:
+        return
+    print("\n" + "="*60)
+    print(f"🎯 ARGUS ANALYTICS - Frame {analytics_data['frame_count']}")
+    print("="*60)
+    print(f"📊 Person Count: {analytics_data['person_count']}")
+    print(f"🏘️  Max Density: {analytics_data['density']['max_density']:.1f} persons/cell")
+    print(f"🌊 Motion Coherence: {analytics_data['motion_coherence']['std_deviation']:.1f}° std dev")
+    print(f"⚡ Kinetic Energy: {analytics_data['kinetic_energy']['current']:.2f}")
+    print(f"📈 KE Moving Avg: {analytics_data['kinetic_energy']['moving_average']:.2f}")
+    print(f"🚨 Status: {analytics_data['status']}")
+    if analytics_data['kinetic_energy']['spike_detected']:
+        print("⚠️  KINETIC ENERGY SPIKE DETECTED!")
+    print("="*60)
+
+
+# One capture + pipeline run per frame, shared by every stream and WebSocket client
+camera_hub = CaptureHub(core_pipeline, CameraSource, annotate=draw_source_label, on_frame=print_analytics)
+
+# Additional cameras, each with its own tracker and analytics, sharing a detector pool
+camera_registry = CameraRegistry(annotate=draw_source_label)
+
+@app.on_event("startup")
+def register_configured_cameras():
+    """Register the cameras listed in ARGUS_CAMERAS."""
+    for camera in parse_camera_list(CAMERAS):
+        camera_registry.add(camera['uri'], camera_id=camera['camera_id'])
+
+@app.on_event("shutdown")
+def stop_camera_hub():
+    """Release the cameras when the server stops."""
+    camera_hub.stop(wait=True)
+    for hub in demo_hubs.values():
+        hub.stop(wait=True)
+    camera_registry.shutdown()
+
+
+async def generate_hub_frames(hub: CaptureHub, quality: int = JPEG_QUALITY):
+    """
+    MJPEG async generator over a capture hub. Frames are produced and paced by
+    the hub's background thread; this only awaits and forwards them.
+    """
+    subscription = hub.subscribe("video")
+    try:
+        while True:
+            # Slow clients skip straight to the newest frame
+            hub_frame = await subscription.get_latest_async(timeout=1.0)
+            if hub_frame is None:
+                if subscription.closed:
+                    break
+                continue
+            
+            # Encoded once per frame and quality, shared by all clients
+            jpeg = await hub.encode_jpeg_async(hub_frame, quality)
+            if jpeg is None:
+                continue  # Worker-process frame produced before this client attached
+            
+            # Yield frame in multipart format
+            yield (b'--frame\r\n'
+                   b'Content-Type: image/jpeg\r\n\r\n' + jpeg + b'\r\n')
+    except Exception as e:
+        print(f"Error in video stream: {e}")
+    finally:
+        subscription.close()
+
+@app.get("/video_stream")
+async def video_stream(quality: int = JPEG_QUALITY):
+    """
+    Live video stream with detections, tracks and analytics overlays.
+    This satisfies Task 2 milestone: A live video stream with YOLO detections.
+    Served from the shared camera hub, so it costs no extra inference or encoding.
+    """
+    quality = max(10, min(100, quality))
+    return StreamingResponse(generate_hub_frames(camera_hub, quality), media_type="multipart/x-mixed-replace; boundary=frame")
 
 @app.get("/analytics_stream")
-async def analytics_stream():
+async def analytics_stream(quality: int = JPEG_QUALITY):
     """
     Advanced video streaming with full analytics pipeline.
     This satisfies Task 3 milestone: SORT tracking + 3 core metrics calculation with console output.
+    Served from the shared camera hub, so it costs no extra inference or encoding.
     """
-    def generate_analytics_frames():
-        # Try to open webcam first, fallback to test pattern generation
-        cap = cv2.VideoCapture(0)
-        frame_count = 0
-        
-        # If webcam is not available, we'll generate test patterns
-        use_webcam = cap.isOpened()
-        
-        try:
-            while True:
-                if use_webcam:
-                    ret, frame = cap.read()
-                    if not ret:
-                        # If webcam fails, switch to test pattern
-                        use_webcam = False
-                        cap.release()
-                        frame = create_test_pattern_with_motion(frame_count)
-                    else:
-                        # Resize webcam frame to target resolution
-                        frame = cv2.resize(frame, VIDEO_RESOLUTION)
-                else:
-                    # Generate test pattern with simulated motion
-                    frame = create_test_pattern_with_motion(frame_count)
-                
-                # Process frame through complete pipeline
-                processed_frame, analytics_data = core_pipeline.process_frame(frame)
-                
-                # Print analytics to console (Task 3 milestone requirement)
-                if frame_count % 15 == 0:  # Print every second (15 FPS)
-                    print("\n" + "="*60)
-                    print(f"🎯 ARGUS ANALYTICS - Frame {analytics_data['frame_count']}")
-                    print("="*60)
-                    print(f"📊 Person Count: {analytics_data['person_count']}")
-                    print(f"🏘️  Max Density: {analytics_data['density']['max_density']:.1f} persons/cell")
-                    print(f"🌊 Motion Coherence: {analytics_data['motion_coherence']['std_deviation']:.1f}° std dev")
-                    print(f"⚡ Kinetic Energy: {analytics_data['kinetic_energy']['current']:.2f}")
-                    print(f"📈 KE Moving Avg: {analytics_data['kinetic_energy']['moving_average']:.2f}")
-                    print(f"🚨 Status: {analytics_data['status']}")
-                    if analytics_data['kinetic_energy']['spike_detected']:
-                        print("⚠️  KINETIC ENERGY SPIKE DETECTED!")
-                    print("="*60)
-                
-                # Add source info
-                cv2.putText(processed_frame, f"Source: {'Webcam' if use_webcam else 'Test Pattern'}", 
-                           (10, VIDEO_RESOLUTION[1] - 20), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-                
-                # Encode frame as JPEG
-                _, buffer = cv2.imencode('.jpg', processed_frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
-                
-                # Yield frame in multipart format
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n')
-                
-                frame_count += 1
-                
-                # Control frame rate
-                time.sleep(1.0 / PROCESSING_FPS)
-                
-        except Exception as e:
-            print(f"Error in analytics stream: {e}")
-        finally:
-            if cap.isOpened():
-                cap.release()
-    
-    return StreamingResponse(generate_analytics_frames(), media_type="multipart/x-mixed-replace; boundary=frame")
+    quality = max(10, min(100, quality))
+    return StreamingResponse(generate_hub_frames(camera_hub, quality), media_type="multipart/x-mixed-replace; boundary=frame")
 
 # WebSocket connection manager
 class ConnectionManager:
@@ -264,7 +248,8 @@ class ConnectionManager:
         self.active_connections.append(websocket)
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        if websocket in self.active_connections:
+            self.active_connections.remove(websocket)
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
@@ -288,52 +273,108 @@ async def websocket_analytics(websocket: WebSocket):
     await manager.connect(websocket)
     print(f"🔌 WebSocket client connected. Total connections: {len(manager.active_connections)}")
     
+    # Analytics-only subscription: never causes frames to be drawn
+    subscription = camera_hub.subscribe("analytics")
     try:
-        # Start analytics processing in background
-        cap = cv2.VideoCapture(0)
-        frame_count = 0
-        use_webcam = cap.isOpened()
-        
         while True:
-            try:
-                if use_webcam:
-                    ret, frame = cap.read()
-                    if not ret:
-                        use_webcam = False
-                        cap.release()
-                        frame = create_test_pattern_with_motion(frame_count)
-                    else:
-                        frame = cv2.resize(frame, VIDEO_RESOLUTION)
-                else:
-                    frame = create_test_pattern_with_motion(frame_count)
-                
-                # Process frame through complete pipeline
-                processed_frame, analytics_data = core_pipeline.process_frame(frame)
-                
-                # Send analytics data via WebSocket
-                analytics_json = json.dumps(analytics_data)
-                await websocket.send_text(analytics_json)
-                
-                frame_count += 1
-                
-                # Control frame rate
-                await asyncio.sleep(1.0 / PROCESSING_FPS)
-                
-            except WebSocketDisconnect:
-                break
-            except Exception as e:
-                print(f"Error in WebSocket analytics: {e}")
-                break
-                
+            hub_frame = await subscription.get_latest_async(timeout=1.0)
+            if hub_frame is None:
+                continue
+            
+            # Send analytics data via WebSocket
+            await websocket.send_text(json.dumps(hub_frame.analytics_data))
+            
     except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"Error in WebSocket analytics: {e}")
+    finally:
+        subscription.close()
         manager.disconnect(websocket)
         print(f"🔌 WebSocket client disconnected. Total connections: {len(manager.active_connections)}")
+
+class CameraConfig(BaseModel):
+    """Request body for registering a camera."""
+    source: str
+    id: Optional[str] = None
+    name: Optional[str] = None
+    tiled_inference: bool = False
+    calibration: Optional[str] = None  # ground-plane calibration file (persons/m² density)
+
+@app.get("/cameras")
+async def list_cameras():
+    """List registered cameras and their status."""
+    return {"cameras": camera_registry.list()}
+
+@app.post("/cameras", status_code=201)
+async def add_camera(config: CameraConfig):
+    """Register a camera. Capture starts when the first client connects."""
+    try:
+        camera = await asyncio.to_thread(camera_registry.add, config.source, config.id, config.name,
+                                         config.tiled_inference, config.calibration)
+    except DuplicateCameraError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        # Invalid id, unusable calibration file, or options the worker mode cannot run
+        raise HTTPException(status_code=400, detail=str(e))
+    return camera.get_info()
+
+@app.delete("/cameras/{camera_id}")
+async def remove_camera(camera_id: str):
+    """Unregister a camera and end its streams."""
+    try:
+        await asyncio.to_thread(camera_registry.remove, camera_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Camera '{camera_id}' not found")
+    return {"removed": camera_id}
+
+def get_camera_hub(camera_id: str) -> CaptureHub:
+    """Capture hub of a registered camera, or 404."""
+    try:
+        return camera_registry.get(camera_id).hub
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Camera '{camera_id}' not found")
+
+@app.get("/cameras/{camera_id}/stream")
+async def camera_stream(camera_id: str, quality: int = JPEG_QUALITY):
+    """MJPEG stream of one registered camera with its analytics overlays."""
+    hub = get_camera_hub(camera_id)
+    quality = max(10, min(100, quality))
+    return StreamingResponse(generate_hub_frames(hub, quality), media_type="multipart/x-mixed-replace; boundary=frame")
+
+@app.websocket("/ws/cameras/{camera_id}")
+async def websocket_camera_analytics(websocket: WebSocket, camera_id: str):
+    """WebSocket streaming the analytics JSON of one registered camera."""
+    try:
+        hub = camera_registry.get(camera_id).hub
+    except KeyError:
+        await websocket.close(code=4404)
+        return
+    
+    await websocket.accept()
+    subscription = hub.subscribe("analytics")
+    try:
+        while True:
+            hub_frame = await subscription.get_latest_async(timeout=1.0)
+            if hub_frame is None:
+                if subscription.closed:
+                    break  # Camera was removed
+                continue
+            await websocket.send_text(json.dumps(dict(hub_frame.analytics_data, camera_id=camera_id)))
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"Error in camera WebSocket {camera_id}: {e}")
     finally:
-        if cap.isOpened():
-            cap.release()
+        subscription.close()
+    if subscription.closed:
+        try:
+            await websocket.close()
+        except Exception:
+            pass
 
 @app.get("/demo/{scenario_type}")
-async def demo_scenario_stream(scenario_type: str):
+async def demo_scenario_stream(scenario_type: str, quality: int = JPEG_QUALITY):
     """
     Demo scenario streaming for Task 5 refinement and presentation.
     Available scenarios: normal, warning, critical, stampede
@@ -342,50 +383,63 @@ async def demo_scenario_stream(scenario_type: str):
     if scenario_type not in valid_scenarios:
         return {"error": f"Invalid scenario. Choose from: {valid_scenarios}"}
     
-    def generate_demo_frames():
-        frame_count = 0
+    quality = max(10, min(100, quality))
+    return StreamingResponse(generate_hub_frames(get_demo_hub(scenario_type), quality),
+                             media_type="multipart/x-mixed-replace; boundary=frame")
+
+
+class DemoScenarioSource:
+    """Synthetic frames for one demo scenario."""
+    
+    def __init__(self, scenario_type: str):
+        from demo_scenarios import DemoScenarioGenerator
         
-        try:
-            while True:
-                # Generate demo scenario frame
-                frame = create_demo_scenario(scenario_type, frame_count)
-                
-                # Process frame through complete pipeline
-                processed_frame, analytics_data = core_pipeline.process_frame(frame)
-                
-                # Print analytics to console for demo
-                if frame_count % 15 == 0:  # Print every second
-                    print("\n" + "="*60)
-                    print(f"🎬 DEMO SCENARIO: {scenario_type.upper()}")
-                    print("="*60)
-                    print(f"📊 Person Count: {analytics_data['person_count']}")
-                    print(f"🏘️  Max Density: {analytics_data['density']['max_density']:.1f} persons/cell")
-                    print(f"🌊 Motion Coherence: {analytics_data['motion_coherence']['std_deviation']:.1f}° std dev")
-                    print(f"⚡ Kinetic Energy: {analytics_data['kinetic_energy']['current']:.2f}")
-                    print(f"🚨 Status: {analytics_data['status']}")
-                    print("="*60)
-                
-                # Add scenario info to frame
-                cv2.putText(processed_frame, f"Demo: {scenario_type.title()}", 
-                           (10, processed_frame.shape[0] - 20), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
-                
-                # Encode frame as JPEG
-                _, buffer = cv2.imencode('.jpg', processed_frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
-                
-                # Yield frame in multipart format
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n')
-                
-                frame_count += 1
-                
-                # Control frame rate
-                time.sleep(1.0 / PROCESSING_FPS)
-                
-        except Exception as e:
-            print(f"Error in demo scenario stream: {e}")
+        self.scenario_type = scenario_type
+        self.generator = DemoScenarioGenerator(VIDEO_RESOLUTION)
+        self.frame_count = 0
     
-    return StreamingResponse(generate_demo_frames(), media_type="multipart/x-mixed-replace; boundary=frame")
+    def read(self):
+        """Return (frame, native_frame, source_label)."""
+        frame = create_demo_scenario(self.scenario_type, self.frame_count, self.generator)
+        self.frame_count += 1
+        return frame, None, self.scenario_type
+    
+    def release(self):
+        pass
+
+
+def draw_demo_label(processed_frame: np.ndarray, hub_frame: HubFrame):
+    """Add scenario info to an annotated demo frame."""
+    cv2.putText(processed_frame, f"Demo: {hub_frame.source_label.title()}", 
+               (10, processed_frame.shape[0] - 20), 
+               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
+
+
+def print_demo_analytics(hub_frame: HubFrame):
+    """Print demo analytics to console, once per second."""
+    analytics_data = hub_frame.analytics_data
+    if hub_frame.frame_number % PROCESSING_FPS != 1:
+        return
+    print("\n" + "="*60)
+    print(f"🎬 DEMO SCENARIO: {hub_frame.source_label.upper()}")
+    print("="*60)
+    print(f"📊 Person Count: {analytics_data['person_count']}")
+    print(f"🏘️  Max Density: {analytics_data['density']['max_density']:.1f} persons/cell")
+    print(f"🌊 Motion Coherence: {analytics_data['motion_coherence']['std_deviation']:.1f}° std dev")
+    print(f"⚡ Kinetic Energy: {analytics_data['kinetic_energy']['current']:.2f}")
+    print(f"🚨 Status: {analytics_data['status']}")
+    print("="*60)
+
+
+# Demo hubs are created on first use; each scenario has its own tracker state
+demo_hubs = {}
+
+def get_demo_hub(scenario_type: str) -> CaptureHub:
+    """Get (or create) the capture hub of a demo scenario."""
+    if scenario_type not in demo_hubs:
+        demo_hubs[scenario_type] = CaptureHub(ArgusCorePipeline(), lambda: DemoScenarioSource(scenario_type),
+                                              annotate=draw_demo_label, on_frame=print_demo_analytics)
+    return demo_hubs[scenario_type]
 
 def create_test_pattern_with_motion(frame_count: int) -> np.ndarray:
     """Create a test pattern frame with animated elements to simulate motion."""
@@ -447,11 +501,12 @@ def create_test_pattern() -> np.ndarray:
     
     return frame
 
-def create_demo_scenario(scenario_type: str, frame_count: int) -> np.ndarray:
+def create_demo_scenario(scenario_type: str, frame_count: int, generator=None) -> np.ndarray:
     """Create demo scenarios for Task 5 refinement and demonstration"""
     from demo_scenarios import DemoScenarioGenerator
     
-    generator = DemoScenarioGenerator(VIDEO_RESOLUTION)
+    if generator is None:
+        generator = DemoScenarioGenerator(VIDEO_RESOLUTION)
     generator.frame_count = frame_count
     
     if scenario_type == "normal":
@@ -482,6 +537,8 @@ if __name__ == "__main__":
     print("  - http://127.0.0.1:8000/analytics_stream (FULL ANALYTICS PIPELINE)")
     print("  - http://127.0.0.1:8000/test_frame_with_video (webcam or test pattern)")
     print("  - ws://127.0.0.1:8000/ws/analytics (WebSocket for real-time analytics)")
+    print("  - http://127.0.0.1:8000/cameras (list / POST add / DELETE /cameras/{id})")
+    print("  - http://127.0.0.1:8000/cameras/{id}/stream and ws://127.0.0.1:8000/ws/cameras/{id}")
     print("")
     print("🎬 DEMO SCENARIOS (Task 5):")
     print("  - http://127.0.0.1:8000/demo/normal (Normal crowd scenario)")